@@ -1,5 +1,191 @@
+"""
+Sales Report Generator
+Sums sale amounts per region from sales exports into an Excel summary.
+
+Requirements: pip install pandas openpyxl
+Usage:
+    python ExcelReportGen.py                              # sale_data.xlsx -> summary_report.xlsx
+    python ExcelReportGen.py --stream a.xlsx b.csv ...    # chunked, multi-core, bounded memory
+    python ExcelReportGen.py --cache                      # reuse a columnar copy of each input
+    python ExcelReportGen.py --config reports.json        # many summaries, one multi-sheet workbook
+
+Every mode reads the first worksheet of each workbook, as pd.read_excel
+does. Stream mode never loads a whole workbook: the sheet is read row by
+row with openpyxl's read-only mode and each CSV is split into byte ranges,
+all summed in a process pool and merged at the end. Memory is bounded by
+the number of distinct regions, not the number of rows. It cannot be
+combined with --cache or --config.
+
+Cache mode converts each input once into memory-mapped NumPy columns (see
+columnar_cache.py), so re-aggregating the same workbook skips XML parsing.
+
+Config mode builds every report listed in a JSON config from a single pass
+over the data (see report_engine.py for the format).
+
+--trace FILE records how long loading, aggregating and writing took (see
+perf_trace.py).
+"""
+
+import argparse
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
 
-df = pd.read_excel("sale_data.xlsx")
-summary = df.groupby("Region")["Amount"].sum()
-summary.to_excel("summary_report.xlsx")
\ No newline at end of file
+import perf_trace
+
+CSV_CHUNK_BYTES = 64 * 1024 * 1024
+
+
+def _add_row(totals, key, value):
+    if key is None or value is None or value == "":
+        return
+    totals[key] = totals.get(key, 0) + float(value)
+
+
+def _column_positions(header, group_col, value_col, source):
+    header = [str(h).strip() if h is not None else "" for h in header]
+    missing = [c for c in (group_col, value_col) if c not in header]
+    if missing:
+        raise ValueError(f"{source}: missing column(s) {', '.join(missing)}")
+    return header.index(group_col), header.index(value_col)
+
+
+def sum_xlsx_sheet(path, sheet, group_col, value_col):
+    """Stream one worksheet row by row and return {group: sum}."""
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = wb[sheet].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return {}
+        g, v = _column_positions(header, group_col, value_col, f"{path}[{sheet}]")
+        totals = {}
+        for row in rows:
+            if len(row) > max(g, v):
+                _add_row(totals, row[g], row[v])
+        return totals
+    finally:
+        wb.close()
+
+
+def sum_csv_range(path, start, end, header, group_col, value_col):
+    """Sum the CSV lines that start within bytes [start, end) and return {group: sum}.
+
+    Assumes quoted fields do not contain newlines, so byte ranges can be
+    aligned to line boundaries.
+    """
+    g, v = _column_positions(header, group_col, value_col, path)
+    totals = {}
+    with open(path, "rb") as f:
+        # Resume after the first newline at or past start - 1; a line that
+        # starts before `start` belongs to the previous range
+        f.seek(max(start - 1, 0))
+        if start:
+            f.readline()
+        while f.tell() < end:
+            line = f.readline()
+            if not line:
+                break
+            for row in csv.reader([line.decode("utf-8-sig")]):
+                if len(row) > max(g, v):
+                    _add_row(totals, row[g], row[v])
+    return totals
+
+
+def plan_tasks(paths, group_col, value_col, chunk_bytes=CSV_CHUNK_BYTES):
+    """Split the inputs into independent (function, args) work items."""
+    tasks = []
+    for path in paths:
+        if path.lower().endswith(".csv"):
+            with open(path, newline="", encoding="utf-8-sig") as f:
+                header = next(csv.reader(f), [])
+                f.seek(0)
+                first_row = len(f.readline().encode("utf-8"))
+            size = os.path.getsize(path)
+            for start in range(first_row, max(size, first_row + 1), chunk_bytes):
+                tasks.append((sum_csv_range, (path, start, min(start + chunk_bytes, size),
+                                              header, group_col, value_col)))
+        else:
+            # Only the first worksheet, like pd.read_excel and the columnar cache
+            from openpyxl import load_workbook
+            wb = load_workbook(path, read_only=True)
+            sheet = wb.sheetnames[0]
+            wb.close()
+            tasks.append((sum_xlsx_sheet, (path, sheet, group_col, value_col)))
+    return tasks
+
+
+def _run_task(task):
+    func, args = task
+    return func(*args)
+
+
+def stream_totals(paths, group_col="Region", value_col="Amount", workers=None,
+                  chunk_bytes=CSV_CHUNK_BYTES):
+    """Aggregate value_col per group_col over every input using a process pool."""
+    with perf_trace.span("report.plan", files=len(paths)):
+        tasks = plan_tasks(paths, group_col, value_col, chunk_bytes)
+    perf_trace.count("report.tasks", len(tasks))
+    totals = {}
+    with perf_trace.span("report.aggregate", tasks=len(tasks)):
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for partial in pool.map(_run_task, tasks):
+                for key, value in partial.items():
+                    totals[key] = totals.get(key, 0) + value
+    return totals
+
+
+@perf_trace.traced("report.write")
+def write_summary(totals, output_path, group_col="Region", value_col="Amount"):
+    summary = pd.Series(totals, name=value_col, dtype="float64").sort_index()
+    summary.index.name = group_col
+    summary.to_excel(output_path)
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sum sales amounts per region into an Excel report")
+    parser.add_argument("inputs", nargs="*", default=["sale_data.xlsx"], help="input .xlsx/.csv files")
+    parser.add_argument("--output", default="summary_report.xlsx")
+    parser.add_argument("--stream", action="store_true",
+                        help="chunked out-of-core aggregation across a process pool")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (default: CPU count)")
+    parser.add_argument("--cache", action="store_true",
+                        help="load inputs from the columnar cache, converting them on first use")
+    parser.add_argument("--cache-dir", default=".report_cache")
+    parser.add_argument("--config", help="JSON report config; writes one sheet per report")
+    parser.add_argument("--group-by", default="Region")
+    parser.add_argument("--value", default="Amount")
+    perf_trace.add_arguments(parser)
+    args = parser.parse_args()
+    perf_trace.from_args(args)
+    if args.stream and (args.cache or args.config):
+        parser.error("--stream cannot be combined with --cache or --config")
+
+    if args.stream:
+        totals = stream_totals(args.inputs, args.group_by, args.value, args.workers)
+        write_summary(totals, args.output, args.group_by, args.value)
+    else:
+        with perf_trace.span("report.load", files=len(args.inputs), cache=args.cache):
+            if args.cache:
+                from columnar_cache import load_frame
+                frames = [load_frame(path, cache_dir=args.cache_dir) for path in args.inputs]
+            else:
+                frames = [
+                    pd.read_csv(path) if path.lower().endswith(".csv") else pd.read_excel(path)
+                    for path in args.inputs
+                ]
+            df = pd.concat(frames)
+        perf_trace.count("report.rows", len(df))
+        if args.config:
+            from report_engine import load_config, run_reports, write_reports
+            write_reports(run_reports(df, load_config(args.config)), args.output)
+        else:
+            with perf_trace.span("report.aggregate"):
+                summary = df.groupby(args.group_by, observed=True)[args.value].sum()
+            with perf_trace.span("report.write"):
+                summary.to_excel(args.output)
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Arc Raiders Craft-vs-Sell Inventory Optimizer
+Given a stash of materials and your bench levels, picks the set of crafts that
+maximizes the total sell value of the stash. Intermediate crafts may feed later
+ones (e.g. Mechanical Components -> Mod Components -> Angled Grip III), and
+scarce inputs shared by several recipes are allocated across all of them
+instead of ranking recipes one at a time.
+
+Every craft turns its inputs into one item, so the stash value changes by
+exactly that recipe's profit. The problem is therefore an integer program:
+maximize sum(profit[r] * crafts[r]) subject to never using more of an item
+than the stash holds plus what earlier crafts produced.
+
+Solvers:
+    lp     - exact integer program via scipy.optimize.milp (scipy >= 1.9)
+    greedy - dependency-free fallback that repeatedly applies the most
+             profitable craft chain the stash can still afford
+    auto   - lp when scipy is installed, otherwise greedy
+
+Requirements: none (scipy optional)
+Usage:
+    python arc_raiders_craft_optimizer.py stash.json [--solver auto|lp|greedy]
+    python arc_raiders_craft_optimizer.py --benchmark
+
+stash.json format:
+    {"inventory": {"Metal Parts": 120, "Duct Tape": 10, ...},
+     "benches": {"Gunsmith": 2, "Refiner": 3, "Explosives": 1, "Utility": 1}}
+Omit "benches" to allow every recipe.
+"""
+
+import argparse
+import json
+import random
+import time
+
+from arc_raiders_crafting_profit import material_values, recipes, build_recipe_graph
+
+ROMAN_LEVELS = {"I": 1, "II": 2, "III": 3, "IV": 4, "V": 5}
+
+
+def parse_bench(bench):
+    """Split a bench label like 'Gunsmith III' into ('Gunsmith', 3)."""
+    station, _, level = bench.rpartition(" ")
+    if level in ROMAN_LEVELS and station:
+        return station, ROMAN_LEVELS[level]
+    return bench, 1
+
+
+def item_value(name, values, sell_values):
+    """Sell value of any stash item: material price, else crafted sell price, else 500."""
+    if name in values:
+        return values[name]
+    if name in sell_values:
+        return sell_values[name]
+    print(f"WARNING: Unknown item '{name}' - using default value 500")
+    return 500
+
+
+def available_recipes(benches=None, recipe_list=None):
+    """Return the recipes craftable with the given bench levels (all if None)."""
+    if recipe_list is None:
+        recipe_list = recipes
+    if benches is None:
+        return list(recipe_list)
+    allowed = []
+    for entry in recipe_list:
+        station, level = parse_bench(entry[3])
+        if benches.get(station, 0) >= level:
+            allowed.append(entry)
+    return allowed
+
+
+def stash_value(stash, values, sell_values):
+    return sum(item_value(name, values, sell_values) * qty for name, qty in stash.items())
+
+
+def _plan_craft(name, qty, stash, index, plan):
+    """Record the crafts needed to make `qty` of `name` from `stash` (mutated).
+
+    Missing ingredients are crafted recursively. Returns False if the stash
+    cannot cover the raw inputs.
+    """
+    for material, need in index[name]:
+        need *= qty
+        have = stash.get(material, 0)
+        if have < need:
+            if material not in index:
+                return False
+            if not _plan_craft(material, need - have, stash, index, plan):
+                return False
+        stash[material] = stash.get(material, 0) - need
+    stash[name] = stash.get(name, 0) + qty
+    plan[name] = plan.get(name, 0) + qty
+    return True
+
+
+def solve_greedy(inventory, allowed, values=None):
+    """Greedy chain solver: apply the most profitable affordable craft chain, repeat.
+
+    Each round prices one unit of every recipe (crafting missing intermediates
+    from the stash), applies the best chain as many times as the stash allows,
+    and stops when no chain has positive profit.
+    """
+    if values is None:
+        values = material_values
+    sell_values = {entry[0]: entry[1] for entry in allowed}
+    index = {}
+    for name, sell_value, recipe, bench, notes in allowed:
+        index.setdefault(name, recipe)
+    profits = {
+        name: sell_values[name] - sum(item_value(m, values, sell_values) * q for m, q in recipe)
+        for name, recipe in index.items()
+    }
+
+    stash = {name: qty for name, qty in inventory.items() if qty > 0}
+    crafts = {}
+    candidates = list(index)
+    while candidates:
+        best_gain, best_name = 0, None
+        affordable = []
+        for name in candidates:
+            plan = {}
+            if not _plan_craft(name, 1, dict(stash), index, plan):
+                continue
+            affordable.append(name)
+            gain = sum(profits[item] * qty for item, qty in plan.items())
+            if gain > best_gain:
+                best_gain, best_name = gain, name
+        if best_name is None:
+            break
+
+        # Apply the chosen chain until the stash runs short
+        while True:
+            trial, plan = dict(stash), {}
+            if not _plan_craft(best_name, 1, trial, index, plan):
+                break
+            stash = trial
+            for item, qty in plan.items():
+                crafts[item] = crafts.get(item, 0) + qty
+        # Crafting only spends inputs, so a chain unaffordable now stays unaffordable
+        candidates = affordable
+
+    stash = {name: qty for name, qty in stash.items() if qty > 0}
+    return crafts, stash
+
+
+def solve_lp(inventory, allowed, values=None):
+    """Exact integer program via scipy.optimize.milp."""
+    import numpy as np
+    from scipy.optimize import Bounds, LinearConstraint, milp
+    from scipy.sparse import lil_matrix
+
+    if values is None:
+        values = material_values
+    sell_values = {entry[0]: entry[1] for entry in allowed}
+
+    items = list(dict.fromkeys(
+        list(inventory) + [e[0] for e in allowed] + [m for e in allowed for m, q in e[2]]
+    ))
+    rows = {name: i for i, name in enumerate(items)}
+
+    # usage[i, r] = net consumption of item i by one craft of recipe r
+    usage = lil_matrix((len(items), len(allowed)))
+    profit = np.zeros(len(allowed))
+    for r, (name, sell_value, recipe, bench, notes) in enumerate(allowed):
+        usage[rows[name], r] -= 1
+        cost = 0
+        for material, qty in recipe:
+            usage[rows[material], r] += qty
+            cost += item_value(material, values, sell_values) * qty
+        profit[r] = sell_value - cost
+
+    stock = np.array([inventory.get(name, 0) for name in items], dtype=np.float64)
+    result = milp(
+        c=-profit,
+        constraints=LinearConstraint(usage.tocsr(), -np.inf, stock),
+        integrality=np.ones(len(allowed)),
+        bounds=Bounds(0, np.inf),
+    )
+    if not result.success:
+        raise RuntimeError(f"LP solver failed: {result.message}")
+
+    crafts = {}
+    counts = np.round(result.x).astype(int)
+    for r, count in enumerate(counts):
+        if count > 0:
+            crafts[allowed[r][0]] = crafts.get(allowed[r][0], 0) + int(count)
+    remaining = stock - usage.tocsr() @ counts
+    stash = {items[i]: int(qty) for i, qty in enumerate(np.round(remaining)) if qty > 0}
+    return crafts, stash
+
+
+def optimize_crafts(inventory, benches=None, solver="auto", recipe_list=None, values=None):
+    """Pick the crafts that maximize the stash's total sell value.
+
+    Returns a dict with the craft counts, the resulting stash, and the stash
+    value before and after crafting.
+    """
+    if values is None:
+        values = material_values
+    allowed = available_recipes(benches, recipe_list)
+    build_recipe_graph(allowed)  # reject cyclic recipe data up front
+
+    if solver == "auto":
+        try:
+            from scipy.optimize import milp  # noqa: F401
+            solver = "lp"
+        except ImportError:
+            solver = "greedy"
+
+    if solver == "lp":
+        crafts, stash = solve_lp(inventory, allowed, values)
+    elif solver == "greedy":
+        crafts, stash = solve_greedy(inventory, allowed, values)
+    else:
+        raise ValueError(f"Unknown solver '{solver}'")
+
+    sell_values = {entry[0]: entry[1] for entry in allowed}
+    return {
+        "solver": solver,
+        "crafts": crafts,
+        "stash": stash,
+        "value_before": stash_value(inventory, values, sell_values),
+        "value_after": stash_value(stash, values, sell_values),
+    }
+
+
+def synthetic_problem(item_types=300, raw_types=80, seed=0):
+    """Build a random layered recipe set and stash with `item_types` distinct items."""
+    rng = random.Random(seed)
+    values = {f"Raw {i}": rng.randint(20, 400) for i in range(raw_types)}
+    recipe_list = []
+    names = list(values)
+    for i in range(item_types - raw_types):
+        inputs = rng.sample(names, k=min(len(names), rng.randint(1, 3)))
+        recipe = [(mat, rng.randint(1, 6)) for mat in inputs]
+        name = f"Item {i}"
+        sell = int(sum(values[m] * q for m, q in recipe) * rng.uniform(0.7, 1.4))
+        values[name] = sell
+        recipe_list.append((name, sell, recipe, "Bench", ""))
+        names.append(name)
+    inventory = {f"Raw {i}": rng.randint(0, 200) for i in range(raw_types)}
+    return recipe_list, values, inventory
+
+
+def run_benchmark(sizes=(50, 150, 300, 500), repeats=3):
+    """Time each available solver on synthetic stashes of increasing size."""
+    solvers = ["greedy"]
+    try:
+        from scipy.optimize import milp  # noqa: F401
+        solvers.append("lp")
+    except ImportError:
+        print("scipy not installed - benchmarking greedy solver only")
+
+    print(f"{'item types':>10} {'solver':>7} {'best ms':>9} {'value gain':>12}")
+    for size in sizes:
+        recipe_list, values, inventory = synthetic_problem(size, raw_types=max(10, size // 4))
+        for solver in solvers:
+            best = None
+            for _ in range(repeats):
+                start = time.perf_counter()
+                result = optimize_crafts(inventory, None, solver, recipe_list, values)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            gain = result["value_after"] - result["value_before"]
+            print(f"{size:>10} {solver:>7} {best * 1000:>9.1f} {gain:>12,}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Choose crafts that maximize stash sell value")
+    parser.add_argument("stash", nargs="?", help="JSON file with inventory and bench levels")
+    parser.add_argument("--solver", choices=["auto", "lp", "greedy"], default="auto")
+    parser.add_argument("--benchmark", action="store_true", help="time the solvers on synthetic stashes")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        run_benchmark()
+    elif not args.stash:
+        parser.error("a stash JSON file is required (or use --benchmark)")
+    else:
+        with open(args.stash) as f:
+            data = json.load(f)
+        result = optimize_crafts(data["inventory"], data.get("benches"), args.solver)
+        print(f"Solver: {result['solver']}")
+        print(f"Stash value before: ${result['value_before']:,}")
+        print(f"Stash value after:  ${result['value_after']:,}")
+        print(f"Gain: ${result['value_after'] - result['value_before']:,}")
+        print("\nCrafts:")
+        for name, count in sorted(result["crafts"].items(), key=lambda x: -x[1]):
+            print(f"  {count}× {name}")
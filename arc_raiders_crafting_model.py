@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Arc Raiders Incremental Crafting Model
+Keeps every recipe's cost/profit row and the profit ranking in memory so a
+single material price change only recomputes the recipes that depend on it.
+
+A reverse index maps each material to the recipes that use it. With
+tree_costs=True, ingredients are priced at their cheapest buy-or-craft cost
+(see calculate_tree_costs) and a price change propagates transitively up the
+recipe graph; otherwise only recipes using the material directly change.
+The ranking is a bisect-maintained sorted list, so only changed rows move.
+
+Requirements: none
+Usage:
+    model = CraftingModel()
+    for change in model.set_price("Mod Components", 2000):
+        print(change["name"], change["before"]["profit"], "->", change["after"]["profit"])
+    top = model.ranking()[:10]
+
+    python arc_raiders_crafting_model.py "Mod Components" 2000 [--tree-costs]
+"""
+
+import argparse
+import heapq
+from bisect import bisect_left, insort
+
+from arc_raiders_crafting_profit import (
+    material_values, recipes, build_recipe_graph, crafting_row
+)
+
+
+class CraftingModel:
+    """In-memory crafting rows with incremental updates on price changes."""
+
+    def __init__(self, recipe_list=None, values=None, tree_costs=False):
+        self.recipe_list = list(recipes if recipe_list is None else recipe_list)
+        self.values = dict(material_values if values is None else values)
+        self.tree_costs = tree_costs
+
+        index, order = build_recipe_graph(self.recipe_list)
+        self.position = {name: pos for pos, name in enumerate(order)}
+        self.producers = {}  # item -> recipe rows that craft it
+        self.users = {}      # material -> recipe rows that consume it
+        for row, (name, sell_value, recipe, bench, notes) in enumerate(self.recipe_list):
+            self.producers.setdefault(name, []).append(row)
+            for material, qty in recipe:
+                self.users.setdefault(material, []).append(row)
+
+        self.unit_costs = {}
+        self.rows = [None] * len(self.recipe_list)
+        for name in order:
+            for row in self.producers[name]:
+                self.rows[row] = self._build_row(row)
+            if tree_costs:
+                self.unit_costs[name] = self._item_cost(name)
+        self._ranking = sorted(self._rank_key(row) for row in range(len(self.rows)))
+
+    def _unit_price(self, material):
+        if material in self.unit_costs:
+            return self.unit_costs[material]
+        if material in self.values:
+            return self.values[material]
+        print(f"WARNING: Unknown material '{material}' - using default value 500")
+        return 500
+
+    def _build_row(self, row):
+        name, sell_value, recipe, bench, notes = self.recipe_list[row]
+        cost = sum(self._unit_price(material) * qty for material, qty in recipe)
+        return crafting_row(name, sell_value, recipe, bench, notes, cost)
+
+    def _item_cost(self, name):
+        """Cheapest of buying `name` or crafting it with any of its recipes."""
+        cost = min(self.rows[row]["material_cost"] for row in self.producers[name])
+        if name in self.values:
+            cost = min(cost, self.values[name])
+        return cost
+
+    def _rank_key(self, row):
+        return (-self.rows[row]["profit"], row)
+
+    def ranking(self):
+        """Return all rows, most profitable first."""
+        return [self.rows[row] for _, row in self._ranking]
+
+    def rank_of(self, row):
+        """0-based position of a recipe row in the profit ranking."""
+        return bisect_left(self._ranking, self._rank_key(row))
+
+    def affected_recipes(self, material):
+        """Recipe names whose cost can depend on `material`, in topological order."""
+        seen, stack = set(), [material]
+        while stack:
+            item = stack.pop()
+            for row in self.users.get(item, ()):
+                name = self.recipe_list[row][0]
+                if name not in seen:
+                    seen.add(name)
+                    if self.tree_costs:
+                        stack.append(name)
+        return sorted(seen, key=self.position.get)
+
+    def set_price(self, material, value):
+        """Update one material price and return the rows that changed.
+
+        Each change is {"row", "name", "before", "after", "rank"} where rank is
+        the row's new 0-based position in the profit ranking.
+        """
+        self.values[material] = value
+        changed = {}
+        dirty = set()
+        # Walk affected items in topological order so ingredients settle first
+        heap = [(self.position.get(material, -1), material)]
+        visited = set()
+        while heap:
+            _, item = heapq.heappop(heap)
+            if item in visited:
+                continue
+            visited.add(item)
+
+            for row in self.producers.get(item, ()):
+                if row in dirty:
+                    self._update_row(row, changed)
+
+            propagate = item == material
+            if self.tree_costs and item in self.producers:
+                new_cost = self._item_cost(item)
+                if new_cost != self.unit_costs[item]:
+                    self.unit_costs[item] = new_cost
+                    propagate = True
+            if propagate:
+                for row in self.users.get(item, ()):
+                    dirty.add(row)
+                    output = self.recipe_list[row][0]
+                    heapq.heappush(heap, (self.position[output], output))
+
+        return [
+            {"row": row, "name": after["name"], "before": before, "after": after,
+             "rank": self.rank_of(row)}
+            for row, (before, after) in sorted(changed.items())
+        ]
+
+    def _update_row(self, row, changed):
+        before = self.rows[row]
+        after = self._build_row(row)
+        if after == before:
+            return
+        # Re-sort only this row: drop its old key and insert the new one
+        old_key = self._rank_key(row)
+        del self._ranking[bisect_left(self._ranking, old_key)]
+        self.rows[row] = after
+        insort(self._ranking, self._rank_key(row))
+        first = changed.get(row, (before, None))[0]
+        changed[row] = (first, after)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show which crafting rows change for a new material price")
+    parser.add_argument("material")
+    parser.add_argument("price", type=int)
+    parser.add_argument("--tree-costs", action="store_true",
+                        help="price ingredients at their cheapest buy-or-craft cost")
+    args = parser.parse_args()
+
+    model = CraftingModel(tree_costs=args.tree_costs)
+    changes = model.set_price(args.material, args.price)
+    print(f"{args.material} -> ${args.price:,}: {len(changes)} of {len(model.rows)} recipes changed")
+    for change in changes:
+        before, after = change["before"], change["after"]
+        print(f"  #{change['rank'] + 1:>3} {change['name']}: "
+              f"profit ${before['profit']:,} -> ${after['profit']:,}")
@@ -5,18 +5,27 @@ Analyzes all crafting recipes to determine profit/loss when selling crafted item
 Data sourced from ARCTracker.io (December 2025)
 
 Requirements: pip install openpyxl
-Usage: python arc_raiders_crafting_profit.py
+Usage: python arc_raiders_crafting_profit.py [--stream] [--loot-prices] [--output FILE]
+           [--recipes recipes.json|csv] [--materials materials.json|csv] [--trace FILE [--profile]]
 Output: arc_raiders_crafting_profit.xlsx
 
 To update recipes:
 1. Edit the material_values dict to adjust material sell prices
 2. Edit the recipes list to add/modify crafting recipes
 3. Run the script to regenerate the spreadsheet
+Or keep the data in JSON/CSV files (see arc_raiders_data.py) and pass
+--recipes/--materials; parsed files are cached for fast repeat runs.
+--trace writes the time (and with --profile, memory) spent in each phase of
+the spreadsheet build; see perf_trace.py.
 """
 
+import argparse
+
 from openpyxl import Workbook
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 
+import perf_trace
+
 # Material sell values - verified from MetaForge loot tiers + ARCTracker
 # Adjust these values if game patches change sell prices
 material_values = {
@@ -185,12 +194,18 @@ recipes = [
 ]
 
 
-def calculate_material_cost(recipe):
-    """Calculate total material cost for a recipe."""
+def calculate_material_cost(recipe, values=None):
+    """Calculate total material cost for a recipe.
+
+    `values` is any name -> price mapping (a dict or a LootCatalog);
+    defaults to material_values.
+    """
+    if values is None:
+        values = material_values
     total = 0
     for material, qty in recipe:
-        if material in material_values:
-            total += material_values[material] * qty
+        if material in values:
+            total += values[material] * qty
         else:
             print(f"WARNING: Unknown material '{material}' - using default value 500")
             total += 500 * qty
@@ -202,29 +217,114 @@ def get_material_string(recipe):
     return ", ".join([f"{qty}× {mat}" for mat, qty in recipe])
 
 
-def create_crafting_spreadsheet(output_path="arc_raiders_crafting_profit.xlsx"):
-    """Generate the crafting profitability spreadsheet."""
-    
-    # Calculate all items
+def build_recipe_graph(recipe_list=None):
+    """Index recipes by item and return (index, topological order of crafted items).
+
+    Ingredients always appear before the items that use them. Raises
+    ValueError if the recipes contain a cycle.
+    """
+    if recipe_list is None:
+        recipe_list = recipes
+
+    index = {}
+    for name, sell_value, recipe, bench, notes in recipe_list:
+        index.setdefault(name, []).append(recipe)
+
+    # Kahn's algorithm over crafted items only - raw materials are leaves
+    pending = {name: 0 for name in index}
+    users = {name: [] for name in index}
+    for name, variants in index.items():
+        for material in {mat for recipe in variants for mat, qty in recipe}:
+            if material in index:
+                pending[name] += 1
+                users[material].append(name)
+
+    order = [name for name, count in pending.items() if count == 0]
+    for name in order:
+        for user in users[name]:
+            pending[user] -= 1
+            if pending[user] == 0:
+                order.append(user)
+
+    if len(order) != len(index):
+        cyclic = sorted(name for name, count in pending.items() if count > 0)
+        raise ValueError(f"Recipe cycle detected among: {', '.join(cyclic)}")
+
+    return index, order
+
+
+def calculate_tree_costs(recipe_list=None, values=None):
+    """Resolve the cheapest cost of every crafted item down to raw materials.
+
+    Each item is priced once, in topological order, as the cheaper of buying
+    it at its material value or crafting it from its cheapest recipe.
+    Returns {item: {"cost", "source", "recipe"}} in topological order.
+    """
+    if values is None:
+        values = material_values
+    index, order = build_recipe_graph(recipe_list)
+
+    costs = {}
+    for name in order:
+        best_cost, best_recipe = None, None
+        for recipe in index[name]:
+            total = 0
+            for material, qty in recipe:
+                if material in costs:
+                    total += costs[material]["cost"] * qty
+                elif material in values:
+                    total += values[material] * qty
+                else:
+                    print(f"WARNING: Unknown material '{material}' - using default value 500")
+                    total += 500 * qty
+            if best_cost is None or total < best_cost:
+                best_cost, best_recipe = total, recipe
+
+        if name in values and values[name] <= best_cost:
+            costs[name] = {"cost": values[name], "source": "buy", "recipe": best_recipe}
+        else:
+            costs[name] = {"cost": best_cost, "source": "craft", "recipe": best_recipe}
+    return costs
+
+
+def crafting_row(name, sell_value, recipe, bench, notes, material_cost):
+    """Build one spreadsheet row dict for a recipe with a known material cost."""
+    profit = sell_value - material_cost
+    profit_pct = (profit / material_cost * 100) if material_cost > 0 else 0
+    return {
+        "name": name,
+        "sell_value": sell_value,
+        "material_cost": material_cost,
+        "profit": profit,
+        "profit_pct": profit_pct,
+        "recipe": get_material_string(recipe),
+        "bench": bench,
+        "notes": notes,
+        "profitable": profit > 0
+    }
+
+
+def build_crafting_data(values=None):
+    """Calculate cost/profit for every recipe, most profitable first."""
     crafting_data = []
     for name, sell_value, recipe, bench, notes in recipes:
-        material_cost = calculate_material_cost(recipe)
-        profit = sell_value - material_cost
-        profit_pct = (profit / material_cost * 100) if material_cost > 0 else 0
-        crafting_data.append({
-            "name": name,
-            "sell_value": sell_value,
-            "material_cost": material_cost,
-            "profit": profit,
-            "profit_pct": profit_pct,
-            "recipe": get_material_string(recipe),
-            "bench": bench,
-            "notes": notes,
-            "profitable": profit > 0
-        })
+        material_cost = calculate_material_cost(recipe, values)
+        crafting_data.append(crafting_row(name, sell_value, recipe, bench, notes, material_cost))
     
     # Sort by profit
     crafting_data.sort(key=lambda x: x["profit"], reverse=True)
+    return crafting_data
+
+
+def create_crafting_spreadsheet(output_path="arc_raiders_crafting_profit.xlsx", values=None):
+    """Generate the crafting profitability spreadsheet."""
+    if values is None:
+        values = material_values
+    phase = perf_trace.phases("crafting.sheet")
+    
+    # Calculate all items
+    phase("compute", recipes=len(recipes))
+    crafting_data = build_crafting_data(values)
     
     # Create workbook
     wb = Workbook()
@@ -245,6 +345,7 @@ def create_crafting_spreadsheet(output_path="arc_raiders_crafting_profit.xlsx"):
     )
     
     # Sheet 1: Profitable Items
+    phase("profitable")
     ws_profit = wb.active
     ws_profit.title = "Profitable Crafts"
     
@@ -280,6 +381,7 @@ def create_crafting_spreadsheet(output_path="arc_raiders_crafting_profit.xlsx"):
     ws_profit.column_dimensions['G'].width = 14
     
     # Sheet 2: All Items
+    phase("all")
     ws_all = wb.create_sheet("All Crafts")
     for col, header in enumerate(headers, 1):
         cell = ws_all.cell(row=1, column=col, value=header)
@@ -313,6 +415,7 @@ def create_crafting_spreadsheet(output_path="arc_raiders_crafting_profit.xlsx"):
     ws_all.column_dimensions['G'].width = 14
     
     # Sheet 3: Material Values
+    phase("materials")
     ws_mats = wb.create_sheet("Material Values")
     ws_mats.cell(row=1, column=1, value="Material").font = header_font
     ws_mats.cell(row=1, column=1).fill = header_fill_blue
@@ -321,7 +424,7 @@ def create_crafting_spreadsheet(output_path="arc_raiders_crafting_profit.xlsx"):
     ws_mats.cell(row=1, column=3, value="Rarity").font = header_font
     ws_mats.cell(row=1, column=3).fill = header_fill_blue
     
-    sorted_mats = sorted(material_values.items(), key=lambda x: -x[1])
+    sorted_mats = sorted(values.items(), key=lambda x: -x[1])
     row = 2
     for mat, val in sorted_mats:
         ws_mats.cell(row=row, column=1, value=mat).border = thin_border
@@ -340,6 +443,7 @@ def create_crafting_spreadsheet(output_path="arc_raiders_crafting_profit.xlsx"):
     ws_mats.column_dimensions['C'].width = 15
     
     # Sheet 4: Summary
+    phase("summary")
     ws_summary = wb.create_sheet("Summary")
     ws_summary['A1'] = "Arc Raiders Crafting Profitability Analysis"
     ws_summary['A1'].font = Font(bold=True, size=14)
@@ -368,8 +472,36 @@ def create_crafting_spreadsheet(output_path="arc_raiders_crafting_profit.xlsx"):
     ws_summary['A29'] = "• Heavy Fuze Grenade costs $1,600 = break-even"
     
     ws_summary.column_dimensions['A'].width = 80
-    
+
+    # Sheet 5: Full crafting tree cost (buy vs craft at every level)
+    phase("tree")
+    ws_tree = wb.create_sheet("Crafting Tree Cost")
+    tree_headers = ["Item Name", "Market Value", "Tree Cost", "Best Source"]
+    for col, header in enumerate(tree_headers, 1):
+        cell = ws_tree.cell(row=1, column=col, value=header)
+        cell.font = header_font
+        cell.fill = header_fill_blue
+        cell.alignment = center_align
+        cell.border = thin_border
+
+    row = 2
+    for name, entry in calculate_tree_costs(values=values).items():
+        ws_tree.cell(row=row, column=1, value=name).alignment = left_align
+        ws_tree.cell(row=row, column=2, value=values.get(name)).number_format = currency_format
+        ws_tree.cell(row=row, column=3, value=entry["cost"]).number_format = currency_format
+        ws_tree.cell(row=row, column=4, value=entry["source"].title()).alignment = center_align
+        for col in range(1, 5):
+            ws_tree.cell(row=row, column=col).border = thin_border
+        row += 1
+
+    ws_tree.column_dimensions['A'].width = 32
+    ws_tree.column_dimensions['B'].width = 14
+    ws_tree.column_dimensions['C'].width = 12
+    ws_tree.column_dimensions['D'].width = 12
+
+    phase("save")
     wb.save(output_path)
+    phase.end()
     
     print(f"Created {output_path} with {len(crafting_data)} recipes")
     print(f"Profitable: {len(profitable_items)}")
@@ -380,5 +512,148 @@ def create_crafting_spreadsheet(output_path="arc_raiders_crafting_profit.xlsx"):
         print(f"  {item['name']}: ${item['profit']:,} ({item['profit_pct']:.0f}%)")
 
 
+def stream_crafting_spreadsheet(output_path="arc_raiders_crafting_profit.xlsx", values=None):
+    """Generate the same spreadsheet through the write-only streaming exporter.
+
+    Rows are emitted one at a time from generators with pre-registered named
+    styles, so memory stays flat for very large recipe databases.
+    """
+    from spreadsheet_stream import StreamingWorkbook
+
+    if values is None:
+        values = material_values
+    phase = perf_trace.phases("crafting.stream")
+    phase("compute", recipes=len(recipes))
+    crafting_data = build_crafting_data(values)
+    profitable_items = [item for item in crafting_data if item["profitable"]]
+
+    book = StreamingWorkbook()
+    book.add_style_family("profit", fill_color="C8E6C9")
+    book.add_style_family("loss", fill_color="FFCDD2")
+    book.add_style_family("breakeven", fill_color="FFF9C4")
+    book.add_style_family("plain")
+
+    headers = ["Item Name", "Sell Value", "Material Cost", "Profit", "Profit %", "Recipe", "Bench"]
+    widths = {"A": 26, "B": 12, "C": 14, "D": 10, "E": 10, "F": 55, "G": 14}
+
+    def item_rows(items):
+        for item in items:
+            yield (item["name"], item["sell_value"], item["material_cost"], item["profit"],
+                   round(item["profit_pct"], 1), item["recipe"], item["bench"])
+
+    def row_styles(prefix):
+        return [f"{prefix}_wrap", f"{prefix}_currency", f"{prefix}_currency", f"{prefix}_currency",
+                f"{prefix}_plain", f"{prefix}_wrap", f"{prefix}_center"]
+
+    # Sheet 1: Profitable Items
+    phase("profitable")
+    ws_profit = book.add_sheet("Profitable Crafts", widths)
+    ws_profit.append(headers, "header_green")
+    ws_profit.write_rows(item_rows(profitable_items), row_styles("profit"))
+
+    # Sheet 2: All Items
+    phase("all")
+    ws_all = book.add_sheet("All Crafts", widths)
+    ws_all.append(headers, "header_blue")
+    for row_values, item in zip(item_rows(crafting_data), crafting_data):
+        prefix = "profit" if item["profit"] > 0 else ("breakeven" if item["profit"] == 0 else "loss")
+        ws_all.append(row_values, row_styles(prefix))
+
+    # Sheet 3: Material Values
+    phase("materials")
+    ws_mats = book.add_sheet("Material Values", {"A": 32, "B": 12, "C": 15})
+    ws_mats.append(["Material", "Sell Value", "Rarity"], "header_blue")
+
+    def material_rows():
+        for mat, val in sorted(values.items(), key=lambda x: -x[1]):
+            if val >= 5000: rarity = "Epic/Legendary"
+            elif val >= 1000: rarity = "Rare"
+            elif val >= 500: rarity = "Uncommon"
+            else: rarity = "Common"
+            yield mat, val, rarity
+
+    ws_mats.write_rows(material_rows(), ["plain_plain", "plain_currency", "plain_plain"])
+
+    # Sheet 4: Summary
+    phase("summary")
+    breakeven_count = len([i for i in crafting_data if i['profit'] == 0])
+    loss_count = len([i for i in crafting_data if i['profit'] < 0])
+    ws_summary = book.add_sheet("Summary", {"A": 80})
+    ws_summary.append(["Arc Raiders Crafting Profitability Analysis"], "title")
+    ws_summary.append(["Data Source: ARCTracker.io (Dec 2025)"])
+    ws_summary.pad_to(4)
+    ws_summary.append(["Statistics:"], "bold")
+    ws_summary.append([f"Total recipes analyzed: {len(crafting_data)}"])
+    ws_summary.append([f"Profitable crafts: {len(profitable_items)}"])
+    ws_summary.append([f"Break-even crafts: {breakeven_count}"])
+    ws_summary.append([f"Loss-making crafts: {loss_count}"])
+    ws_summary.pad_to(10)
+    ws_summary.append(["Top 10 Most Profitable Crafts:"], "bold")
+    ws_summary.write_rows(
+        [f"{item['name']}: ${item['profit']:,} profit ({item['profit_pct']:.0f}%)"]
+        for item in profitable_items[:10]
+    )
+    ws_summary.pad_to(22)
+    ws_summary.append(["Key Findings:"], "bold")
+    ws_summary.write_rows([
+        ["• Tempest I is the most profitable weapon craft (only needs 2x Adv Mech + 1x Med Gun Parts)"],
+        ["• Tier II attachments (Grips, Stocks, etc.) are consistently profitable"],
+        ["• Light Sticks are extremely profitable at 327% ROI"],
+        ["• Gun Parts (Light/Medium/Heavy) are LOSSES - sell Simple Gun Parts instead"],
+        ["• Legendary weapons (Jupiter, Equalizer, Aphelion) are massive losses - keep them!"],
+        ["• Wolfpack now costs $5,000 in materials = break-even after patch"],
+        ["• Heavy Fuze Grenade costs $1,600 = break-even"],
+    ])
+
+    # Sheet 5: Full crafting tree cost
+    phase("tree")
+    ws_tree = book.add_sheet("Crafting Tree Cost", {"A": 32, "B": 14, "C": 12, "D": 12})
+    ws_tree.append(["Item Name", "Market Value", "Tree Cost", "Best Source"], "header_blue")
+    ws_tree.write_rows(
+        ((name, values.get(name), entry["cost"], entry["source"].title())
+         for name, entry in calculate_tree_costs(values=values).items()),
+        ["plain_text", "plain_currency", "plain_currency", "plain_center"],
+    )
+
+    phase("save")
+    book.save(output_path)
+    phase.end()
+
+    print(f"Created {output_path} with {len(crafting_data)} recipes (streaming)")
+    print(f"Profitable: {len(profitable_items)}")
+    print(f"Break-even: {breakeven_count}")
+    print(f"Loss: {loss_count}")
+
+
 if __name__ == "__main__":
-    create_crafting_spreadsheet()
+    parser = argparse.ArgumentParser(description="Generate the crafting profitability spreadsheet")
+    parser.add_argument("--output", default="arc_raiders_crafting_profit.xlsx")
+    parser.add_argument("--stream", action="store_true",
+                        help="use the write-only streaming exporter (bounded memory)")
+    parser.add_argument("--loot-prices", action="store_true",
+                        help="price materials from the shared loot catalog, falling back to material_values")
+    parser.add_argument("--recipes", help="load recipes from a JSON/CSV file (cached after first load)")
+    parser.add_argument("--materials", help="load material values from a JSON/CSV file (cached after first load)")
+    perf_trace.add_arguments(parser)
+    args = parser.parse_args()
+    perf_trace.from_args(args)
+
+    # Swap the data in place so every module sharing these objects sees it
+    if args.recipes or args.materials:
+        from arc_raiders_data import load_dataset
+        if args.recipes:
+            recipes[:] = load_dataset(args.recipes, "recipes")
+        if args.materials:
+            material_values.clear()
+            material_values.update(load_dataset(args.materials, "materials"))
+
+    values = material_values
+    if args.loot_prices:
+        from collections import ChainMap
+        from arc_raiders_loot_values import load_catalog
+        values = ChainMap(load_catalog(), material_values)
+
+    if args.stream:
+        stream_crafting_spreadsheet(args.output, values)
+    else:
+        create_crafting_spreadsheet(args.output, values)
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Arc Raiders Data Loader
+Loads recipes, material values and loot items from JSON or CSV files instead
+of in-source Python literals, and compiles each file once into a binary cache.
+
+The cache sits next to the source in __pycache__/<file>.<kind>.arcdata and is
+keyed by the source's size + mtime, with a content hash as a fallback check
+(so a touched but unchanged file is not re-parsed). Cached data is stored with
+marshal, which loads tuples/strings/ints far faster than JSON/CSV parsing.
+
+Requirements: none
+Usage:
+    recipes = load_dataset("recipes.csv", "recipes")
+    python arc_raiders_data.py export data/     # write current data as JSON + CSV
+
+File formats:
+    recipes   JSON: [{"name", "sell_value", "materials": {"Mat": qty}, "bench", "notes"}]
+              CSV:  name,sell_value,materials,bench,notes  (materials = "Mat:qty;Mat:qty")
+    materials JSON: {"Metal Parts": 50, ...}
+              CSV:  name,value
+    loot      JSON: [{"name", "value", "category"}]
+              CSV:  name,value,category
+"""
+
+import csv
+import hashlib
+import json
+import marshal
+import os
+import sys
+
+import perf_trace
+
+CACHE_MAGIC = b"ARCDATA1"
+KINDS = ("recipes", "materials", "loot")
+
+
+def _read_rows(path):
+    """Return a list of dict rows (CSV) or the decoded JSON document."""
+    if path.lower().endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            return list(csv.DictReader(f))
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _parse_materials(field):
+    """Parse 'Mat:qty;Mat:qty' (CSV) or {"Mat": qty} / [["Mat", qty]] (JSON)."""
+    if isinstance(field, dict):
+        return [(mat, int(qty)) for mat, qty in field.items()]
+    if isinstance(field, list):
+        return [(mat, int(qty)) for mat, qty in field]
+    materials = []
+    for part in field.split(";"):
+        if part.strip():
+            mat, _, qty = part.rpartition(":")
+            materials.append((mat.strip(), int(qty)))
+    return materials
+
+
+def parse_dataset(path, kind):
+    """Parse a JSON/CSV source file without touching the cache."""
+    data = _read_rows(path)
+    if kind == "recipes":
+        return [
+            (row["name"], int(row["sell_value"]), _parse_materials(row["materials"]),
+             row.get("bench", ""), row.get("notes", "") or "")
+            for row in data
+        ]
+    if kind == "materials":
+        if isinstance(data, dict):
+            return {name: int(value) for name, value in data.items()}
+        return {row["name"]: int(row["value"]) for row in data}
+    if kind == "loot":
+        return [(row["name"], int(row["value"]), row["category"]) for row in data]
+    raise ValueError(f"Unknown dataset kind '{kind}' (expected one of {', '.join(KINDS)})")
+
+
+def cache_path(path, kind):
+    folder, name = os.path.split(os.path.abspath(path))
+    return os.path.join(folder, "__pycache__", f"{name}.{kind}.arcdata")
+
+
+def _file_digest(path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.digest()
+
+
+def _read_cache(cached):
+    try:
+        with open(cached, "rb") as f:
+            if f.read(len(CACHE_MAGIC)) != CACHE_MAGIC:
+                return None
+            return marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+
+
+def _write_cache(cached, entry):
+    os.makedirs(os.path.dirname(cached), exist_ok=True)
+    tmp = f"{cached}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(CACHE_MAGIC)
+            f.write(marshal.dumps(entry))
+        os.replace(tmp, cached)
+    except OSError:
+        # A read-only data directory just means no cache
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+@perf_trace.traced("data.load")
+def load_dataset(path, kind, use_cache=True):
+    """Load a dataset, compiling it into the binary cache on first use."""
+    if not use_cache:
+        return parse_dataset(path, kind)
+
+    stat = os.stat(path)
+    cached = cache_path(path, kind)
+    entry = _read_cache(cached)
+    if entry is not None:
+        size, mtime_ns, digest, payload = entry
+        if size == stat.st_size and mtime_ns == stat.st_mtime_ns:
+            perf_trace.count("data.cache_hits")
+            return payload
+        current = _file_digest(path)
+        if digest == current:
+            # Touched but unchanged: refresh the key without re-parsing
+            _write_cache(cached, (stat.st_size, stat.st_mtime_ns, digest, payload))
+            perf_trace.count("data.cache_hits")
+            return payload
+    else:
+        current = _file_digest(path)
+
+    payload = parse_dataset(path, kind)
+    perf_trace.count("data.cache_misses")
+    _write_cache(cached, (stat.st_size, stat.st_mtime_ns, current, payload))
+    return payload
+
+
+def export_builtin_data(folder):
+    """Write the in-source datasets to JSON and CSV files in `folder`."""
+    from arc_raiders_crafting_profit import material_values, recipes
+    from arc_raiders_loot_values import LOOT_ITEMS
+
+    os.makedirs(folder, exist_ok=True)
+    with open(os.path.join(folder, "recipes.json"), "w", encoding="utf-8") as f:
+        json.dump([
+            {"name": name, "sell_value": sell_value, "materials": dict(recipe),
+             "bench": bench, "notes": notes}
+            for name, sell_value, recipe, bench, notes in recipes
+        ], f, indent=2, ensure_ascii=False)
+    with open(os.path.join(folder, "materials.json"), "w", encoding="utf-8") as f:
+        json.dump(material_values, f, indent=2, ensure_ascii=False)
+    with open(os.path.join(folder, "loot.json"), "w", encoding="utf-8") as f:
+        json.dump([{"name": n, "value": v, "category": c} for n, v, c in LOOT_ITEMS],
+                  f, indent=2, ensure_ascii=False)
+
+    with open(os.path.join(folder, "recipes.csv"), "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["name", "sell_value", "materials", "bench", "notes"])
+        for name, sell_value, recipe, bench, notes in recipes:
+            writer.writerow([name, sell_value, ";".join(f"{m}:{q}" for m, q in recipe), bench, notes])
+    with open(os.path.join(folder, "materials.csv"), "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["name", "value"])
+        writer.writerows(material_values.items())
+    with open(os.path.join(folder, "loot.csv"), "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["name", "value", "category"])
+        writer.writerows(LOOT_ITEMS)
+    print(f"Exported recipes, materials and loot to {folder}/ (JSON + CSV)")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "export":
+        export_builtin_data(sys.argv[2])
+    else:
+        print("Usage: python arc_raiders_data.py export <folder>")
+        sys.exit(1)
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Arc Raiders Loot Catalog
+Compact, indexed store of lootable items shared by the loot and crafting scripts.
+
+Items live in parallel array-backed columns (name, value, category id) with:
+  - a name -> row hash index for O(1) price lookups
+  - a value-sorted index for bisect range ("worth between X and Y") and top-k queries
+  - tiers computed from configurable value thresholds rather than hand-placed lists
+
+The catalog is a read-only Mapping of item name -> sell value, so it can be
+passed anywhere a material_values dict is expected.
+
+Requirements: none
+Usage:
+    catalog = LootCatalog(LOOT_ITEMS)
+    catalog["Power Rod"]               # 5500
+    catalog.between(1000, 2000)        # [(name, value, tier, category), ...]
+    catalog.top(10)
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Mapping
+
+# (tier, minimum sell value), highest tier first
+DEFAULT_TIER_THRESHOLDS = (
+    ("S", 5000),
+    ("A", 2500),
+    ("B", 1000),
+    ("C", 500),
+    ("D", 0),
+)
+
+
+class LootCatalog(Mapping):
+    """Column-oriented loot database indexed by name and by value."""
+
+    __slots__ = ("names", "values", "category_ids", "category_names", "thresholds",
+                 "_index", "_category_index", "_by_value", "_sorted_values")
+
+    def __init__(self, items=(), thresholds=DEFAULT_TIER_THRESHOLDS):
+        self.names = []
+        self.values = array("q")
+        self.category_ids = array("H")
+        self.category_names = []
+        self.thresholds = tuple(sorted(thresholds, key=lambda t: -t[1]))
+        self._index = {}
+        self._category_index = {}
+        self._by_value = None
+        self._sorted_values = None
+        for name, value, category in items:
+            self.add(name, value, category)
+
+    def add(self, name, value, category):
+        """Add an item, or update its value/category if the name already exists."""
+        cat_id = self._category_index.get(category)
+        if cat_id is None:
+            cat_id = self._category_index[category] = len(self.category_names)
+            self.category_names.append(category)
+
+        row = self._index.get(name)
+        if row is None:
+            self._index[name] = len(self.names)
+            self.names.append(name)
+            self.values.append(value)
+            self.category_ids.append(cat_id)
+        else:
+            self.values[row] = value
+            self.category_ids[row] = cat_id
+        self._by_value = None  # value index is rebuilt on the next range query
+
+    # Mapping interface: name -> sell value
+    def __getitem__(self, name):
+        return self.values[self._index[name]]
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+    def tier_of(self, value):
+        for tier, minimum in self.thresholds:
+            if value >= minimum:
+                return tier
+        return self.thresholds[-1][0]
+
+    def row(self, row):
+        """Return (name, value, tier, category) for a row number."""
+        value = self.values[row]
+        return (self.names[row], value, self.tier_of(value),
+                self.category_names[self.category_ids[row]])
+
+    def lookup(self, name):
+        """Return (name, value, tier, category) for an item, or None."""
+        row = self._index.get(name)
+        return None if row is None else self.row(row)
+
+    def _value_index(self):
+        if self._by_value is None:
+            # Stable sort on -value keeps insertion order among equal values
+            order = sorted(range(len(self.names)), key=lambda r: -self.values[r])
+            self._by_value = array("l", order)
+            self._sorted_values = array("q", (-self.values[r] for r in order))
+        return self._by_value, self._sorted_values
+
+    def items_by_value(self):
+        """All items as (name, value, tier, category), most valuable first."""
+        order, _ = self._value_index()
+        return [self.row(r) for r in order]
+
+    def between(self, low, high):
+        """Items worth low..high inclusive, most valuable first."""
+        order, neg_values = self._value_index()
+        start = bisect_left(neg_values, -high)
+        stop = bisect_right(neg_values, -low)
+        return [self.row(r) for r in order[start:stop]]
+
+    def top(self, k):
+        order, _ = self._value_index()
+        return [self.row(r) for r in order[:k]]
+
+    def by_category(self):
+        """{category: [(name, value, tier), ...]} with each list most valuable first."""
+        categories = {}
+        for name, value, tier, category in self.items_by_value():
+            categories.setdefault(category, []).append((name, value, tier))
+        return categories
+
+    def tier_stats(self):
+        """{tier: (count, min value, max value)} for every configured tier, best first."""
+        stats = {tier: [0, None, None] for tier, minimum in self.thresholds}
+        for value in self.values:
+            entry = stats[self.tier_of(value)]
+            entry[0] += 1
+            entry[1] = value if entry[1] is None else min(entry[1], value)
+            entry[2] = value if entry[2] is None else max(entry[2], value)
+        return {tier: tuple(entry) for tier, entry in stats.items()}
@@ -5,17 +5,25 @@ Creates a spreadsheet with all lootable items organized by tier and value.
 Data sourced from MetaForge community database (metaforge.app/arc-raiders)
 
 Requirements: pip install openpyxl
-Usage: python arc_raiders_loot_values.py
+Usage: python arc_raiders_loot_values.py [--stream] [--output FILE] [--loot loot.json|csv]
+           [--trace FILE [--profile]]
 Output: arc_raiders_loot_values.xlsx
+--trace writes the time spent in each phase of the build; see perf_trace.py.
 """
 
+import argparse
+
 from openpyxl import Workbook
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 
-# Loot items organized by tier
+import perf_trace
+from arc_raiders_loot_catalog import LootCatalog
+
+# Loot items, most valuable first. Tiers are assigned from TIER_THRESHOLDS.
 # Format: (Item Name, Sell Value, Category)
 
-S_TIER = [  # 5,000+ coins - Legendary/Epic drops
+LOOT_ITEMS = [
+    # 5,000+ coins - Legendary/Epic drops
     ("Snap Hook", 14000, "Utility"),
     ("Queen Reactor", 13000, "ARC Part"),
     ("Matriarch Reactor", 13000, "ARC Part"),
@@ -46,18 +54,16 @@ S_TIER = [  # 5,000+ coins - Legendary/Epic drops
     ("Extended Barrel", 5000, "Attachment"),
     ("Shotgun Silencer", 5000, "Attachment"),
     ("Lightweight Stock", 5000, "Attachment"),
-]
 
-A_TIER = [  # 3,000-3,500 coins - Rare drops
+    # 3,000-3,500 coins - Rare drops
     ("Osprey I", 3500, "Weapon"),
     ("Torrente I", 3500, "Weapon"),
     ("Venator I", 3500, "Weapon"),
     ("Renegade I", 3500, "Weapon"),
     ("Complex Gun Parts", 3000, "Material"),
     ("Exodus Modules", 2750, "ARC Part"),
-]
 
-B_TIER = [  # 1,000-2,880 coins - Uncommon valuable
+    # 1,000-2,880 coins - Uncommon valuable
     ("Raider Hatch Key", 2000, "Key"),
     ("Anvil I", 2000, "Weapon"),
     ("Il Toro I", 2000, "Weapon"),
@@ -86,9 +92,8 @@ B_TIER = [  # 1,000-2,880 coins - Uncommon valuable
     ("Tagging Grenade", 1000, "Grenade"),
     ("Zipline", 1000, "Utility"),
     ("Trigger 'Nade", 1000, "Grenade"),
-]
 
-C_TIER = [  # 500-850 coins - Common valuable
+    # 500-850 coins - Common valuable
     ("Jolt Mine", 850, "Trap"),
     ("Shrapnel Grenade", 800, "Grenade"),
     ("Snap Blast Grenade", 800, "Grenade"),
@@ -122,9 +127,8 @@ C_TIER = [  # 500-850 coins - Common valuable
     ("Kettle I", 500, "Weapon"),
     ("Rattler I", 500, "Weapon"),
     ("Stitcher I", 500, "Weapon"),
-]
 
-D_TIER = [  # 50-470 coins - Basic materials
+    # 50-470 coins - Basic materials
     ("Simple Gun Parts", 330, "Material"),
     ("Duct Tape", 300, "Material"),
     ("Steel Spring", 300, "Material"),
@@ -148,7 +152,38 @@ D_TIER = [  # 50-470 coins - Basic materials
     ("Chemicals", 50, "Material"),
 ]
 
+# (Tier, minimum sell value) - adjust to re-bucket every item at once
+TIER_THRESHOLDS = [
+    ("S", 5000),
+    ("A", 2500),
+    ("B", 1000),
+    ("C", 500),
+    ("D", 0),
+]
+
+TIER_LABELS = {
+    "S": "S-Tier (Legendary)",
+    "A": "A-Tier (Epic)",
+    "B": "B-Tier (Rare)",
+    "C": "C-Tier (Uncommon)",
+    "D": "D-Tier (Common)",
+}
+
+def load_catalog(items=None):
+    """Build the indexed loot catalog from LOOT_ITEMS and TIER_THRESHOLDS."""
+    return LootCatalog(LOOT_ITEMS if items is None else items, TIER_THRESHOLDS)
+
+def tier_breakdown(catalog):
+    """Return (label, value range, count) per tier for the summary sheet."""
+    breakdown = []
+    for tier, (count, low, high) in catalog.tier_stats().items():
+        value_range = f"${low:,} - ${high:,}" if count else "-"
+        breakdown.append((TIER_LABELS.get(tier, f"{tier}-Tier"), value_range, count))
+    return breakdown
+
 def create_loot_spreadsheet(output_path="arc_raiders_loot_values.xlsx"):
+    phase = perf_trace.phases("loot.sheet")
+    phase("styles")
     wb = Workbook()
     
     # Styles
@@ -174,6 +209,7 @@ def create_loot_spreadsheet(output_path="arc_raiders_loot_values.xlsx"):
     header_fill = PatternFill("solid", fgColor="1565C0")
     
     # Sheet 1: All Items by Tier
+    phase("all")
     ws_all = wb.active
     ws_all.title = "All Loot by Tier"
     
@@ -185,13 +221,9 @@ def create_loot_spreadsheet(output_path="arc_raiders_loot_values.xlsx"):
         cell.alignment = center_align
         cell.border = thin_border
     
-    all_items = []
-    for tier_name, tier_data in [("S", S_TIER), ("A", A_TIER), ("B", B_TIER), ("C", C_TIER), ("D", D_TIER)]:
-        for item_name, value, category in tier_data:
-            all_items.append((item_name, value, tier_name, category))
-    
-    # Sort by value descending
-    all_items.sort(key=lambda x: -x[1])
+    with perf_trace.span("loot.load"):
+        catalog = load_catalog()
+        all_items = catalog.items_by_value()
     
     row = 2
     for item_name, value, tier, category in all_items:
@@ -211,6 +243,7 @@ def create_loot_spreadsheet(output_path="arc_raiders_loot_values.xlsx"):
     ws_all.column_dimensions['D'].width = 18
     
     # Sheet 2: Summary Statistics
+    phase("summary")
     ws_summary = wb.create_sheet("Summary")
     ws_summary['A1'] = "Arc Raiders Loot Value Database"
     ws_summary['A1'].font = Font(bold=True, size=14)
@@ -219,13 +252,7 @@ def create_loot_spreadsheet(output_path="arc_raiders_loot_values.xlsx"):
     ws_summary['A4'] = "Tier Breakdown:"
     ws_summary['A4'].font = Font(bold=True)
     
-    tier_stats = [
-        ("S-Tier (Legendary)", "$5,000 - $14,000", len(S_TIER)),
-        ("A-Tier (Epic)", "$2,750 - $3,500", len(A_TIER)),
-        ("B-Tier (Rare)", "$1,000 - $2,000", len(B_TIER)),
-        ("C-Tier (Uncommon)", "$500 - $850", len(C_TIER)),
-        ("D-Tier (Common)", "$50 - $470", len(D_TIER)),
-    ]
+    tier_stats = tier_breakdown(catalog)
     
     for i, (tier_name, value_range, count) in enumerate(tier_stats, 5):
         ws_summary[f'A{i}'] = tier_name
@@ -238,7 +265,7 @@ def create_loot_spreadsheet(output_path="arc_raiders_loot_values.xlsx"):
     ws_summary['A13'] = "Top 10 Most Valuable Items:"
     ws_summary['A13'].font = Font(bold=True)
     
-    top_items = sorted(all_items, key=lambda x: -x[1])[:10]
+    top_items = catalog.top(10)
     for i, (name, value, tier, cat) in enumerate(top_items, 14):
         ws_summary[f'A{i}'] = f"{name}: ${value:,} ({tier}-Tier)"
     
@@ -255,13 +282,10 @@ def create_loot_spreadsheet(output_path="arc_raiders_loot_values.xlsx"):
     ws_summary.column_dimensions['C'].width = 12
     
     # Sheet 3: By Category
+    phase("category")
     ws_cat = wb.create_sheet("By Category")
     
-    categories = {}
-    for item_name, value, tier, category in all_items:
-        if category not in categories:
-            categories[category] = []
-        categories[category].append((item_name, value, tier))
+    categories = catalog.by_category()
     
     for col, header in enumerate(["Item Name", "Sell Value", "Tier"], 1):
         cell = ws_cat.cell(row=1, column=col, value=header)
@@ -278,7 +302,7 @@ def create_loot_spreadsheet(output_path="arc_raiders_loot_values.xlsx"):
         row += 1
         
         # Items sorted by value
-        for item_name, value, tier in sorted(categories[category], key=lambda x: -x[1]):
+        for item_name, value, tier in categories[category]:
             ws_cat.cell(row=row, column=1, value=item_name).alignment = left_align
             ws_cat.cell(row=row, column=2, value=value).number_format = currency_format
             ws_cat.cell(row=row, column=3, value=tier).alignment = center_align
@@ -292,13 +316,102 @@ def create_loot_spreadsheet(output_path="arc_raiders_loot_values.xlsx"):
     ws_cat.column_dimensions['B'].width = 12
     ws_cat.column_dimensions['C'].width = 8
     
+    phase("save")
     wb.save(output_path)
+    phase.end()
     print(f"Created {output_path} with {len(all_items)} items")
-    print(f"  S-Tier: {len(S_TIER)} items")
-    print(f"  A-Tier: {len(A_TIER)} items")
-    print(f"  B-Tier: {len(B_TIER)} items")
-    print(f"  C-Tier: {len(C_TIER)} items")
-    print(f"  D-Tier: {len(D_TIER)} items")
+    for tier, (count, low, high) in catalog.tier_stats().items():
+        print(f"  {tier}-Tier: {count} items")
+
+def stream_loot_spreadsheet(output_path="arc_raiders_loot_values.xlsx"):
+    """Generate the same spreadsheet through the write-only streaming exporter.
+
+    Rows are emitted one at a time with pre-registered named styles, so
+    memory stays flat for very large item databases.
+    """
+    from spreadsheet_stream import StreamingWorkbook
+
+    phase = perf_trace.phases("loot.stream")
+    phase("load")
+    catalog = load_catalog()
+    all_items = catalog.items_by_value()
+
+    book = StreamingWorkbook()
+    tier_colors = {"S": "FFD700", "A": "C0C0C0", "B": "CD7F32", "C": "90EE90", "D": "D3D3D3"}
+    for tier, color in tier_colors.items():
+        book.add_style_family(f"tier_{tier}", fill_color=color)
+
+    def tier_styles(tier, columns):
+        styles = [f"tier_{tier}_text", f"tier_{tier}_currency", f"tier_{tier}_center", f"tier_{tier}_center"]
+        return styles[:columns]
+
+    # Sheet 1: All Items by Tier
+    phase("all")
+    ws_all = book.add_sheet("All Loot by Tier", {"A": 32, "B": 12, "C": 8, "D": 18})
+    ws_all.append(["Item Name", "Sell Value", "Tier", "Category"], "header_blue")
+    for item_name, value, tier, category in all_items:
+        ws_all.append((item_name, value, tier, category), tier_styles(tier, 4))
+
+    # Sheet 2: Summary Statistics
+    phase("summary")
+    ws_summary = book.add_sheet("Summary", {"A": 45, "B": 18, "C": 12})
+    ws_summary.append(["Arc Raiders Loot Value Database"], "title")
+    ws_summary.append(["Data Source: MetaForge Community Database (Dec 2025)"])
+    ws_summary.pad_to(4)
+    ws_summary.append(["Tier Breakdown:"], "bold")
+    ws_summary.write_rows(
+        [tier_name, value_range, f"{count} items"]
+        for tier_name, value_range, count in tier_breakdown(catalog)
+    )
+    ws_summary.pad_to(11)
+    ws_summary.append([f"Total Items: {len(all_items)}"], "bold")
+    ws_summary.pad_to(13)
+    ws_summary.append(["Top 10 Most Valuable Items:"], "bold")
+    ws_summary.write_rows(
+        [f"{name}: ${value:,} ({tier}-Tier)"] for name, value, tier, cat in catalog.top(10)
+    )
+    ws_summary.pad_to(25)
+    ws_summary.append(["Expedition Strategy Notes:"], "bold")
+    ws_summary.write_rows([
+        ["• Stash value = items + cash combined"],
+        ["• 1 million coins = 1 skill point (max 5 at 5 million)"],
+        ["• Prioritize S-tier ARC parts (Queen/Matriarch Reactor)"],
+        ["• Blueprints always sell for $5,000"],
+        ["• Snap Hook is the highest value item at $14,000"],
+    ])
+
+    # Sheet 3: By Category
+    phase("category")
+    categories = catalog.by_category()
+
+    ws_cat = book.add_sheet("By Category", {"A": 32, "B": 12, "C": 8})
+    ws_cat.append(["Item Name", "Sell Value", "Tier"], "header_blue")
+    for category in sorted(categories.keys()):
+        ws_cat.append([f"=== {category.upper()} ==="], "bold_large")
+        for item_name, value, tier in categories[category]:
+            ws_cat.append((item_name, value, tier), tier_styles(tier, 3))
+        ws_cat.append([])  # Blank row between categories
+
+    phase("save")
+    book.save(output_path)
+    phase.end()
+    print(f"Created {output_path} with {len(all_items)} items (streaming)")
 
 if __name__ == "__main__":
-    create_loot_spreadsheet()
+    parser = argparse.ArgumentParser(description="Generate the loot value spreadsheet")
+    parser.add_argument("--output", default="arc_raiders_loot_values.xlsx")
+    parser.add_argument("--stream", action="store_true",
+                        help="use the write-only streaming exporter (bounded memory)")
+    parser.add_argument("--loot", help="load loot items from a JSON/CSV file (cached after first load)")
+    perf_trace.add_arguments(parser)
+    args = parser.parse_args()
+    perf_trace.from_args(args)
+
+    if args.loot:
+        from arc_raiders_data import load_dataset
+        LOOT_ITEMS[:] = load_dataset(args.loot, "loot")
+
+    if args.stream:
+        stream_loot_spreadsheet(args.output)
+    else:
+        create_loot_spreadsheet(args.output)
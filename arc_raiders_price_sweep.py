@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Arc Raiders Crafting Price Scenario Sweep
+Runs crafting profitability for many candidate price sets at once to show
+how sensitive each recipe's profit is to material price changes.
+
+Recipes are turned into a (recipe x material) quantity matrix and each price
+scenario into a row of a (scenario x material) price matrix, so all scenarios
+are costed with a single matrix multiply.
+
+Requirements: pip install openpyxl numpy (scipy optional, for sparse matrices)
+Usage:
+    python arc_raiders_price_sweep.py                      # 1000 random ±20% scenarios
+    python arc_raiders_price_sweep.py --scenarios 5000 --spread 0.35
+    python arc_raiders_price_sweep.py --csv price_sets.csv # one price set per row
+Output: arc_raiders_price_sweep.xlsx
+
+Scenario CSV format: a header row of material names, then one row of prices
+per scenario. Materials missing from the CSV keep their current value.
+"""
+
+import argparse
+import csv
+
+import numpy as np
+from openpyxl import Workbook
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+
+try:
+    from scipy import sparse
+except ImportError:
+    sparse = None
+
+from arc_raiders_crafting_profit import material_values, recipes
+
+
+def build_quantity_matrix(recipe_list=None, values=None):
+    """Return (materials, quantity matrix, sell vector) for the recipes.
+
+    The quantity matrix has one row per recipe and one column per material.
+    It is a scipy CSR matrix when scipy is installed, otherwise a dense array.
+    """
+    if recipe_list is None:
+        recipe_list = recipes
+    if values is None:
+        values = material_values
+
+    materials = list(values)
+    columns = {mat: i for i, mat in enumerate(materials)}
+    rows, cols, qtys = [], [], []
+    for r, (name, sell_value, recipe, bench, notes) in enumerate(recipe_list):
+        for material, qty in recipe:
+            if material not in columns:
+                columns[material] = len(materials)
+                materials.append(material)
+            rows.append(r)
+            cols.append(columns[material])
+            qtys.append(qty)
+
+    shape = (len(recipe_list), len(materials))
+    if sparse is not None:
+        quantities = sparse.csr_matrix((qtys, (rows, cols)), shape=shape, dtype=np.float64)
+    else:
+        quantities = np.zeros(shape)
+        np.add.at(quantities, (rows, cols), qtys)
+
+    sell = np.array([recipe[1] for recipe in recipe_list], dtype=np.float64)
+    return materials, quantities, sell
+
+
+def price_vector(materials, values=None):
+    """Return current prices as a vector aligned with `materials` (unknowns use 500)."""
+    if values is None:
+        values = material_values
+    return np.array([values.get(mat, 500) for mat in materials], dtype=np.float64)
+
+
+def perturbed_scenarios(base_prices, count, spread=0.2, seed=None):
+    """Return `count` price sets with every price scaled by a random factor in ±spread."""
+    rng = np.random.default_rng(seed)
+    factors = rng.uniform(1 - spread, 1 + spread, size=(count, len(base_prices)))
+    return base_prices * factors
+
+
+def load_scenarios_csv(path, materials, base_prices):
+    """Read one price set per CSV row; missing materials keep their base price."""
+    columns = {mat: i for i, mat in enumerate(materials)}
+    scenarios = []
+    with open(path, newline="") as f:
+        for record in csv.DictReader(f):
+            prices = base_prices.copy()
+            for material, value in record.items():
+                if material in columns and value not in (None, ""):
+                    prices[columns[material]] = float(value)
+            scenarios.append(prices)
+    if not scenarios:
+        raise ValueError(f"No price scenarios found in {path}")
+    return np.vstack(scenarios)
+
+
+def sweep(quantities, sell, scenarios):
+    """Cost every recipe under every scenario.
+
+    Returns (cost, profit, profit_pct) arrays shaped (scenario x recipe).
+    """
+    # (recipe x material) @ (material x scenario) -> (recipe x scenario)
+    cost = np.asarray(quantities @ scenarios.T).T
+    profit = sell - cost
+    with np.errstate(divide="ignore", invalid="ignore"):
+        profit_pct = np.where(cost > 0, profit / cost * 100, 0.0)
+    return cost, profit, profit_pct
+
+
+def summarize(recipe_list, quantities, sell, base_prices, profit, profit_pct):
+    """Return per-recipe profit and profit % distributions and break-even stats, best mean profit first."""
+    base_cost = np.asarray(quantities @ base_prices).ravel()
+    p5, p50, p95 = np.percentile(profit, [5, 50, 95], axis=0)
+    pct_min, pct_median, pct_max = profit_pct.min(axis=0), np.median(profit_pct, axis=0), profit_pct.max(axis=0)
+    mean = profit.mean(axis=0)
+    std = profit.std(axis=0)
+    chance = (profit > 0).mean(axis=0) * 100
+    # Uniform material price multiplier at which the craft exactly breaks even
+    with np.errstate(divide="ignore"):
+        breakeven_scale = np.where(base_cost > 0, sell / base_cost, np.inf)
+
+    summary = []
+    for i, (name, sell_value, recipe, bench, notes) in enumerate(recipe_list):
+        summary.append({
+            "name": name,
+            "sell_value": sell_value,
+            "base_cost": float(base_cost[i]),
+            "mean_profit": float(mean[i]),
+            "std_profit": float(std[i]),
+            "p5_profit": float(p5[i]),
+            "median_profit": float(p50[i]),
+            "p95_profit": float(p95[i]),
+            "min_profit_pct": float(pct_min[i]),
+            "median_profit_pct": float(pct_median[i]),
+            "max_profit_pct": float(pct_max[i]),
+            "profitable_pct": float(chance[i]),
+            "breakeven_scale": float(breakeven_scale[i]),
+            "bench": bench,
+        })
+    summary.sort(key=lambda x: x["mean_profit"], reverse=True)
+    return summary
+
+
+def create_sweep_spreadsheet(scenarios=None, output_path="arc_raiders_price_sweep.xlsx"):
+    """Run the sweep and write per-recipe profit distributions to a spreadsheet."""
+    materials, quantities, sell = build_quantity_matrix()
+    base_prices = price_vector(materials)
+    if scenarios is None:
+        scenarios = perturbed_scenarios(base_prices, 1000)
+
+    cost, profit, profit_pct = sweep(quantities, sell, scenarios)
+    summary = summarize(recipes, quantities, sell, base_prices, profit, profit_pct)
+
+    wb = Workbook()
+    header_font = Font(bold=True, color="FFFFFF", size=11)
+    header_fill = PatternFill("solid", fgColor="1565C0")
+    center_align = Alignment(horizontal="center", vertical="center")
+    currency_format = '"$"#,##0'
+    thin_border = Border(
+        left=Side(style='thin'), right=Side(style='thin'),
+        top=Side(style='thin'), bottom=Side(style='thin')
+    )
+
+    ws = wb.active
+    ws.title = "Profit Distribution"
+    headers = ["Item Name", "Sell Value", "Base Cost", "Mean Profit", "Std Dev",
+               "P5 Profit", "Median Profit", "P95 Profit", "Min Profit %", "Median Profit %",
+               "Max Profit %", "% Scenarios Profitable", "Break-even Price Scale", "Bench"]
+    for col, header in enumerate(headers, 1):
+        cell = ws.cell(row=1, column=col, value=header)
+        cell.font = header_font
+        cell.fill = header_fill
+        cell.alignment = center_align
+        cell.border = thin_border
+
+    keys = ["name", "sell_value", "base_cost", "mean_profit", "std_profit", "p5_profit",
+            "median_profit", "p95_profit", "min_profit_pct", "median_profit_pct", "max_profit_pct",
+            "profitable_pct", "breakeven_scale", "bench"]
+    for row, item in enumerate(summary, 2):
+        for col, key in enumerate(keys, 1):
+            value = item[key]
+            if isinstance(value, float):
+                digits = 1 if key.endswith("profit_pct") else 2
+                value = round(value, digits) if np.isfinite(value) else None
+            cell = ws.cell(row=row, column=col, value=value)
+            cell.border = thin_border
+            if 2 <= col <= 8:
+                cell.number_format = currency_format
+
+    ws.column_dimensions['A'].width = 26
+    for letter in "BCDEFGHIJKLMN":
+        ws.column_dimensions[letter].width = 14
+
+    ws_info = wb.create_sheet("Summary")
+    ws_info['A1'] = "Arc Raiders Crafting Price Sweep"
+    ws_info['A1'].font = Font(bold=True, size=14)
+    ws_info['A3'] = f"Scenarios: {len(scenarios)}"
+    ws_info['A4'] = f"Recipes: {len(recipes)}"
+    ws_info['A5'] = f"Materials: {len(materials)}"
+    ws_info['A7'] = "Break-even Price Scale = material price multiplier at which a craft stops being profitable"
+    ws_info['A8'] = "Profit % = profit / material cost x 100, across all scenarios"
+    ws_info.column_dimensions['A'].width = 90
+
+    wb.save(output_path)
+    print(f"Created {output_path}: {len(recipes)} recipes x {len(scenarios)} scenarios")
+    print("\nMost robust crafts (mean profit):")
+    for item in summary[:5]:
+        print(f"  {item['name']}: ${item['mean_profit']:,.0f} "
+              f"({item['profitable_pct']:.0f}% of scenarios profitable)")
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep crafting profit over many price scenarios")
+    parser.add_argument("--scenarios", type=int, default=1000, help="number of random price sets")
+    parser.add_argument("--spread", type=float, default=0.2, help="max relative price change (0.2 = ±20%%)")
+    parser.add_argument("--seed", type=int, default=None, help="random seed for reproducible sweeps")
+    parser.add_argument("--csv", help="CSV of candidate price sets instead of random scenarios")
+    parser.add_argument("--output", default="arc_raiders_price_sweep.xlsx")
+    args = parser.parse_args()
+
+    materials, _, _ = build_quantity_matrix()
+    base = price_vector(materials)
+    if args.csv:
+        price_sets = load_scenarios_csv(args.csv, materials, base)
+    else:
+        price_sets = perturbed_scenarios(base, args.scenarios, args.spread, args.seed)
+    create_sweep_spreadsheet(price_sets, args.output)
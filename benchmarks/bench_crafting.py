@@ -0,0 +1,73 @@
+"""
+Crafting benchmarks: cost computation, the incremental model and both
+spreadsheet writers, over synthetic recipe sets of 10^2-10^6 recipes.
+
+The openpyxl writer keeps every cell in memory, so its full scale stops at
+10^5 recipes; the streaming writer goes to 10^6.
+"""
+
+import os
+
+import arc_raiders_crafting_profit as crafting
+import generators
+from arc_raiders_crafting_model import CraftingModel
+from harness import case, replaced
+
+SMALL = (100, 1_000)
+DEFAULT = (100, 1_000, 10_000, 100_000)
+FULL = (100, 1_000, 10_000, 100_000, 1_000_000)
+
+
+@case("crafting.material_costs", quick=SMALL, default=DEFAULT, full=FULL)
+def material_costs(bench, size):
+    recipe_list, values = generators.recipe_set(size)
+    with replaced(crafting.recipes, recipe_list):
+        with bench.timer():
+            rows = crafting.build_crafting_data(values)
+    bench.extra["rows"] = len(rows)
+
+
+@case("crafting.tree_costs", quick=SMALL, default=DEFAULT, full=FULL)
+def tree_costs(bench, size):
+    recipe_list, values = generators.recipe_set(size)
+    with bench.timer():
+        costs = crafting.calculate_tree_costs(recipe_list, values)
+    bench.extra["crafted"] = sum(1 for entry in costs.values() if entry["source"] == "craft")
+
+
+@case("crafting.model_build", quick=SMALL, default=DEFAULT, full=FULL)
+def model_build(bench, size):
+    recipe_list, values = generators.recipe_set(size)
+    with bench.timer():
+        CraftingModel(recipe_list, values, tree_costs=True)
+
+
+@case("crafting.model_update", quick=SMALL, default=DEFAULT, full=FULL)
+def model_update(bench, size):
+    recipe_list, values = generators.recipe_set(size)
+    model = CraftingModel(recipe_list, values, tree_costs=True)
+    # Raw materials sit at the bottom of the graph, so this is the widest update
+    material = "Raw 0"
+    with bench.timer():
+        changes = model.set_price(material, values[material] * 2)
+    bench.extra["changed"] = len(changes)
+
+
+@case("crafting.sheet", quick=(100,), default=(100, 1_000, 10_000), full=(100, 1_000, 10_000, 100_000))
+def sheet(bench, size):
+    recipe_list, values = generators.recipe_set(size)
+    output = os.path.join(bench.scratch, "crafting.xlsx")
+    with replaced(crafting.recipes, recipe_list):
+        with bench.timer():
+            crafting.create_crafting_spreadsheet(output, values)
+    bench.extra["bytes"] = os.path.getsize(output)
+
+
+@case("crafting.sheet_stream", quick=(100,), default=(100, 1_000, 10_000), full=FULL)
+def sheet_stream(bench, size):
+    recipe_list, values = generators.recipe_set(size)
+    output = os.path.join(bench.scratch, "crafting.xlsx")
+    with replaced(crafting.recipes, recipe_list):
+        with bench.timer():
+            crafting.stream_crafting_spreadsheet(output, values)
+    bench.extra["bytes"] = os.path.getsize(output)
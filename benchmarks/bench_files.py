@@ -0,0 +1,55 @@
+"""
+File benchmarks: the bulk renamer and the folder organizer over generated
+folder trees. Sizes are file counts. Every repeat gets a new tree, and only
+planning plus applying the renames or moves is timed.
+"""
+
+import os
+
+import generators
+import organizer_engine
+import rename_engine
+from harness import case
+
+SMALL = (1_000,)
+DEFAULT = (1_000, 10_000)
+FULL = (1_000, 10_000, 100_000)
+
+RULES = [
+    {"ext": [".jpg", ".png"], "to": "Images/{year}"},
+    {"ext": ".pdf", "to": "PDFs"},
+    {"mime": "video/*", "to": "Videos"},
+    {"ext": [".zip"], "larger": 32, "to": "Archives/Large"},
+    {"ext": [".docx", ".txt", ".csv"], "to": "Documents/{ext}"},
+]
+
+
+@case("files.rename", quick=SMALL, default=DEFAULT, full=FULL)
+def rename(bench, size):
+    folder = generators.file_tree(bench.scratch, size)
+    with bench.timer():
+        names, existing = rename_engine.scan_folder(folder)
+        phases = rename_engine.build_plan(names, existing, rename_engine.sequential_namer("file_"))
+        stats = rename_engine.apply_plan(folder, phases)
+    bench.extra["renames"] = stats["renames"]
+
+
+@case("files.organize", quick=SMALL, default=DEFAULT, full=FULL)
+def organize(bench, size):
+    folder = generators.file_tree(bench.scratch, size)
+    rules = organizer_engine.RuleSet()
+    with bench.timer():
+        moves = organizer_engine.plan_moves(folder, rules)
+        done, stats = organizer_engine.move_files(folder, moves)
+    bench.extra["moved"] = stats["moved"]
+
+
+@case("files.organize_rules", quick=SMALL, default=DEFAULT, full=FULL)
+def organize_rules(bench, size):
+    folder = generators.file_tree(bench.scratch, size, depth=2)
+    rules = organizer_engine.RuleSet(RULES)
+    with bench.timer():
+        moves = organizer_engine.plan_moves(folder, rules, recursive=True)
+        done, stats = organizer_engine.move_files(folder, moves)
+    bench.extra["moved"] = stats["moved"]
+    bench.extra["folders"] = len({os.path.dirname(path) for path in done.values()})
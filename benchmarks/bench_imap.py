@@ -0,0 +1,34 @@
+"""
+IMAP benchmarks: the inbox cleaner against the in-process fake IMAP server,
+through imap_benchmark.run_case. Sizes are mailbox messages. Only the
+cleaning is timed, not loading the server.
+"""
+
+import imap_benchmark
+import imap_classify
+from harness import case
+
+SMALL = (1_000,)
+DEFAULT = (1_000, 100_000)
+FULL = (1_000, 100_000, 1_000_000)
+
+
+def _record(bench, result):
+    bench.record(result["seconds"])
+    bench.extra.update(messages=result["messages"], round_trips=result["round_trips"],
+                       bytes_received=result["bytes_received"])
+
+
+@case("imap.clean", quick=SMALL, default=DEFAULT, full=FULL)
+def clean(bench, size):
+    _record(bench, imap_benchmark.run_case(size))
+
+
+@case("imap.move", quick=SMALL, default=DEFAULT, full=FULL)
+def move(bench, size):
+    _record(bench, imap_benchmark.run_case(size, move_to="Archive"))
+
+
+@case("imap.headers", quick=SMALL, default=DEFAULT, full=FULL)
+def headers(bench, size):
+    _record(bench, imap_benchmark.run_case(size, rules=[imap_classify.list_id_matches()]))
@@ -0,0 +1,43 @@
+"""
+Loot benchmarks: building and querying the catalog, and both spreadsheet
+writers, over synthetic item lists.
+"""
+
+import os
+
+import arc_raiders_loot_values as loot
+import generators
+from harness import case, replaced
+
+SMALL = (1_000,)
+DEFAULT = (1_000, 10_000, 100_000)
+FULL = (1_000, 10_000, 100_000, 1_000_000)
+
+
+@case("loot.catalog", quick=SMALL, default=DEFAULT, full=FULL)
+def catalog(bench, size):
+    items = generators.loot_items(size)
+    with bench.timer():
+        built = loot.load_catalog(items)
+        built.items_by_value()
+        built.by_category()
+        loot.tier_breakdown(built)
+        built.top(10)
+
+
+@case("loot.sheet", quick=SMALL, default=(1_000, 10_000), full=(1_000, 10_000, 100_000))
+def sheet(bench, size):
+    output = os.path.join(bench.scratch, "loot.xlsx")
+    with replaced(loot.LOOT_ITEMS, generators.loot_items(size)):
+        with bench.timer():
+            loot.create_loot_spreadsheet(output)
+    bench.extra["bytes"] = os.path.getsize(output)
+
+
+@case("loot.sheet_stream", quick=SMALL, default=DEFAULT, full=FULL)
+def sheet_stream(bench, size):
+    output = os.path.join(bench.scratch, "loot.xlsx")
+    with replaced(loot.LOOT_ITEMS, generators.loot_items(size)):
+        with bench.timer():
+            loot.stream_loot_spreadsheet(output)
+    bench.extra["bytes"] = os.path.getsize(output)
@@ -0,0 +1,87 @@
+"""
+Report generator benchmarks: ExcelReportGen's default pandas path and its
+streaming mode, the multi-report cube and the columnar cache, over generated
+sales CSVs and workbooks. Sizes are data rows.
+
+Skipped when pandas is not installed.
+"""
+
+import os
+
+import generators
+from harness import Skip, case
+
+SMALL = (10_000,)
+DEFAULT = (10_000, 100_000)
+FULL = (10_000, 100_000, 1_000_000)
+
+
+def _pandas():
+    try:
+        import pandas
+    except ImportError:
+        raise Skip("pandas is not installed")
+    return pandas
+
+
+@case("report.pandas_csv", quick=SMALL, default=DEFAULT, full=FULL)
+def pandas_csv(bench, size):
+    pd = _pandas()
+    path = generators.sales_csv(bench.data_dir, size)
+    with bench.timer():
+        pd.read_csv(path).groupby("Region", observed=True)["Amount"].sum()
+
+
+@case("report.pandas_xlsx", quick=SMALL, default=DEFAULT, full=FULL)
+def pandas_xlsx(bench, size):
+    pd = _pandas()
+    path = generators.sales_xlsx(bench.data_dir, size, sheets=1)
+    output = os.path.join(bench.scratch, "summary.xlsx")
+    with bench.timer():
+        pd.read_excel(path).groupby("Region", observed=True)["Amount"].sum().to_excel(output)
+
+
+@case("report.stream_csv", quick=SMALL, default=DEFAULT, full=FULL)
+def stream_csv(bench, size):
+    _pandas()
+    from ExcelReportGen import stream_totals
+
+    path = generators.sales_csv(bench.data_dir, size)
+    with bench.timer():
+        totals = stream_totals([path])
+    bench.extra["groups"] = len(totals)
+
+
+@case("report.stream_xlsx", quick=SMALL, default=DEFAULT, full=FULL)
+def stream_xlsx(bench, size):
+    _pandas()
+    from ExcelReportGen import stream_totals
+
+    path = generators.sales_xlsx(bench.data_dir, size, sheets=1)
+    with bench.timer():
+        stream_totals([path])
+
+
+@case("report.cube", quick=SMALL, default=DEFAULT, full=FULL)
+def cube(bench, size):
+    pd = _pandas()
+    from report_engine import run_reports, validate_config
+
+    df = pd.read_csv(generators.sales_csv(bench.data_dir, size))
+    config = generators.report_config(12)
+    validate_config(config)
+    with bench.timer():
+        results = run_reports(df, config)
+    bench.extra["reports"] = len(results)
+
+
+@case("report.cache_warm", quick=SMALL, default=DEFAULT, full=FULL)
+def cache_warm(bench, size):
+    _pandas()
+    from columnar_cache import load_frame
+
+    path = generators.sales_xlsx(bench.data_dir, size, sheets=1)
+    cache_dir = os.path.join(bench.data_dir, "report-cache")
+    load_frame(path, cache_dir=cache_dir)  # converted once; the repeats measure the warm load
+    with bench.timer():
+        load_frame(path, cache_dir=cache_dir)
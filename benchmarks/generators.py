@@ -0,0 +1,116 @@
+"""
+Synthetic Benchmark Data
+Deterministic inputs for the benchmark cases, at any size.
+
+In-memory data (recipes, loot) is cached per size for the life of the
+process. Files are written once into the run's data folder and reused by
+later repeats and cases. Folder trees are always built fresh, because the
+renamer and organizer cases change them.
+
+Requirements: openpyxl (for sales_xlsx)
+"""
+
+import csv
+import datetime
+import functools
+import os
+import random
+
+from arc_raiders_craft_optimizer import synthetic_problem
+
+REGIONS = ("North", "South", "East", "West", "Central", "Overseas")
+PRODUCTS = tuple(f"Product {i}" for i in range(40))
+LOOT_CATEGORIES = ("Weapon Part", "ARC Part", "Electronics", "Medical", "Utility", "Material",
+                   "Valuable", "Blueprint", "Trinket", "Chemical", "Mechanical", "Textile")
+FILE_EXTENSIONS = (".jpg", ".png", ".pdf", ".docx", ".txt", ".mp4", ".mp3", ".zip", ".csv", ".xyz")
+SALES_HEADER = ("Date", "Region", "Product", "Amount", "Quantity")
+
+
+@functools.lru_cache(maxsize=None)
+def recipe_set(count, seed=0):
+    """(recipe list, values) with `count` crafted items layered over raw materials.
+
+    Built by the stash optimizer's synthetic_problem, so every ingredient is
+    priced and the recipe graph is acyclic. Values cover crafted items too,
+    so tree costs have a real buy-or-craft choice to make.
+    """
+    raw_types = min(2000, max(20, count // 20))
+    recipe_list, values, _ = synthetic_problem(count + raw_types, raw_types, seed)
+    return recipe_list, values
+
+
+@functools.lru_cache(maxsize=None)
+def loot_items(count, seed=0):
+    """[(name, sell value, category)] with values spread log-uniformly over 10-15,000."""
+    rng = random.Random(seed)
+    return [(f"Loot {i}", int(10 * 1500 ** rng.random()), rng.choice(LOOT_CATEGORIES)) for i in range(count)]
+
+
+def _sales_rows(count, seed):
+    rng = random.Random(seed)
+    start = datetime.date(2024, 1, 1).toordinal()
+    for _ in range(count):
+        quantity = rng.randint(1, 20)
+        yield (datetime.date.fromordinal(start + rng.randrange(365)).isoformat(), rng.choice(REGIONS),
+               rng.choice(PRODUCTS), round(quantity * rng.uniform(5, 250), 2), quantity)
+
+
+def sales_csv(folder, rows, seed=0):
+    """Path of a sales CSV with `rows` rows (written on first use)."""
+    path = os.path.join(folder, f"sales-{rows}-{seed}.csv")
+    if not os.path.exists(path):
+        with open(path + ".tmp", "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(SALES_HEADER)
+            writer.writerows(_sales_rows(rows, seed))
+        os.replace(path + ".tmp", path)
+    return path
+
+
+def sales_xlsx(folder, rows, sheets=2, seed=0):
+    """Path of a sales workbook with `rows` rows split over `sheets` sheets (written on first use)."""
+    from openpyxl import Workbook
+
+    path = os.path.join(folder, f"sales-{rows}-{sheets}-{seed}.xlsx")
+    if not os.path.exists(path):
+        wb = Workbook(write_only=True)
+        generated = _sales_rows(rows, seed)
+        for index in range(sheets):
+            ws = wb.create_sheet(f"Sales {index + 1}")
+            ws.append(SALES_HEADER)
+            share = rows // sheets + (1 if index < rows % sheets else 0)
+            for _ in range(share):
+                ws.append(next(generated))
+        wb.save(path + ".tmp")
+        os.replace(path + ".tmp", path)
+    return path
+
+
+def report_config(reports=12):
+    """A report_engine config with `reports` summaries over the sales columns."""
+    dimensions = (["Region"], ["Product"], ["Region", "Product"], [])
+    measures = ({"Amount": ["sum", "mean"]}, {"Amount": ["sum", "count"], "Quantity": ["max"]},
+                {"Quantity": ["sum", "min", "max"]})
+    return {"reports": [{"name": f"Report {i}", "group_by": dimensions[i % len(dimensions)],
+                         "measures": measures[i % len(measures)]} for i in range(reports)]}
+
+
+def file_tree(folder, count, depth=0, seed=0):
+    """Create `count` small files with mixed extensions in `folder`.
+
+    With depth > 0 the files are spread over nested subfolders (Dir 0/Dir 3/...).
+    Returns the folder.
+    """
+    rng = random.Random(seed)
+    dirs = level = [""]
+    for _ in range(depth):
+        level = [os.path.join(d, f"Dir {i}") for d in level for i in range(4)]
+        dirs = dirs + level
+    for d in dirs[1:]:
+        os.makedirs(os.path.join(folder, d), exist_ok=True)
+    payload = b"x" * 64
+    for i in range(count):
+        name = f"item-{rng.getrandbits(40):010x}-{i}{rng.choice(FILE_EXTENSIONS)}"
+        with open(os.path.join(folder, rng.choice(dirs), name), "wb") as f:
+            f.write(payload)
+    return folder
@@ -0,0 +1,234 @@
+"""
+Benchmark Harness
+Registers benchmark cases, times them at several input sizes and compares
+saved runs.
+
+A case is a function taking (bench, size). It prepares its inputs, then wraps
+only the code being measured in `with bench.timer():`. Cases that measure
+themselves (e.g. against a server that must be loaded first) call
+bench.record(seconds) instead. Anything else worth keeping (rows written,
+round trips, bytes) goes into bench.extra.
+
+Each case runs once per repeat with a fresh scratch folder, so cases that
+rename or move files start from the same state every time. Generated inputs
+that are only read live in a shared data folder and are built once per run.
+The best and median times are reported; pytest-benchmark and asv do the same.
+
+Requirements: none (standard library only)
+Usage:
+    from harness import case
+
+    @case("crafting.tree_costs", quick=(100,), default=(100, 10_000), full=(100, 1_000_000))
+    def tree_costs(bench, size):
+        recipe_list, values = generators.recipe_set(size)
+        with bench.timer():
+            calculate_tree_costs(recipe_list, values)
+"""
+
+import contextlib
+import fnmatch
+import gc
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SCALES = ("quick", "default", "full")
+DEFAULT_REPEATS = 3
+DEFAULT_BUDGET = 10.0
+DEFAULT_THRESHOLD = 0.25
+# Cases faster than this are too noisy to flag as regressions
+NOISE_FLOOR = 0.005
+
+CASES = {}
+
+
+class Skip(Exception):
+    """Raised by a case that cannot run here (e.g. an optional package is missing)."""
+
+
+class Case:
+    def __init__(self, name, func, sizes):
+        self.name = name
+        self.func = func
+        self.sizes = sizes
+
+
+def case(name, quick, default=None, full=None):
+    """Register a benchmark with the input sizes to run at each scale."""
+    default = default or quick
+    full = full or default
+
+    def register(func):
+        CASES[name] = Case(name, func, {"quick": tuple(quick), "default": tuple(default), "full": tuple(full)})
+        return func
+    return register
+
+
+def select(patterns=None):
+    """Registered cases whose name matches any pattern (a glob, or a prefix such as "crafting")."""
+    if not patterns:
+        return list(CASES.values())
+    return [c for c in CASES.values()
+            if any(fnmatch.fnmatch(c.name, p) or c.name.startswith(p + ".") or c.name == p for p in patterns)]
+
+
+class Bench:
+    """What a case sees: folders to work in, a timer and a place for extra numbers."""
+
+    def __init__(self, data_dir, scratch):
+        self.data_dir = data_dir
+        self.scratch = scratch
+        self.seconds = None
+        self.extra = {}
+
+    @contextlib.contextmanager
+    def timer(self):
+        gc.collect()
+        started = time.perf_counter()
+        yield
+        self.record(time.perf_counter() - started)
+
+    def record(self, seconds):
+        self.seconds = seconds
+
+
+def run_case(bench_case, size, data_dir, repeats=DEFAULT_REPEATS, budget=DEFAULT_BUDGET, quiet=True):
+    """Time one case at one size; returns a result dict.
+
+    Stops repeating once `budget` seconds have been spent (after at least
+    one run), so the largest sizes run once.
+    """
+    times, extra, spent = [], {}, 0.0
+    result = {"case": bench_case.name, "size": size}
+    for _ in range(repeats):
+        scratch = tempfile.mkdtemp(prefix="run-", dir=data_dir)
+        bench = Bench(data_dir, scratch)
+        try:
+            with open(os.devnull, "w") as devnull, \
+                    contextlib.redirect_stdout(devnull if quiet else sys.stdout):
+                bench_case.func(bench, size)
+        except Skip as e:
+            result["skipped"] = str(e)
+            return result
+        except Exception as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+            return result
+        finally:
+            shutil.rmtree(scratch, ignore_errors=True)
+        if bench.seconds is None:
+            result["error"] = "case neither used bench.timer() nor called bench.record()"
+            return result
+        times.append(bench.seconds)
+        extra = bench.extra
+        spent += bench.seconds
+        if spent >= budget:
+            break
+    result.update(best=min(times), median=statistics.median(times), repeats=len(times), times=times, extra=extra)
+    return result
+
+
+@contextlib.contextmanager
+def replaced(items, new_items):
+    """Swap the contents of a module-level list for the duration of a case.
+
+    The scripts' CLIs load custom data the same way (recipes[:] = ...), so
+    code that reads the module global sees the synthetic data.
+    """
+    saved = items[:]
+    items[:] = new_items
+    try:
+        yield items
+    finally:
+        items[:] = saved
+
+
+def _git(*args):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        out = subprocess.run(["git", *args], cwd=root, capture_output=True, text=True, timeout=60)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return out.stdout.strip() if out.returncode == 0 else None
+
+
+def environment():
+    """Where and on what code a run happened, stored with its results."""
+    commit = _git("rev-parse", "HEAD")
+    return {
+        "commit": commit,
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")) if commit else None,
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(old, new, threshold=DEFAULT_THRESHOLD, floor=NOISE_FLOOR):
+    """[(case, size, old best, new best, ratio, status)] for results present in both runs.
+
+    status is "slower" when the new best time is more than `threshold`
+    (a fraction) above the old one, "faster" when it is that much below,
+    else "". Results under `floor` seconds in both runs are never flagged.
+    A case that ran before and errors now is "failed", with new best and
+    ratio None.
+    """
+    before = {(r["case"], r["size"]): r for r in old["results"] if "best" in r}
+    rows = []
+    for r in new["results"]:
+        o = before.get((r["case"], r["size"]))
+        if o is None:
+            continue
+        if "error" in r:
+            rows.append((r["case"], r["size"], o["best"], None, None, "failed"))
+            continue
+        if "best" not in r:
+            continue
+        ratio = r["best"] / o["best"] if o["best"] > 0 else float("inf")
+        status = ""
+        if max(r["best"], o["best"]) >= floor:
+            if ratio > 1 + threshold:
+                status = "slower"
+            elif ratio < 1 / (1 + threshold):
+                status = "faster"
+        rows.append((r["case"], r["size"], o["best"], r["best"], ratio, status))
+    return rows
+
+
+def format_seconds(seconds):
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.0f} us"
+    if seconds < 1:
+        return f"{seconds * 1e3:.1f} ms"
+    return f"{seconds:.2f} s"
+
+
+def print_results(results):
+    width = max([len(r["case"]) for r in results] + [4])
+    print(f"{'Case':<{width}} {'Size':>10} {'Best':>10} {'Median':>10} {'Runs':>4}  Notes")
+    for r in results:
+        if "best" in r:
+            notes = ", ".join(f"{k}={v:,.0f}" if isinstance(v, (int, float)) else f"{k}={v}"
+                              for k, v in r["extra"].items())
+            print(f"{r['case']:<{width}} {r['size']:>10,} {format_seconds(r['best']):>10} "
+                  f"{format_seconds(r['median']):>10} {r['repeats']:>4}  {notes}")
+        else:
+            reason = f"skipped: {r['skipped']}" if "skipped" in r else f"ERROR {r['error']}"
+            print(f"{r['case']:<{width}} {r['size']:>10,} {'-':>10} {'-':>10} {'-':>4}  {reason}")
+
+
+def print_comparison(rows):
+    width = max([len(row[0]) for row in rows] + [4])
+    print(f"{'Case':<{width}} {'Size':>10} {'Before':>10} {'After':>10} {'Ratio':>7}")
+    for name, size, before, after, ratio, status in rows:
+        if after is None:
+            print(f"{name:<{width}} {size:>10,} {format_seconds(before):>10} {'ERROR':>10} {'-':>7}  {status}")
+            continue
+        print(f"{name:<{width}} {size:>10,} {format_seconds(before):>10} {format_seconds(after):>10} "
+              f"{ratio:>6.2f}x  {status}")
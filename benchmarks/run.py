@@ -0,0 +1,144 @@
+"""
+Benchmark Runner
+Times the hot path of every script on synthetic data and stores the results
+as JSON, so runs on different commits can be compared and regressions caught.
+
+Cases live in the bench_*.py modules next to this file (see harness.py for
+how to write one):
+    crafting.*  cost computation, the incremental model and both spreadsheet writers
+    loot.*      the loot catalog and both spreadsheet writers
+    report.*    ExcelReportGen (pandas and streaming), the report cube, the columnar cache
+    files.*     the bulk renamer and the folder organizer on generated folder trees
+    imap.*      the inbox cleaner against the fake IMAP server
+
+--scale picks the input sizes: quick (seconds, for a smoke test), default,
+or full (up to 10^6 recipes / items / rows / messages; takes a while).
+Saved results carry the git commit, Python version and machine. --compare
+prints before/after ratios against an earlier result file and exits with
+status 1 if any case got slower by more than --threshold.
+
+Requirements: openpyxl; pandas + numpy for the report cases (skipped without them)
+Usage:
+    python benchmarks/run.py --list
+    python benchmarks/run.py --scale quick
+    python benchmarks/run.py crafting loot.sheet_stream --scale full --save
+    python benchmarks/run.py --save --compare benchmarks/results/0492801e5b7c.json
+    python benchmarks/run.py --diff old.json new.json --threshold 0.1
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(1, os.path.dirname(BENCH_DIR))
+
+import harness  # noqa: E402
+
+MODULES = ("bench_crafting", "bench_loot", "bench_reports", "bench_files", "bench_imap")
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+
+def load_cases():
+    for module in MODULES:
+        __import__(module)
+
+
+def run(cases, scale, sizes=None, repeats=harness.DEFAULT_REPEATS, budget=harness.DEFAULT_BUDGET,
+        workdir=None, verbose=False):
+    """Run the cases at the scale's sizes (or `sizes`); returns a result document."""
+    data_dir = tempfile.mkdtemp(prefix="benchmarks-", dir=workdir)
+    results = []
+    try:
+        for bench_case in cases:
+            for size in sizes or bench_case.sizes[scale]:
+                print(f"{bench_case.name} [{size:,}]...", file=sys.stderr, flush=True)
+                results.append(harness.run_case(bench_case, size, data_dir, repeats, budget, quiet=not verbose))
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+    return {"environment": harness.environment(), "scale": scale, "results": results}
+
+
+def result_path(document):
+    env = document["environment"]
+    name = (env["commit"] or "nocommit")[:12] + ("-dirty" if env["dirty"] else "")
+    return os.path.join(RESULTS_DIR, f"{name}.json")
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def save(document, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2)
+    print(f"Results written to {path}")
+
+
+def report_comparison(old, new, threshold):
+    """Print the comparison; returns True if anything got slower or now fails."""
+    rows = harness.compare(old, new, threshold)
+    if not rows:
+        print("No cases in common to compare")
+        return False
+    before, after = old["environment"], new["environment"]
+    print(f"\nBefore: {(before['commit'] or '?')[:12]} ({before['date']})   "
+          f"After: {(after['commit'] or '?')[:12]} ({after['date']})")
+    harness.print_comparison(rows)
+    slower = [row for row in rows if row[5] == "slower"]
+    failed = [row for row in rows if row[5] == "failed"]
+    if slower or failed:
+        print()
+    if slower:
+        print(f"{len(slower)} regression(s) over {threshold:.0%}")
+    if failed:
+        print(f"{len(failed)} case(s) that ran before now fail")
+    return bool(slower or failed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the scripts' hot paths on synthetic data")
+    parser.add_argument("cases", nargs="*", help="case names, prefixes (e.g. crafting) or globs (default: all)")
+    parser.add_argument("--scale", choices=harness.SCALES, default="default")
+    parser.add_argument("--sizes", help="comma-separated sizes, overriding --scale")
+    parser.add_argument("--repeats", type=int, default=harness.DEFAULT_REPEATS, help="runs per case and size")
+    parser.add_argument("--budget", type=float, default=harness.DEFAULT_BUDGET,
+                        help="stop repeating a case once it has taken this many seconds")
+    parser.add_argument("--workdir", help="folder for generated data (default: system temp)")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--save", action="store_true", help="write the results to results/<commit>.json")
+    parser.add_argument("--compare", metavar="JSON", help="compare with an earlier result file")
+    parser.add_argument("--diff", nargs=2, metavar=("OLD", "NEW"), help="compare two result files and exit")
+    parser.add_argument("--threshold", type=float, default=harness.DEFAULT_THRESHOLD,
+                        help="slowdown counted as a regression, as a fraction (default: %(default)s)")
+    parser.add_argument("--list", action="store_true", help="list the cases and their sizes")
+    parser.add_argument("--verbose", action="store_true", help="show the scripts' own output")
+    args = parser.parse_args()
+
+    if args.diff:
+        sys.exit(1 if report_comparison(load(args.diff[0]), load(args.diff[1]), args.threshold) else 0)
+
+    load_cases()
+    cases = harness.select(args.cases)
+    if not cases:
+        parser.error(f"no cases match {' '.join(args.cases)}")
+    if args.list:
+        for bench_case in cases:
+            print(f"{bench_case.name:<24} {', '.join(f'{s:,}' for s in bench_case.sizes[args.scale])}")
+        sys.exit(0)
+
+    baseline = load(args.compare) if args.compare else None
+    sizes = [int(s) for s in args.sizes.split(",")] if args.sizes else None
+    document = run(cases, args.scale, sizes, args.repeats, args.budget, args.workdir, args.verbose)
+    harness.print_results(document["results"])
+    if args.json:
+        save(document, args.json)
+    if args.save:
+        save(document, result_path(document))
+    if baseline is not None and report_comparison(baseline, document, args.threshold):
+        sys.exit(1)
@@ -1,6 +1,90 @@
-import os
+"""
+Bulk File Renamer
+Renames every file in a folder to a numbered scheme (file_0.jpg, file_1.pdf, ...)
+or to a name template built from regex captures, counters, dates, EXIF/ID3
+metadata and content hashes (see rename_templates.py for the fields).
 
-folder = "path/to/folder"
-for i, file in enumerate(os.listdir(folder)):
-    ext = file.split('.')[-1]
-    os.rename(os.path.join(folder, file), os.path.join(folderm f"file_{i}.{ext}"))
\ No newline at end of file
+The full plan is checked before anything moves: names that would collide,
+or that are taken by files outside the plan, stop the run, and chains or
+cycles are resolved through temporary names. Renames run in parallel and
+are journaled, so a crashed run can be resumed and any run can be undone
+(see rename_engine.py).
+
+Requirements: none (standard library only)
+Usage:
+    python bulk-file-renamer.py path/to/folder
+    python bulk-file-renamer.py path/to/folder --prefix photo_ --start 1 --dry-run
+    python bulk-file-renamer.py photos --template "IMG_{taken:%Y%m%d_%H%M%S}.{ext!l}" --on-duplicate suffix
+    python bulk-file-renamer.py music --template "{artist} - {track:02d} {title}.{ext}"
+    python bulk-file-renamer.py scans --match "^scan(\d+)" --template "invoice_{1:0>5}{suffix}"
+    python bulk-file-renamer.py --resume path/to/folder/.rename-journal-20250101-120000-1a2b3c.jsonl
+    python bulk-file-renamer.py --undo path/to/folder/.rename-journal-20250101-120000-1a2b3c.jsonl
+    python bulk-file-renamer.py photos --template "{taken:%Y%m%d}_{n}{suffix}" --trace trace.json --trace-format chrome
+"""
+
+import argparse
+import time
+
+import perf_trace
+import rename_engine
+import rename_templates
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rename all files in a folder to a numbered scheme")
+    parser.add_argument("folder", nargs="?", default="path/to/folder")
+    parser.add_argument("--prefix", default="file_")
+    parser.add_argument("--start", type=int, default=0, help="first number")
+    parser.add_argument("--template", help="name template, e.g. '{taken:%%Y-%%m-%%d}_{n:03d}{suffix}'")
+    parser.add_argument("--match", help="regex; only matching files are renamed, groups become {1}, {name}")
+    parser.add_argument("--on-duplicate", choices=("error", "suffix"), default="error",
+                        help="stop on repeated names, or append _1, _2, ...")
+    parser.add_argument("--dry-run", action="store_true", help="print the renames without doing them")
+    parser.add_argument("--workers", type=int, default=rename_engine.DEFAULT_WORKERS)
+    parser.add_argument("--journal", help="journal path (default: inside the folder)")
+    parser.add_argument("--resume", metavar="JOURNAL", help="finish an interrupted run")
+    parser.add_argument("--undo", metavar="JOURNAL", help="reverse a run")
+    perf_trace.add_arguments(parser)
+    args = parser.parse_args()
+    perf_trace.from_args(args)
+
+    if args.resume or args.undo:
+        action = rename_engine.resume if args.resume else rename_engine.undo
+        stats = action(args.resume or args.undo, args.workers)
+        print(f"{'Resumed' if args.resume else 'Undid'}: {stats['renames']:,} renames "
+              f"in {stats['seconds']:.1f}s")
+        raise SystemExit(0)
+
+    started = time.perf_counter()
+    names, existing = rename_engine.scan_folder(args.folder)
+    if args.template or args.match:
+        template = rename_templates.Template(args.template or "{name}", args.match)
+        failed = []
+        rendered = rename_templates.render_names(args.folder, names, template, args.start, args.workers, failed)
+        if args.on_duplicate == "suffix":
+            rendered = rename_templates.dedupe(rendered)
+        new_names = []
+        for old, new in zip(names, rendered):
+            new_names.append(new)
+            if args.dry_run and new != old:
+                print(f"  {old} -> {new}")  # streamed as metadata comes in
+        namer = lambda index, name: new_names[index]  # noqa: E731
+        if failed:
+            print(f"{len(failed):,} file(s) keep their names because the template could not be applied:")
+            for name, error in failed[:10]:
+                print(f"  {name}: {error}")
+    else:
+        namer = rename_engine.sequential_namer(args.prefix, args.start)
+        if args.dry_run:
+            for index, name in enumerate(names):
+                print(f"  {name} -> {namer(index, name)}")
+
+    try:
+        phases = rename_engine.build_plan(names, existing, namer)
+    except ValueError as e:
+        raise SystemExit(f"Nothing renamed: {e}")
+    print(f"Planned {len(names):,} files in {time.perf_counter() - started:.1f}s "
+          f"({sum(len(p) for p in phases):,} renames in {len(phases)} phase(s))")
+
+    if phases and not args.dry_run:
+        stats = rename_engine.apply_plan(args.folder, phases, args.journal, args.workers)
+        print(f"Renamed {stats['files']:,} files in {stats['seconds']:.1f}s; undo with --undo {stats['journal']}")
@@ -0,0 +1,188 @@
+"""
+Columnar Input Cache
+Converts .xlsx/.csv report inputs once into per-column NumPy .npy files so
+repeat runs memory-map the columns instead of re-parsing spreadsheet XML.
+
+Layout: <cache_dir>/<hash of source path>/
+    meta.json              source size/mtime/content hash, sheets, columns
+    <sheet>.<column>.npy   numeric/datetime values, or int32 codes for text
+    <sheet>.<column>.cat.npy  category labels for text columns
+
+An entry is reused while the source's size and mtime match (or, if only the
+mtime changed, while its content hash still matches). Entries whose source
+was deleted are removed, and least-recently-used entries are evicted once the
+cache grows past max_bytes. In-progress conversions (*.tmp) are only reaped
+once they are an hour old, so concurrent runs never delete each other's.
+
+Requirements: pip install pandas numpy openpyxl
+Usage:
+    df = load_frame("sale_data.xlsx")            # first sheet, like pd.read_excel
+    df = load_frame("sale_data.xlsx", sheet=None)  # all sheets concatenated
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CACHE_DIR = ".report_cache"
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+CACHE_VERSION = 1
+STALE_TMP_SECONDS = 3600  # a conversion folder this old was left by a crashed run
+
+
+def _digest(path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def entry_dir(path, cache_dir=DEFAULT_CACHE_DIR):
+    key = hashlib.blake2b(os.path.abspath(path).encode(), digest_size=12).hexdigest()
+    return os.path.join(cache_dir, key)
+
+
+def _read_sheets(path):
+    if path.lower().endswith(".csv"):
+        return {"csv": pd.read_csv(path)}
+    return pd.read_excel(path, sheet_name=None)
+
+
+def _save_column(folder, prefix, series):
+    """Write one column; returns its stored kind ('values' or 'category')."""
+    if series.dtype.kind in "biufcmM":
+        np.save(os.path.join(folder, f"{prefix}.npy"), series.to_numpy())
+        return "values"
+    categorical = pd.Categorical(series)
+    np.save(os.path.join(folder, f"{prefix}.npy"), categorical.codes.astype(np.int32))
+    np.save(os.path.join(folder, f"{prefix}.cat.npy"),
+            np.asarray(categorical.categories, dtype=object), allow_pickle=True)
+    return "category"
+
+
+def convert(path, folder, stat, digest):
+    """Parse `path` once and write every sheet's columns into `folder`."""
+    tmp = f"{folder}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    sheets = []
+    for s, (name, frame) in enumerate(_read_sheets(path).items()):
+        columns = []
+        for c, column in enumerate(frame.columns):
+            kind = _save_column(tmp, f"{s}.{c}", frame[column])
+            columns.append({"name": str(column), "kind": kind})
+        sheets.append({"name": str(name), "rows": len(frame), "columns": columns})
+
+    meta = {
+        "version": CACHE_VERSION,
+        "source": os.path.abspath(path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "digest": digest,
+        "sheets": sheets,
+        "last_used": time.time(),
+    }
+    with open(os.path.join(tmp, "meta.json"), "w") as f:
+        json.dump(meta, f)
+    shutil.rmtree(folder, ignore_errors=True)
+    os.replace(tmp, folder)
+    return meta
+
+
+def _read_meta(folder):
+    try:
+        with open(os.path.join(folder, "meta.json")) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get("version") == CACHE_VERSION else None
+
+
+def _write_meta(folder, meta):
+    with open(os.path.join(folder, "meta.json"), "w") as f:
+        json.dump(meta, f)
+
+
+def _load_sheet(folder, index, sheet):
+    data = {}
+    for c, column in enumerate(sheet["columns"]):
+        values = np.load(os.path.join(folder, f"{index}.{c}.npy"), mmap_mode="r")
+        if column["kind"] == "category":
+            labels = np.load(os.path.join(folder, f"{index}.{c}.cat.npy"), allow_pickle=True)
+            data[column["name"]] = pd.Categorical.from_codes(values, categories=labels)
+        else:
+            data[column["name"]] = values
+    return pd.DataFrame(data, copy=False)
+
+
+def load_frame(path, sheet=0, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+    """Load an input as a DataFrame, converting it into the cache on first use.
+
+    `sheet` is a sheet index or name, or None for all sheets concatenated.
+    """
+    stat = os.stat(path)
+    folder = entry_dir(path, cache_dir)
+    meta = _read_meta(folder)
+    if meta is not None and (meta["size"], meta["mtime_ns"]) != (stat.st_size, stat.st_mtime_ns):
+        digest = _digest(path)
+        if meta["digest"] == digest:
+            meta.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+        else:
+            meta = convert(path, folder, stat, digest)
+    elif meta is None:
+        os.makedirs(cache_dir, exist_ok=True)
+        meta = convert(path, folder, stat, _digest(path))
+
+    meta["last_used"] = time.time()
+    _write_meta(folder, meta)
+    evict(cache_dir, max_bytes, keep=folder)
+
+    sheets = meta["sheets"]
+    if sheet is None:
+        frames = [_load_sheet(folder, i, s) for i, s in enumerate(sheets)]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    if isinstance(sheet, int):
+        return _load_sheet(folder, sheet, sheets[sheet])
+    for i, s in enumerate(sheets):
+        if s["name"] == sheet:
+            return _load_sheet(folder, i, s)
+    raise KeyError(f"{path}: no sheet named '{sheet}'")
+
+
+def _folder_size(folder):
+    return sum(entry.stat().st_size for entry in os.scandir(folder) if entry.is_file())
+
+
+def evict(cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, keep=None):
+    """Drop entries for deleted sources, then least-recently-used ones over max_bytes."""
+    if not os.path.isdir(cache_dir):
+        return
+    entries = []
+    for entry in os.scandir(cache_dir):
+        if not entry.is_dir():
+            continue
+        if entry.name.endswith(".tmp"):
+            # Another process may still be converting into it
+            if time.time() - entry.stat().st_mtime > STALE_TMP_SECONDS:
+                shutil.rmtree(entry.path, ignore_errors=True)
+            continue
+        meta = _read_meta(entry.path)
+        if meta is None or not os.path.exists(meta["source"]):
+            if entry.path != keep:
+                shutil.rmtree(entry.path, ignore_errors=True)
+            continue
+        entries.append((meta["last_used"], entry.path, _folder_size(entry.path)))
+
+    total = sum(size for _, _, size in entries)
+    for last_used, folder, size in sorted(entries):
+        if total <= max_bytes:
+            break
+        if folder != keep:
+            shutil.rmtree(folder, ignore_errors=True)
+            total -= size
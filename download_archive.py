@@ -0,0 +1,164 @@
+"""
+Download Archive
+Remembers every video the downloaders have fetched, so a re-run over a big
+playlist or channel skips known videos without asking the site about them.
+
+Entries live in a SQLite file keyed by (extractor, video id), e.g.
+("youtube", "slPKx67TCG8"), with the format, size, checksum and output path
+of each download. All keys are loaded into memory when the archive opens,
+so a lookup is a set membership test. The key of a URL is worked out
+offline from yt-dlp's URL patterns (the matching extractor is remembered
+per host), and playlist entries carry their own ids. Either way, a known
+video is skipped before any network request. verify() re-checks the files
+on disk in a thread pool.
+
+Requirements: none (standard library only); yt-dlp to derive keys from URLs
+Usage:
+    with DownloadArchive("videos/.download-archive.sqlite") as archive:
+        if not archive.has("youtube", "slPKx67TCG8"):
+            ...
+            archive.add("youtube", "slPKx67TCG8", path, format_id="22")
+        for entry, problem in verify(archive, checksums=True):
+            print(entry["path"], problem)
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+ARCHIVE_NAME = ".download-archive.sqlite"
+DEFAULT_VERIFY_WORKERS = 8
+HASH_CHUNK = 1024 * 1024
+
+_extractor_by_host = {}
+_extractor_lock = threading.Lock()
+
+
+def file_checksum(path):
+    """BLAKE2b of the file's contents, or None for an empty file."""
+    if os.path.getsize(path) == 0:
+        return None
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def url_key(url):
+    """(extractor, video id) for a URL using yt-dlp's URL patterns only, or None.
+
+    Returns None for URLs that only the generic extractor handles (their ids
+    are only known after extraction). Playlist URLs get a key too, but only
+    videos are ever archived, so it never matches.
+    """
+    from yt_dlp.extractor import gen_extractor_classes
+
+    host = (urlsplit(url).hostname or "").lower()
+    with _extractor_lock:
+        known = _extractor_by_host.get(host)
+    if known is not None and known.suitable(url):
+        ie = known
+    else:
+        ie = next((ie for ie in gen_extractor_classes() if ie.ie_key() != "Generic" and ie.suitable(url)), None)
+        if ie is None:
+            return None  # a miss says nothing about the host's other URLs, so it is not cached
+        with _extractor_lock:
+            _extractor_by_host[host] = ie
+    video_id = ie.get_temp_id(url)
+    return (ie.ie_key().lower(), str(video_id)) if video_id else None
+
+
+def info_key(info):
+    """(extractor, video id) from yt-dlp metadata (a video or a flat playlist entry)."""
+    extractor = info.get("ie_key") or info.get("extractor_key") or info.get("extractor")
+    video_id = info.get("id")
+    if not extractor or not video_id:
+        return None
+    return extractor.lower(), str(video_id)
+
+
+class DownloadArchive:
+    """Downloaded videos keyed by (extractor, video id); safe to share between threads."""
+
+    def __init__(self, path):
+        self.path = path
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("CREATE TABLE IF NOT EXISTS videos (extractor TEXT, video_id TEXT, format TEXT, "
+                        "size INTEGER, checksum TEXT, path TEXT, added REAL, PRIMARY KEY (extractor, video_id))")
+        self.keys = set(self.db.execute("SELECT extractor, video_id FROM videos"))
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def has(self, extractor, video_id):
+        return (extractor.lower(), str(video_id)) in self.keys
+
+    def add(self, extractor, video_id, path, format_id=None, size=None, checksum=None):
+        key = (extractor.lower(), str(video_id))
+        if size is None and os.path.exists(path):
+            size = os.path.getsize(path)
+        with self._lock:
+            self.db.execute("INSERT OR REPLACE INTO videos VALUES (?, ?, ?, ?, ?, ?, ?)",
+                            (*key, format_id, size, checksum, os.path.abspath(path), time.time()))
+            self.db.commit()
+            self.keys.add(key)
+
+    def remove(self, extractor, video_id):
+        key = (extractor.lower(), str(video_id))
+        with self._lock:
+            self.db.execute("DELETE FROM videos WHERE extractor = ? AND video_id = ?", key)
+            self.db.commit()
+            self.keys.discard(key)
+
+    def entries(self):
+        with self._lock:
+            rows = self.db.execute("SELECT extractor, video_id, format, size, checksum, path FROM videos").fetchall()
+        fields = ("extractor", "video_id", "format", "size", "checksum", "path")
+        return [dict(zip(fields, row)) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self.db.commit()
+            self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _check(entry, checksums):
+    path = entry["path"]
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return "missing"
+    if entry["size"] is not None and size != entry["size"]:
+        return f"size {size:,} != {entry['size']:,}"
+    if checksums and entry["checksum"] and file_checksum(path) != entry["checksum"]:
+        return "checksum mismatch"
+    return None
+
+
+def verify(archive, checksums=False, workers=DEFAULT_VERIFY_WORKERS, prune=False):
+    """Return [(entry, problem)] for archived files that are missing or changed.
+
+    Sizes are always compared; checksums=True also re-hashes every file.
+    With prune=True bad entries are removed so the next run downloads them
+    again.
+    """
+    entries = archive.entries()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        problems = [(entry, problem) for entry, problem
+                    in zip(entries, executor.map(lambda e: _check(e, checksums), entries)) if problem]
+    if prune:
+        for entry, _ in problems:
+            archive.remove(entry["extractor"], entry["video_id"])
+    return problems
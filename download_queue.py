@@ -0,0 +1,399 @@
+"""
+Download Queue
+Downloads many URLs at once for yt-dlp-download.py.
+
+URLs go into a priority queue, and playlists are expanded into their
+entries as they are reached. A fixed pool of worker threads drains the
+queue. Each worker keeps one YoutubeDL instance for its whole life instead
+of building one per video, so its extractors and HTTP connections are
+reused. Each host has its own limits: at most `per_host` downloads at once
+and at most `rate` new downloads per second. A site that is slow or strict
+never holds up the others. A dashboard line on stderr shows progress and
+throughput. With a DownloadArchive (download_archive.py), videos already
+downloaded are skipped before any request for their metadata. With a
+PostProcessPipeline (postprocess_pipeline.py), merging and the other
+post-download steps run in a process pool. The worker moves on to its
+next download while that happens.
+
+Requirements: yt-dlp (pip install yt-dlp)
+Usage:
+    queue = DownloadQueue(ydl_options("videos"), workers=4)
+    queue.add("https://www.youtube.com/playlist?list=...", priority=10)
+    queue.add("https://www.youtube.com/watch?v=...")
+    queue.close()
+    jobs = queue.run()
+
+URL lists: one URL per line, optionally preceded by a priority (higher runs
+first, default 0); blank lines and lines starting with # are ignored.
+    10 https://www.youtube.com/watch?v=slPKx67TCG8
+    https://www.youtube.com/playlist?list=...
+"""
+
+import heapq
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+from download_archive import file_checksum, info_key, url_key
+from postprocess_pipeline import deferring_class, task_from_info
+
+DEFAULT_WORKERS = 4
+DEFAULT_PER_HOST = 3
+DEFAULT_RATE = 2.0
+DASHBOARD_INTERVAL = 1.0
+
+
+def ydl_options(output_path=".", fmt="bestvideo+bestaudio/best"):
+    """The YoutubeDL options the downloader has always used."""
+    return {
+        "outtmpl": f"{output_path}/%(title)s.%(ext)s",
+        "format": fmt,
+        "merge_output_format": "mp4",
+        "subtitleslangs": ["en"],
+        "writesubtitles": False,
+    }
+
+
+def parse_url_list(lines, priority=0):
+    """Yield (priority, url) from URL-list lines."""
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        first, _, rest = line.partition(" ")
+        if rest and first.lstrip("-").isdigit():
+            yield int(first), rest.strip()
+        else:
+            yield priority, line
+
+
+def host_of(url):
+    return (urlsplit(url).hostname or "").lower()
+
+
+class Job:
+    """One URL (or one playlist entry) and what happened to it."""
+
+    __slots__ = ("url", "priority", "info", "host", "status", "files", "error", "started", "finished")
+
+    def __init__(self, url, priority=0, info=None):
+        self.url = url
+        self.priority = priority
+        self.info = info  # playlist entry metadata (full, or just extractor and id)
+        self.host = host_of(url)
+        self.status = "queued"
+        self.files = {}  # file name -> bytes downloaded
+        self.error = None
+        self.started = self.finished = None
+
+    @property
+    def downloaded(self):
+        return sum(self.files.values())
+
+
+class HostScheduler:
+    """Priority queue that only hands out jobs whose host is under its limits.
+
+    Jobs are kept in one heap per host; get() picks the best head among the
+    hosts that have a free slot and whose start interval has passed, so a
+    throttled host never blocks jobs for other hosts.
+    """
+
+    def __init__(self, per_host=DEFAULT_PER_HOST, rate=DEFAULT_RATE):
+        self.per_host = per_host
+        self.interval = 1.0 / rate if rate else 0.0
+        self.heaps = defaultdict(list)
+        self.active = defaultdict(int)
+        self.next_start = {}
+        self.outstanding = 0  # queued + running
+        self.closed = False
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+    def put(self, job):
+        with self._cond:
+            heapq.heappush(self.heaps[job.host], (-job.priority, next(self._seq), job))
+            self.outstanding += 1
+            self._cond.notify()
+
+    def close(self):
+        """No more input; get() returns None once everything has finished."""
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def queued(self):
+        with self._cond:
+            return sum(map(len, self.heaps.values()))
+
+    def get(self):
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                best, wake = None, None
+                for host, heap in self.heaps.items():
+                    if not heap or self.active[host] >= self.per_host:
+                        continue
+                    ready_at = self.next_start.get(host, 0.0)
+                    if ready_at > now:
+                        wake = ready_at if wake is None else min(wake, ready_at)
+                    elif best is None or heap[0] < self.heaps[best][0]:
+                        best = host
+                if best is not None:
+                    job = heapq.heappop(self.heaps[best])[2]
+                    self.active[best] += 1
+                    self.next_start[best] = now + self.interval
+                    return job
+                if self.closed and not self.outstanding:
+                    return None
+                self._cond.wait(None if wake is None else wake - now)
+
+    def done(self, job):
+        with self._cond:
+            self.active[job.host] -= 1
+            self.outstanding -= 1
+            self._cond.notify_all()
+
+
+class Dashboard:
+    """Redraws one status line with counts and throughput until stopped."""
+
+    def __init__(self, queue, stream=sys.stderr, interval=DASHBOARD_INTERVAL):
+        self.queue = queue
+        self.stream = stream
+        self.interval = interval
+        # Without a terminal, log a line every 10 updates instead of redrawing
+        self.tty = stream.isatty()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self._draw(final=True)
+
+    def _run(self):
+        ticks = 0
+        while not self._stop.wait(self.interval):
+            ticks += 1
+            if self.tty or ticks % 10 == 0:
+                self._draw()
+
+    def _draw(self, final=False):
+        q = self.queue
+        counts = q.counts()
+        rate = q.throughput()
+        skipped = f", {counts['skipped']} already archived" if counts["skipped"] else ""
+        line = (f"{counts['done']}/{counts['total']} done, {counts['failed']} failed, "
+                f"{counts['running']} running, {counts['processing']} processing, {counts['queued']} queued{skipped} | "
+                f"{_size(q.bytes_total)} at {_size(rate)}/s")
+        if self.tty:
+            self.stream.write("\r\033[K" + line + ("\n" if final else ""))
+        else:
+            self.stream.write(line + "\n")
+        self.stream.flush()
+
+
+def _size(n):
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024 or unit == "GB":
+            return f"{n:.1f} {unit}" if unit != "B" else f"{n:.0f} B"
+        n /= 1024
+
+
+class DownloadQueue:
+    """Worker pool draining a HostScheduler with long-lived YoutubeDL instances."""
+
+    def __init__(self, options=None, workers=DEFAULT_WORKERS, per_host=DEFAULT_PER_HOST, rate=DEFAULT_RATE,
+                 dashboard=True, expand_playlists=True, archive=None, postprocess=None):
+        self.options = dict(options or ydl_options())
+        self.workers = workers
+        self.scheduler = HostScheduler(per_host, rate)
+        self.dashboard = dashboard
+        self.expand_playlists = expand_playlists
+        self.archive = archive
+        self.postprocess = postprocess
+        if postprocess is not None:
+            postprocess.on_done = self._processed
+        self.jobs = []
+        self._processing = {}
+        self.bytes_total = 0
+        self._lock = threading.Lock()
+        self._samples = [(time.monotonic(), 0)]
+
+    def add(self, url, priority=0, info=None):
+        job = Job(url, priority, info)
+        with self._lock:
+            self.jobs.append(job)
+        if self._archived(job):
+            job.status = "skipped"
+        else:
+            self.scheduler.put(job)
+        return job
+
+    def _archived(self, job):
+        """True if the archive already has this video; decided without any network request."""
+        if self.archive is None:
+            return False
+        key = info_key(job.info) if job.info else url_key(job.url)
+        return key is not None and self.archive.has(*key)
+
+    def add_lines(self, lines, priority=0):
+        """Queue every URL in an iterable of URL-list lines (a file, stdin...)."""
+        for prio, url in parse_url_list(lines, priority):
+            self.add(url, prio)
+
+    def close(self):
+        self.scheduler.close()
+
+    def counts(self):
+        with self._lock:
+            statuses = [job.status for job in self.jobs if job.status != "expanded"]
+        return {"total": len(statuses), "done": statuses.count("done"), "failed": statuses.count("failed"),
+                "running": statuses.count("running"), "queued": statuses.count("queued"),
+                "processing": statuses.count("processing"),
+                "skipped": statuses.count("skipped")}
+
+    def throughput(self, window=5.0):
+        """Bytes/second over the last `window` seconds."""
+        now = time.monotonic()
+        with self._lock:
+            self._samples.append((now, self.bytes_total))
+            while len(self._samples) > 2 and self._samples[1][0] < now - window:
+                self._samples.pop(0)
+            (t0, b0), (t1, b1) = self._samples[0], self._samples[-1]
+        return (b1 - b0) / (t1 - t0) if t1 > t0 else 0.0
+
+    def run(self):
+        """Download until the queue is closed and empty; returns the jobs.
+
+        Call close() first, or from another thread (e.g. one still reading
+        stdin) once all URLs have been added.
+        """
+        dashboard = Dashboard(self).start() if self.dashboard else None
+        if self.postprocess is not None:
+            self.postprocess.start()
+        threads = [threading.Thread(target=self._worker, name=f"download-{i}", daemon=True)
+                   for i in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                thread.join()
+            if self.postprocess is not None:
+                self.postprocess.close()
+        finally:
+            if dashboard:
+                dashboard.stop()
+        return self.jobs
+
+    def _worker(self):
+        import yt_dlp
+
+        current = [None]
+
+        def hook(d):
+            job = current[0]
+            name = d.get("filename") or d.get("tmpfilename") or ""
+            done = d.get("downloaded_bytes") or (d.get("total_bytes") if d.get("status") == "finished" else 0)
+            if job is None or not done:
+                return
+            with self._lock:
+                self.bytes_total += done - job.files.get(name, 0)
+                job.files[name] = done
+
+        options = dict(self.options, quiet=True, noprogress=True, progress_hooks=[hook])
+        if self.expand_playlists:
+            options.setdefault("extract_flat", "in_playlist")
+        if self.postprocess is not None:
+            # post_hooks need the final file, so they run once the pipeline is done with it
+            ydl = deferring_class(yt_dlp.YoutubeDL)(dict(options, post_hooks=[]))
+            ydl.hand_off = lambda filename, info, files_to_move: self._hand_off(current[0], filename, info,
+                                                                               files_to_move)
+        else:
+            ydl = yt_dlp.YoutubeDL(options)
+        with ydl:
+            while True:
+                job = self.scheduler.get()
+                if job is None:
+                    return
+                current[0] = job
+                job.status, job.started = "running", time.monotonic()
+                try:
+                    self._download(ydl, job)
+                    if job.status == "running":
+                        job.status = "done"
+                except Exception as e:  # one bad URL must not stop the queue
+                    job.status, job.error = "failed", str(e)
+                finally:
+                    job.finished = time.monotonic()
+                    current[0] = None
+                    self.scheduler.done(job)
+
+    def _download(self, ydl, job):
+        if not self.expand_playlists:
+            ydl.download([job.url])
+            return
+        info = job.info
+        if info is None or info.get("_type") == "url":
+            ie_key = info.get("ie_key") if info else None
+            info = ydl.extract_info(job.url, download=False, process=False, ie_key=ie_key)
+        key = info_key(info)
+        if self.archive is not None and key is not None and self.archive.has(*key):
+            job.status = "skipped"  # e.g. a direct link, whose id is only known after extraction
+            return
+        if info.get("_type") in ("playlist", "multi_video"):
+            # Entries are queued before this job is marked done, so the queue never looks finished early
+            for entry in info.get("entries") or ():
+                if entry is None:
+                    continue
+                url = entry.get("url") or entry.get("webpage_url") or job.url
+                # Flat entries carry their extractor and id, so known videos are skipped here
+                self.add(url, job.priority, entry)
+            job.status = "expanded"
+            return
+        result = ydl.process_ie_result(info, download=True)
+        if self.archive is not None and self.postprocess is None:
+            self._record(result or info)
+
+    def _hand_off(self, job, filename, info, files_to_move=None):
+        """Pass a finished download to the pipeline; blocks while the pipeline is saturated."""
+        task = task_from_info(info, filename, files_to_move)
+        task["id"] = id(job)
+        with self._lock:
+            self._processing[task["id"]] = job
+            job.status = "processing"
+        self.postprocess.submit(task)
+
+    def _processed(self, task):
+        if "error" not in task:
+            try:
+                for hook in self.options.get("post_hooks") or ():
+                    hook(task["filepath"])
+            except Exception as e:
+                task["error"] = f"post hooks: {e}"
+        with self._lock:
+            job = self._processing.pop(task["id"])
+            if "error" in task:
+                job.status, job.error = "failed", task["error"]
+            else:
+                job.status = "done"
+        if self.archive is not None and "error" not in task and task["key"] is not None:
+            self.archive.add(*task["key"], task["filepath"], format_id=task["format_id"], size=task.get("size"),
+                             checksum=task.get("checksum"))
+
+    def _record(self, info):
+        key = info_key(info)
+        downloads = info.get("requested_downloads") or [info]
+        path = downloads[0].get("filepath") or downloads[0].get("_filename")
+        if key is None or not path or not os.path.exists(path):
+            return
+        self.archive.add(*key, path, format_id=info.get("format_id"), checksum=file_checksum(path))
@@ -0,0 +1,644 @@
+"""
+Fake IMAP Server
+In-process IMAP4rev1 stand-in for testing and benchmarking the inbox cleaner
+without touching a real mailbox.
+
+Loads N synthetic messages (date, sender, subject, size, optional List-Id)
+into compact arrays and serves the subset of IMAP the cleaner uses:
+CAPABILITY, LOGIN, SELECT/EXAMINE, SEARCH, FETCH (flags, size, header fields,
+peek), STORE, COPY, MOVE, EXPUNGE (plain and UID), NOOP, CLOSE and LOGOUT.
+Every command can be delayed to simulate network latency, and the server
+counts commands (round trips) and bytes in each direction. Like Gmail, it
+advertises UIDPLUS and MOVE only after LOGIN, not in the greeting. With
+data_items_last=True, FETCH responses put UID, FLAGS and RFC822.SIZE after
+the header literal, an order some servers use and clients must accept.
+
+Requirements: none (standard library only)
+Usage:
+    with FakeIMAPServer(messages=100_000, latency=0.005) as server:
+        conn = imaplib.IMAP4("127.0.0.1", server.port)
+        conn.login("user", "pass")
+        ...
+        print(server.stats)
+
+    python fake_imap_server.py --messages 10000 --port 1143   # serve until Ctrl+C
+"""
+
+import argparse
+import datetime
+import random
+import socketserver
+import threading
+import time
+from array import array
+
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+SENDERS = [
+    "alerts@bank.example", "newsletter@shop.example", "noreply@social.example",
+    "team@work.example", "friend@mail.example", "digest@news.example",
+    "billing@utility.example", "updates@service.example",
+]
+FLAG_SEEN, FLAG_DELETED, FLAG_FLAGGED = 1, 2, 4
+FLAG_NAMES = [(FLAG_SEEN, "\\Seen"), (FLAG_DELETED, "\\Deleted"), (FLAG_FLAGGED, "\\Flagged")]
+FLAG_KEYS = {
+    "SEEN": (FLAG_SEEN, True), "UNSEEN": (FLAG_SEEN, False),
+    "DELETED": (FLAG_DELETED, True), "UNDELETED": (FLAG_DELETED, False),
+    "FLAGGED": (FLAG_FLAGGED, True), "UNFLAGGED": (FLAG_FLAGGED, False),
+}
+DEFAULT_CAPABILITIES = ("IMAP4rev1", "UIDPLUS", "MOVE", "LITERAL+")
+# Left out of the greeting and pre-login CAPABILITY responses
+AUTHENTICATED_CAPABILITIES = ("UIDPLUS", "MOVE")
+
+
+def parse_imap_date(text):
+    day, month, year = text.split("-")
+    return datetime.date(int(year), MONTHS.index(month.title()) + 1, int(day)).toordinal()
+
+
+def format_imap_date(ordinal):
+    d = datetime.date.fromordinal(ordinal)
+    return f"{d.day:02d}-{MONTHS[d.month - 1]}-{d.year}"
+
+
+class Fenwick:
+    """Prefix counts of live messages, so sequence numbers survive expunges in O(log n)."""
+
+    def __init__(self):
+        self.tree = array("l", [0])
+
+    def append(self, value=1):
+        n = len(self.tree)
+        low = n & -n
+        self.tree.append(value + self.prefix(n - 1) - self.prefix(n - low))
+
+    def extend_ones(self, count):
+        start = len(self.tree)
+        self.tree.extend(i & -i for i in range(start, start + count))
+        # Nodes whose range reaches back before `start` also cover existing entries
+        if start > 1:
+            for i in range(start, start + count):
+                low = i & -i
+                if i - low < start - 1:
+                    self.tree[i] = (i - max(i - low, start - 1)) + self.prefix(start - 1) - self.prefix(i - low)
+
+    def add(self, i, delta):
+        n = len(self.tree)
+        while i < n:
+            self.tree[i] += delta
+            i += i & -i
+
+    def prefix(self, i):
+        total = 0
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def find(self, k):
+        """Smallest position whose prefix count reaches k."""
+        pos, step = 0, 1 << (len(self.tree).bit_length())
+        while step:
+            nxt = pos + step
+            if nxt < len(self.tree) and self.tree[nxt] < k:
+                pos = nxt
+                k -= self.tree[nxt]
+            step >>= 1
+        return pos + 1
+
+
+class Mailbox:
+    """Column-oriented message store; UID n lives at index n - 1."""
+
+    def __init__(self, name):
+        self.name = name
+        self.dates = array("l")
+        self.sizes = array("l")
+        self.senders = array("l")
+        self.seeds = array("l")
+        self.flags = bytearray()
+        self.alive = bytearray()
+        self.live = Fenwick()
+        self.count = 0
+
+    def add(self, date, size, sender, seed, flags=0):
+        self.dates.append(date)
+        self.sizes.append(size)
+        self.senders.append(sender)
+        self.seeds.append(seed)
+        self.flags.append(flags)
+        self.alive.append(1)
+        self.live.append(1)
+        self.count += 1
+        return len(self.dates)
+
+    def fill(self, count, rng, start_date, span_days):
+        """Append `count` synthetic messages spread over `span_days` from start_date."""
+        base = len(self.dates)
+        self.dates.extend(start_date + rng.randrange(span_days) for _ in range(count))
+        self.sizes.extend(int(rng.lognormvariate(9, 1.2)) + 500 for _ in range(count))
+        self.senders.extend(rng.randrange(len(SENDERS)) for _ in range(count))
+        self.seeds.extend(range(base + 1, base + count + 1))
+        self.flags.extend(bytes(count))
+        self.alive.extend(b"\x01" * count)
+        self.live.extend_ones(count)
+        self.count += count
+
+    @property
+    def uidnext(self):
+        return len(self.dates) + 1
+
+    def seq_of(self, index):
+        return self.live.prefix(index + 1)
+
+    def index_of_seq(self, seq):
+        return self.live.find(seq) - 1
+
+    def expunge(self, index):
+        """Remove a message and return the sequence number it had."""
+        seq = self.seq_of(index)
+        self.alive[index] = 0
+        self.live.add(index + 1, -1)
+        self.count -= 1
+        return seq
+
+    def headers(self, index):
+        seed, sender = self.seeds[index], SENDERS[self.senders[index]]
+        d = datetime.date.fromordinal(self.dates[index])
+        lines = [
+            ("FROM", f"From: {sender}"),
+            ("TO", "To: user@mail.example"),
+            ("SUBJECT", f"Subject: Synthetic message {seed}"),
+            ("DATE", f"Date: {d.strftime('%a')}, {d.day} {MONTHS[d.month - 1]} {d.year} 12:00:00 +0000"),
+            ("MESSAGE-ID", f"Message-ID: <{seed}@fake.example>"),
+        ]
+        if self.senders[index] % 3 == 1:
+            lines.append(("LIST-ID", f"List-Id: <{sender.split('@')[0]}.list.example>"))
+        return lines
+
+
+def tokenize(line):
+    """Split an IMAP command line into atoms, quoted strings and nested lists."""
+    tokens = []
+    stack = [tokens]
+    i, n = 0, len(line)
+    while i < n:
+        c = line[i]
+        if c == " ":
+            i += 1
+        elif c == "(":
+            group = []
+            stack[-1].append(group)
+            stack.append(group)
+            i += 1
+        elif c == ")":
+            if len(stack) > 1:
+                stack.pop()
+            i += 1
+        elif c == '"':
+            j, buf = i + 1, []
+            while j < n and line[j] != '"':
+                if line[j] == "\\":
+                    j += 1
+                buf.append(line[j])
+                j += 1
+            stack[-1].append("".join(buf))
+            i = j + 1
+        else:
+            j, depth = i, 0
+            while j < n and (depth or line[j] not in " ()"):
+                if line[j] == "[":
+                    depth += 1
+                elif line[j] == "]":
+                    depth -= 1
+                j += 1
+            stack[-1].append(line[i:j])
+            i = j
+    return tokens
+
+
+class IMAPHandler(socketserver.StreamRequestHandler):
+    """One client connection; commands run under the server-wide lock."""
+
+    def setup(self):
+        super().setup()
+        self.selected = None
+        self.readonly = False
+        self.authenticated = False
+        self.out = bytearray()
+
+    def send(self, text):
+        self.out += text.encode() if isinstance(text, str) else text
+        if len(self.out) > 1 << 20:
+            self.flush()
+
+    def flush(self):
+        if self.out:
+            self.wfile.write(self.out)
+            self.server.count("bytes_out", len(self.out))
+            self.out = bytearray()
+
+    def read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        self.server.count("bytes_in", len(line))
+        text = line.decode("utf-8", "replace").rstrip("\r\n")
+        # Client literals: "... {n}" or "... {n+}" followed by n raw bytes
+        while text.endswith("}") and "{" in text:
+            size_text = text[text.rindex("{") + 1:-1]
+            if not size_text.rstrip("+").isdigit():
+                break
+            if not size_text.endswith("+"):
+                self.send("+ Ready for literal\r\n")
+                self.flush()
+            data = self.rfile.read(int(size_text.rstrip("+")))
+            rest = self.rfile.readline()
+            self.server.count("bytes_in", len(data) + len(rest))
+            text = text[:text.rindex("{")] + '"' + data.decode("utf-8", "replace").replace('"', '\\"') + '"' \
+                + rest.decode("utf-8", "replace").rstrip("\r\n")
+        return text
+
+    def capabilities(self):
+        caps = self.server.capabilities
+        if not self.authenticated:
+            caps = [c for c in caps if c not in AUTHENTICATED_CAPABILITIES]
+        return " ".join(caps)
+
+    def handle(self):
+        self.send(f"* OK [CAPABILITY {self.capabilities()}] Fake IMAP ready\r\n")
+        self.flush()
+        while True:
+            line = self.read_command()
+            if line is None:
+                break
+            tokens = tokenize(line)
+            if len(tokens) < 2:
+                self.send("* BAD Missing command\r\n")
+                self.flush()
+                continue
+            tag, command, args = tokens[0], str(tokens[1]).upper(), tokens[2:]
+            self.server.count("commands", 1)
+            if self.server.latency:
+                time.sleep(self.server.latency)
+            try:
+                with self.server.lock:
+                    status = self.dispatch(command, args)
+            except Exception as e:  # malformed input must not kill the server
+                status = f"BAD {type(e).__name__}: {e}"
+            self.send(f"{tag} {status}\r\n")
+            self.flush()
+            if command == "LOGOUT":
+                break
+
+    def dispatch(self, command, args):
+        if command == "UID":
+            sub = str(args[0]).upper()
+            handler = getattr(self, f"cmd_{sub.lower()}", None)
+            if handler is None or sub not in ("SEARCH", "FETCH", "STORE", "COPY", "MOVE", "EXPUNGE"):
+                return f"BAD Unknown UID command {sub}"
+            return handler(args[1:], uid=True)
+        handler = getattr(self, f"cmd_{command.lower()}", None)
+        if handler is None:
+            return f"BAD Unknown command {command}"
+        return handler(args)
+
+    # -- connection state -------------------------------------------------
+    def cmd_capability(self, args):
+        self.send(f"* CAPABILITY {self.capabilities()}\r\n")
+        return "OK CAPABILITY completed"
+
+    def cmd_noop(self, args):
+        return "OK NOOP completed"
+
+    def cmd_login(self, args):
+        users = self.server.users
+        if users is not None and users.get(args[0]) != args[1]:
+            return "NO [AUTHENTICATIONFAILED] Invalid credentials"
+        self.authenticated = True
+        return "OK LOGIN completed"
+
+    def cmd_logout(self, args):
+        self.send("* BYE Fake IMAP logging out\r\n")
+        return "OK LOGOUT completed"
+
+    def cmd_select(self, args, readonly=False):
+        box = self.server.mailbox(args[0])
+        if box is None:
+            self.selected = None
+            return "NO Mailbox does not exist"
+        self.selected, self.readonly = box, readonly
+        self.send(f"* {box.count} EXISTS\r\n* 0 RECENT\r\n"
+                  "* FLAGS (\\Seen \\Deleted \\Flagged)\r\n"
+                  f"* OK [UIDVALIDITY 1] UIDs valid\r\n* OK [UIDNEXT {box.uidnext}] Predicted next UID\r\n")
+        return f"OK [{'READ-ONLY' if readonly else 'READ-WRITE'}] SELECT completed"
+
+    def cmd_examine(self, args):
+        return self.cmd_select(args, readonly=True)
+
+    def cmd_close(self, args):
+        if self.selected is not None and not self.readonly:
+            self._expunge(lambda i: self.selected.flags[i] & FLAG_DELETED, announce=False)
+        self.selected = None
+        return "OK CLOSE completed"
+
+    # -- message sets -----------------------------------------------------
+    def _indices(self, spec, uid):
+        """Yield live message indices for a UID or sequence set, in order."""
+        box = self.selected
+        top = box.uidnext - 1 if uid else box.count
+        for part in str(spec).split(","):
+            first, _, last = part.partition(":")
+            lo = top if first == "*" else int(first)
+            hi = lo if not last else (top if last == "*" else int(last))
+            lo, hi = min(lo, hi), min(max(lo, hi), top)
+            if uid:
+                for index in range(max(lo, 1) - 1, hi):
+                    if box.alive[index]:
+                        yield index
+            else:
+                for seq in range(max(lo, 1), hi + 1):
+                    yield box.index_of_seq(seq)
+
+    # -- SEARCH -----------------------------------------------------------
+    def _criteria(self, tokens):
+        """Compile search keys into a list of index predicates (all must hold)."""
+        tokens = list(tokens)
+        tests = []
+        while tokens:
+            test = self._search_key(tokens)
+            if test is not None:
+                tests.append(test)
+        return tests
+
+    def _search_key(self, tokens):
+        """Consume one search key (and its arguments) from `tokens`; None means ALL."""
+        box = self.selected
+        key = tokens.pop(0)
+        if isinstance(key, list):
+            inner = self._criteria(key)
+            return lambda i: all(t(i) for t in inner)
+        key = key.upper()
+        if key == "ALL":
+            return None
+        if key == "NOT":
+            inner = self._search_key(tokens) or (lambda i: True)
+            return lambda i: not inner(i)
+        if key == "OR":
+            left = self._search_key(tokens) or (lambda i: True)
+            right = self._search_key(tokens) or (lambda i: True)
+            return lambda i: left(i) or right(i)
+        if key in ("BEFORE", "SENTBEFORE"):
+            day = parse_imap_date(tokens.pop(0))
+            return lambda i: box.dates[i] < day
+        if key in ("SINCE", "SENTSINCE"):
+            day = parse_imap_date(tokens.pop(0))
+            return lambda i: box.dates[i] >= day
+        if key in ("ON", "SENTON"):
+            day = parse_imap_date(tokens.pop(0))
+            return lambda i: box.dates[i] == day
+        if key == "LARGER":
+            size = int(tokens.pop(0))
+            return lambda i: box.sizes[i] > size
+        if key == "SMALLER":
+            size = int(tokens.pop(0))
+            return lambda i: box.sizes[i] < size
+        if key == "FROM":
+            needle = tokens.pop(0).lower()
+            matches = {n for n, sender in enumerate(SENDERS) if needle in sender}
+            return lambda i: box.senders[i] in matches
+        if key == "TO":
+            needle = tokens.pop(0).lower()
+            hit = needle in "user@mail.example"
+            return lambda i: hit
+        if key == "SUBJECT":
+            needle = tokens.pop(0).lower()
+            return lambda i: needle in f"synthetic message {box.seeds[i]}"
+        if key in FLAG_KEYS:
+            bit, want = FLAG_KEYS[key]
+            return lambda i: bool(box.flags[i] & bit) == want
+        if key == "UID":
+            wanted = set(self._indices(tokens.pop(0), uid=True))
+            return lambda i: i in wanted
+        raise ValueError(f"unsupported search key {key}")
+
+    def cmd_search(self, args, uid=False):
+        if self.selected is None:
+            return "BAD No mailbox selected"
+        if args and str(args[0]).upper() == "CHARSET":
+            args = args[2:]
+        box = self.selected
+        tests = self._criteria(args)
+        alive = box.alive
+        hits = [i for i in range(len(alive)) if alive[i] and all(t(i) for t in tests)]
+        numbers = (i + 1 for i in hits) if uid else (box.seq_of(i) for i in hits)
+        self.send("* SEARCH" + "".join(f" {n}" for n in numbers) + "\r\n")
+        return "OK SEARCH completed"
+
+    # -- FETCH ------------------------------------------------------------
+    def cmd_fetch(self, args, uid=False):
+        if self.selected is None:
+            return "BAD No mailbox selected"
+        box = self.selected
+        items = args[1] if isinstance(args[1], list) else [args[1]]
+        names = [str(item).upper() for item in items]
+        if "FAST" in names or "ALL" in names:
+            names = ["FLAGS", "RFC822.SIZE", "INTERNALDATE"]
+        if uid and "UID" not in names:
+            names.insert(0, "UID")
+        for index in self._indices(args[0], uid):
+            parts = []
+            for name in names:
+                if name == "UID":
+                    parts.append(f"UID {index + 1}")
+                elif name == "FLAGS":
+                    parts.append(f"FLAGS ({self._flag_text(box.flags[index])})")
+                elif name == "RFC822.SIZE":
+                    parts.append(f"RFC822.SIZE {box.sizes[index]}")
+                elif name == "INTERNALDATE":
+                    parts.append(f'INTERNALDATE "{format_imap_date(box.dates[index])} 12:00:00 +0000"')
+                elif name.startswith(("BODY[", "BODY.PEEK[")):
+                    section = name[name.index("["):]
+                    if not name.startswith("BODY.PEEK") and not self.readonly:
+                        box.flags[index] |= FLAG_SEEN
+                    body = self._section(box, index, section)
+                    parts.append(f"BODY{section} {{{len(body)}}}\r\n".encode() + body)
+                else:
+                    raise ValueError(f"unsupported fetch item {name}")
+            if self.server.data_items_last:
+                parts.sort(key=lambda part: not isinstance(part, bytes))  # literals first
+            self.send(f"* {box.seq_of(index)} FETCH (".encode())
+            for n, part in enumerate(parts):
+                self.send((" " if n else "").encode() + (part if isinstance(part, bytes) else part.encode()))
+            self.send(b")\r\n")
+        return "OK FETCH completed"
+
+    @staticmethod
+    def _section(box, index, section):
+        headers = box.headers(index)
+        if section.startswith("[HEADER.FIELDS"):
+            fields = section[section.index("(") + 1:section.index(")")].split()
+            lines = [text for key, text in headers if key in fields]
+        elif section in ("[HEADER]", "[]"):
+            lines = [text for key, text in headers]
+        else:
+            raise ValueError(f"unsupported body section {section}")
+        text = "".join(line + "\r\n" for line in lines) + "\r\n"
+        if section == "[]":
+            text += "x" * max(0, box.sizes[index] - len(text))
+        return text.encode()
+
+    @staticmethod
+    def _flag_text(bits):
+        return " ".join(name for bit, name in FLAG_NAMES if bits & bit)
+
+    # -- STORE / COPY / MOVE / EXPUNGE ------------------------------------
+    def cmd_store(self, args, uid=False):
+        if self.selected is None or self.readonly:
+            return "NO Mailbox not writable"
+        box = self.selected
+        action = str(args[1]).upper()
+        flag_list = args[2] if isinstance(args[2], list) else [args[2]]
+        bits = 0
+        for flag in flag_list:
+            for bit, name in FLAG_NAMES:
+                if name.upper() == str(flag).upper():
+                    bits |= bit
+        silent = action.endswith(".SILENT")
+        for index in self._indices(args[0], uid):
+            if action.startswith("+"):
+                box.flags[index] |= bits
+            elif action.startswith("-"):
+                box.flags[index] &= ~bits & 0xFF
+            else:
+                box.flags[index] = bits
+            if not silent:
+                extra = f"UID {index + 1} " if uid else ""
+                self.send(f"* {box.seq_of(index)} FETCH ({extra}FLAGS ({self._flag_text(box.flags[index])}))\r\n")
+        return "OK STORE completed"
+
+    def _copy(self, args, uid):
+        target = self.server.mailbox(args[1])
+        if target is None:
+            return None, "NO [TRYCREATE] Destination mailbox does not exist"
+        box = self.selected
+        moved = list(self._indices(args[0], uid))
+        for index in moved:
+            target.add(box.dates[index], box.sizes[index], box.senders[index], box.seeds[index],
+                       box.flags[index] & ~FLAG_DELETED)
+        return moved, None
+
+    def cmd_copy(self, args, uid=False):
+        if self.selected is None:
+            return "BAD No mailbox selected"
+        moved, error = self._copy(args, uid)
+        return error or "OK COPY completed"
+
+    def cmd_move(self, args, uid=False):
+        if self.selected is None or self.readonly:
+            return "NO Mailbox not writable"
+        moved, error = self._copy(args, uid)
+        if error:
+            return error
+        wanted = set(moved)
+        self._expunge(lambda i: i in wanted)
+        return "OK MOVE completed"
+
+    def _expunge(self, predicate, candidates=None, announce=True):
+        box = self.selected
+        indices = candidates if candidates is not None else range(len(box.alive))
+        # Expunge from the highest index down so earlier sequence numbers stay valid
+        doomed = [i for i in indices if box.alive[i] and predicate(i)]
+        for index in reversed(doomed):
+            seq = box.expunge(index)
+            if announce:
+                self.send(f"* {seq} EXPUNGE\r\n")
+        return len(doomed)
+
+    def cmd_expunge(self, args, uid=False):
+        if self.selected is None or self.readonly:
+            return "NO Mailbox not writable"
+        box = self.selected
+        if uid:
+            candidates = list(self._indices(args[0], uid=True))
+            self._expunge(lambda i: box.flags[i] & FLAG_DELETED, candidates)
+        else:
+            self._expunge(lambda i: box.flags[i] & FLAG_DELETED)
+        return "OK EXPUNGE completed"
+
+
+class FakeIMAPServer(socketserver.ThreadingTCPServer):
+    """Threaded fake IMAP server holding synthetic mailboxes in memory."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, messages=1000, host="127.0.0.1", port=0, latency=0.0,
+                 capabilities=DEFAULT_CAPABILITIES, users=None, seed=0, data_items_last=False,
+                 start_date="01-Jan-2020", span_days=1826,
+                 folders=("[Gmail]/Trash", "Archive")):
+        super().__init__((host, port), IMAPHandler)
+        self.latency = latency
+        self.capabilities = tuple(capabilities)
+        self.users = users
+        self.data_items_last = data_items_last
+        self.lock = threading.RLock()
+        self.stats = {"commands": 0, "bytes_in": 0, "bytes_out": 0}
+        self._stats_lock = threading.Lock()
+        self._thread = None
+
+        self.mailboxes = {"INBOX": Mailbox("INBOX")}
+        for folder in folders:
+            self.mailboxes[folder] = Mailbox(folder)
+        self.mailboxes["INBOX"].fill(messages, random.Random(seed), parse_imap_date(start_date), span_days)
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def mailbox(self, name):
+        name = str(name)
+        return self.mailboxes.get("INBOX" if name.upper() == "INBOX" else name)
+
+    def count(self, key, amount):
+        with self._stats_lock:
+            self.stats[key] += amount
+
+    def reset_stats(self):
+        with self._stats_lock:
+            for key in self.stats:
+                self.stats[key] = 0
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a fake IMAP server with synthetic messages")
+    parser.add_argument("--messages", type=int, default=10000)
+    parser.add_argument("--port", type=int, default=1143)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every command")
+    parser.add_argument("--data-items-last", action="store_true",
+                        help="send UID and RFC822.SIZE after the header literal in FETCH responses")
+    args = parser.parse_args()
+
+    server = FakeIMAPServer(args.messages, port=args.port, latency=args.latency,
+                            data_items_last=args.data_items_last)
+    print(f"Fake IMAP on 127.0.0.1:{server.port} with {args.messages:,} messages (any login accepted)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
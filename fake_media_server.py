@@ -0,0 +1,256 @@
+"""
+Fake Media Server
+In-process HTTP server with synthetic video files, for testing and
+benchmarking the downloaders without hitting a real site.
+
+Each file is deterministic pseudo-random bytes, generated on the fly, so a
+multi-gigabyte fixture costs no memory or disk. The server speaks HTTP/1.1
+with keep-alive and honours single byte ranges (206 / 416 responses).
+/index.html is a page embedding every file as a <video> tag, which yt-dlp's
+generic extractor treats as a playlist. Requests can be delayed, each
+connection can be throttled to a fixed bandwidth (like a site that limits
+each connection), and connections can be dropped part-way through a body to
+exercise resume. The server counts requests, range requests, bytes sent and
+the most connections open at once.
+
+Requirements: none (standard library only)
+Usage:
+    with FakeMediaServer(files=5, size=20_000_000, bandwidth=2_000_000) as server:
+        url = server.url("clip-000.mp4")
+        ...
+        print(server.stats)
+
+    python fake_media_server.py --files 10 --size 50000000 --port 8000   # serve until Ctrl+C
+"""
+
+import argparse
+import hashlib
+import http.server
+import random
+import re
+import socketserver
+import threading
+import time
+
+# Not a power of two, so a segment written at the wrong offset never matches by accident
+PATTERN_BYTES = 65521
+SEND_CHUNK = 64 * 1024
+RANGE_HEADER = re.compile(r"bytes=(\d*)-(\d*)$")
+
+
+class SyntheticFile:
+    """`size` bytes made by repeating a pattern derived from the file's name."""
+
+    def __init__(self, name, size):
+        self.name = name
+        self.size = size
+        self.pattern = random.Random(name).randbytes(PATTERN_BYTES)
+        self._sha256 = None
+
+    def read(self, start, length):
+        """Bytes [start, start + length) of the file."""
+        out = bytearray()
+        offset = start % PATTERN_BYTES
+        while len(out) < length:
+            piece = self.pattern[offset:offset + length - len(out)]
+            out += piece
+            offset = 0
+        return bytes(out)
+
+    def sha256(self):
+        if self._sha256 is None:
+            digest = hashlib.sha256()
+            for start in range(0, self.size, SEND_CHUNK * 16):
+                digest.update(self.read(start, min(SEND_CHUNK * 16, self.size - start)))
+            self._sha256 = digest.hexdigest()
+        return self._sha256
+
+
+class MediaHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        self.server.connection_opened()
+
+    def finish(self):
+        try:
+            super().finish()
+        finally:
+            self.server.connection_closed()
+
+    def do_HEAD(self):
+        self._respond(body=False)
+
+    def do_GET(self):
+        self._respond(body=True)
+
+    def _respond(self, body):
+        server = self.server
+        server.count("requests", 1)
+        if server.latency:
+            time.sleep(server.latency)
+        name = self.path.split("?")[0].lstrip("/")
+        if name in ("", "index.html"):
+            self._send_page(body)
+            return
+        media = server.files.get(name)
+        if media is None:
+            self.send_error(404)
+            return
+
+        start, end = 0, media.size - 1
+        status = 200
+        range_header = self.headers.get("Range")
+        if range_header and server.ranges:
+            match = RANGE_HEADER.match(range_header.strip())
+            if match is None or not any(match.groups()):
+                self.send_error(416)
+                return
+            first, last = match.groups()
+            if first:
+                start, end = int(first), min(int(last), media.size - 1) if last else media.size - 1
+            else:
+                start = max(0, media.size - int(last))
+            if start >= media.size or start > end:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{media.size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            status = 206
+            server.count("range_requests", 1)
+
+        self.send_response(status)
+        self.send_header("Content-Type", "video/mp4")
+        self.send_header("Content-Length", str(end - start + 1))
+        if server.ranges:
+            self.send_header("Accept-Ranges", "bytes")
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{media.size}")
+        self.end_headers()
+        if body:
+            try:
+                self._send_body(media, start, end + 1)
+            except (BrokenPipeError, ConnectionResetError):
+                self.close_connection = True  # the client hung up, e.g. after reading the headers
+
+    def _send_body(self, media, start, stop):
+        server = self.server
+        sent, began = 0, time.monotonic()
+        pos = start
+        while pos < stop:
+            chunk = media.read(pos, min(SEND_CHUNK, stop - pos))
+            if server.drop_after is not None and sent + len(chunk) > server.drop_after:
+                chunk = chunk[:max(0, server.drop_after - sent)]
+                self.wfile.write(chunk)
+                server.count("bytes_out", len(chunk))
+                server.count("dropped", 1)
+                self.close_connection = True
+                return
+            self.wfile.write(chunk)
+            pos += len(chunk)
+            sent += len(chunk)
+            server.count("bytes_out", len(chunk))
+            if server.bandwidth:
+                ahead = sent / server.bandwidth - (time.monotonic() - began)
+                if ahead > 0:
+                    time.sleep(ahead)
+
+    def _send_page(self, body):
+        links = "\n".join(f'<video src="/{name}" title="{name}"></video>' for name in self.server.files)
+        page = f"<html><head><title>Fixture media</title></head><body>\n{links}\n</body></html>\n".encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(page)))
+        self.end_headers()
+        if body:
+            self.wfile.write(page)
+
+
+class FakeMediaServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    """Threaded HTTP server serving synthetic media files from memory."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, files=3, size=1_000_000, host="127.0.0.1", port=0, latency=0.0,
+                 bandwidth=None, ranges=True, drop_after=None):
+        super().__init__((host, port), MediaHandler)
+        names = [f"clip-{i:03d}.mp4" for i in range(files)] if isinstance(files, int) else list(files)
+        sizes = size if isinstance(size, (list, tuple)) else [size] * len(names)
+        self.files = {name: SyntheticFile(name, n) for name, n in zip(names, sizes)}
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.ranges = ranges
+        self.drop_after = drop_after
+        self.stats = {"requests": 0, "range_requests": 0, "bytes_out": 0, "dropped": 0,
+                      "connections": 0, "max_open": 0}
+        self._open = 0
+        self._stats_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def url(self, name="index.html"):
+        return f"http://{self.server_address[0]}:{self.port}/{name}"
+
+    def count(self, key, amount):
+        with self._stats_lock:
+            self.stats[key] += amount
+
+    def connection_opened(self):
+        with self._stats_lock:
+            self._open += 1
+            self.stats["connections"] += 1
+            self.stats["max_open"] = max(self.stats["max_open"], self._open)
+
+    def connection_closed(self):
+        with self._stats_lock:
+            self._open -= 1
+
+    def reset_stats(self):
+        with self._stats_lock:
+            for key in self.stats:
+                self.stats[key] = 0
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve synthetic media files over HTTP")
+    parser.add_argument("--files", type=int, default=3)
+    parser.add_argument("--size", type=int, default=10_000_000, help="bytes per file")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument("--bandwidth", type=int, help="bytes/second per connection")
+    parser.add_argument("--no-ranges", action="store_true", help="ignore Range headers")
+    args = parser.parse_args()
+
+    server = FakeMediaServer(args.files, args.size, port=args.port, latency=args.latency,
+                             bandwidth=args.bandwidth, ranges=not args.no_ranges)
+    print(f"Fake media on {server.url()} ({args.files} file(s) of {args.size:,} bytes)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,157 @@
+"""
+File Deduplication
+Finds files with identical contents, reading as little data as possible.
+
+Candidates are grouped by size first; only sizes shared by two or more files
+go on to a hash of their first and last 64 KB, and only files that still
+collide are hashed in full (memory-mapped, in a process pool). Every hash is
+stored in a SQLite cache keyed by (device, inode, size, mtime), so a repeat
+run over a large archive only reads files that are new or have changed.
+
+Requirements: none (standard library only)
+Usage:
+    from file_dedup import HashCache, find_duplicates
+    with HashCache("hashes.sqlite") as cache:
+        for group in find_duplicates(paths, cache):
+            keep, *copies = group
+"""
+
+import hashlib
+import mmap
+import os
+import sqlite3
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+EDGE_BLOCK = 64 * 1024
+HASH_CHUNK = 16 * 1024 * 1024
+DEFAULT_THREADS = 8
+
+
+class HashCache:
+    """Edge and full hashes keyed by (device, inode), valid while size and mtime match."""
+
+    def __init__(self, path=None):
+        self.db = sqlite3.connect(path or ":memory:")
+        self.db.execute("CREATE TABLE IF NOT EXISTS hashes (dev INTEGER, ino INTEGER, size INTEGER, "
+                        "mtime_ns INTEGER, edge TEXT, full TEXT, PRIMARY KEY (dev, ino))")
+        self.hits = self.misses = 0
+
+    def get(self, st):
+        row = self.db.execute("SELECT size, mtime_ns, edge, full FROM hashes WHERE dev = ? AND ino = ?",
+                              (st.st_dev, st.st_ino)).fetchone()
+        if row and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+            return {"edge": row[2], "full": row[3]}
+        return None
+
+    def put(self, st, edge=None, full=None):
+        # Keep whichever hash is already stored when only the other one is new
+        self.db.execute(
+            "INSERT INTO hashes VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (dev, ino) DO UPDATE SET "
+            "size = excluded.size, mtime_ns = excluded.mtime_ns, "
+            "edge = CASE WHEN hashes.size = excluded.size AND hashes.mtime_ns = excluded.mtime_ns "
+            "            THEN COALESCE(excluded.edge, hashes.edge) ELSE excluded.edge END, "
+            "full = CASE WHEN hashes.size = excluded.size AND hashes.mtime_ns = excluded.mtime_ns "
+            "            THEN COALESCE(excluded.full, hashes.full) ELSE excluded.full END",
+            (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, edge, full))
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def edge_hash(path, size):
+    """Hash of the first and last EDGE_BLOCK bytes (the whole file if it is small)."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        if size <= 2 * EDGE_BLOCK:
+            digest.update(f.read())
+        else:
+            digest.update(f.read(EDGE_BLOCK))
+            f.seek(-EDGE_BLOCK, os.SEEK_END)
+            digest.update(f.read(EDGE_BLOCK))
+    return digest.hexdigest()
+
+
+def full_hash(path):
+    """Hash of the whole file through a read-only memory map."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+        for start in range(0, len(view), HASH_CHUNK):
+            digest.update(view[start:start + HASH_CHUNK])
+    return digest.hexdigest()
+
+
+def _hash_stage(items, key, compute, executor, cache):
+    """Fill item[key] from the cache or by running `compute` on the executor."""
+    todo = []
+    for item in items:
+        cached = cache.get(item["stat"]) if cache else None
+        if cached and cached[key]:
+            item[key] = cached[key]
+            if cache:
+                cache.hits += 1
+        else:
+            todo.append(item)
+    args = [(item["path"], item["stat"].st_size) if key == "edge" else (item["path"],) for item in todo]
+    for item, value in zip(todo, executor.map(compute, *zip(*args)) if todo else ()):
+        item[key] = value
+        if cache:
+            cache.misses += 1
+            cache.put(item["stat"], **{key: value})
+
+
+def _collisions(items, key):
+    groups = defaultdict(list)
+    for item in items:
+        groups[(item["stat"].st_size, item[key])].append(item)
+    return [group for group in groups.values() if len(group) > 1]
+
+
+def find_duplicates(paths, cache=None, processes=None, threads=DEFAULT_THREADS):
+    """Return groups (lists of paths, input order kept) of files with identical contents.
+
+    Empty files and paths that are not regular files are ignored, and hard
+    links to the same inode count as one file.
+    """
+    paths = list(paths)
+    by_size, seen = defaultdict(list), set()
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        if not st.st_size or (st.st_dev, st.st_ino) in seen or not os.path.isfile(path):
+            continue
+        seen.add((st.st_dev, st.st_ino))
+        by_size[st.st_size].append({"path": path, "stat": st})
+
+    candidates = [item for group in by_size.values() if len(group) > 1 for item in group]
+    if not candidates:
+        return []
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        _hash_stage(candidates, "edge", edge_hash, executor, cache)
+    groups = _collisions(candidates, "edge")
+
+    # Small files were hashed whole by the edge stage already
+    big = [item for group in groups for item in group if item["stat"].st_size > 2 * EDGE_BLOCK]
+    for item in (item for group in groups for item in group if item["stat"].st_size <= 2 * EDGE_BLOCK):
+        item["full"] = item["edge"]
+    if big:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            _hash_stage(big, "full", full_hash, executor, cache)
+    if cache:
+        cache.db.commit()
+
+    order = {path: i for i, path in enumerate(paths)}
+    result = [sorted((item["path"] for item in group), key=order.get)
+              for group in _collisions([item for group in groups for item in group], "full")]
+    result.sort(key=lambda group: order[group[0]])
+    return result
@@ -1,8 +1,235 @@
-import os, shutil
-
-folder = "Downloads"
-for file in os.listdir(folder):
-    if file.endswith((".jpg", ".png")):
-        shutil.move(os.path.join(folder, file), os.path.join(folder, "Images"))
-    elif file.endswith(".pdf"):
-        shutil.move(os.path.join(folder, file), os.path.join(folder, "PDFs"))
\ No newline at end of file
+"""
+Folder Organizer
+Files downloads into subfolders by rule: by default images go to Images/
+and PDFs to PDFs/.
+
+Rules can match on extension, sniffed MIME type, size and age, and can file
+into dated folders (see organizer_engine.py for the JSON format). With
+--recursive, files in subfolders are filed too. Moves are plain renames on
+the same device; cross-device copies run in a thread pool.
+
+With --dedup, files whose contents match another file (in the folder or
+already filed) are found by size, then first/last-block hash, then full
+hash, with hashes cached between runs (see file_dedup.py). The oldest copy
+is filed as usual and each repeat is skipped (left in place), replaced by a
+hard link to the kept copy, or moved to Duplicates/.
+
+With --watch the folder is organized once and then watched (inotify on
+Linux, polling elsewhere; see folder_watch.py). New files are filed in
+batches once they have finished downloading.
+
+Requirements: none (standard library only)
+Usage:
+    python folder-organizer.py Downloads
+    python folder-organizer.py Downloads --rules rules.json --recursive
+    python folder-organizer.py Downloads --dedup quarantine
+    python folder-organizer.py Downloads --dedup hardlink --hash-cache ~/.cache/organizer-hashes.sqlite
+    python folder-organizer.py Downloads --watch             # stay running instead of a cron job
+    python folder-organizer.py Downloads --dedup skip --trace trace.json   # time each stage (perf_trace.py)
+"""
+
+import argparse
+import os
+import time
+from collections import defaultdict
+
+import perf_trace
+from file_dedup import HashCache, find_duplicates
+from folder_watch import DEFAULT_SETTLE, FolderWatcher
+from organizer_engine import DEFAULT_WORKERS, RuleSet, free_name, move_files, plan_moves, scan_tree
+
+HASH_CACHE_NAME = ".organizer-hashes.sqlite"
+DUPLICATES_DIR = "Duplicates"
+
+
+def filed_files(folder, roots):
+    """Paths of files already filed anywhere under the destination folders."""
+    paths = []
+    for root in sorted(roots):
+        base = os.path.join(folder, root)
+        if os.path.isdir(base):
+            paths.extend(os.path.join(base, rel) for rel in scan_tree(base, recursive=True))
+    return paths
+
+
+class FiledIndex:
+    """Already-filed files grouped by size, so watch mode never rescans the destinations."""
+
+    def __init__(self, folder, roots):
+        self.by_size = defaultdict(list)
+        for path in filed_files(folder, roots):
+            self.add(path)
+
+    def add(self, path):
+        try:
+            self.by_size[os.stat(path).st_size].append(path)
+        except OSError:
+            pass
+
+    def same_size_as(self, paths):
+        """Filed files sharing a size with any of `paths` (the only possible duplicates)."""
+        sizes = set()
+        for path in paths:
+            try:
+                sizes.add(os.stat(path).st_size)
+            except OSError:
+                pass
+        return [filed for size in sizes for filed in self.by_size.get(size, ())]
+
+
+@perf_trace.traced("organizer.dedup")
+def split_duplicates(folder, moves, roots, cache=None, filed_index=None):
+    """Separate repeats from the files to file.
+
+    Returns (moves, {repeat: (kept path, destination folder)}). A copy that
+    is already filed is always the one kept; otherwise the oldest candidate
+    wins (then the first by name), and its kept path is where it is now.
+    """
+    candidates = {os.path.join(folder, rel): rel for rel, _ in moves}
+    if filed_index is not None:
+        filed = filed_index.same_size_as(candidates)
+    else:
+        filed = filed_files(folder, roots)
+    targets = dict(moves)
+
+    def rank(path):
+        if path not in candidates:
+            return (0, 0, path)
+        return (1, os.stat(path).st_mtime_ns, path)
+
+    repeats = {}
+    for group in find_duplicates(filed + sorted(candidates), cache):
+        keep, *others = sorted(group, key=rank)
+        for path in others:
+            if path in candidates:
+                rel = candidates[path]
+                repeats[rel] = (keep, targets[rel])
+    return [(rel, target) for rel, target in moves if rel not in repeats], repeats
+
+
+@perf_trace.traced("organizer.repeats")
+def handle_repeats(folder, repeats, mode, workers=DEFAULT_WORKERS):
+    """Apply the --dedup mode to repeats once the kept copies are in place.
+
+    "skip" leaves them where they are, "quarantine" moves them to
+    Duplicates/, and "hardlink" files them as hard links to the kept copy.
+    """
+    if mode == "quarantine":
+        move_files(folder, [(rel, DUPLICATES_DIR) for rel in repeats], workers)
+    elif mode == "hardlink":
+        claimed = defaultdict(set)
+        for rel, (keep, target) in repeats.items():
+            src, name, directory = os.path.join(folder, rel), os.path.basename(rel), os.path.join(folder, target)
+            existing = os.path.join(directory, name)
+            if os.path.exists(existing) and os.path.samefile(existing, keep):
+                os.remove(src)  # the same contents are already filed under this name
+                continue
+            os.makedirs(directory, exist_ok=True)
+            link = os.path.join(directory, free_name(directory, name, claimed[target]))
+            try:
+                os.link(keep, link)
+            except OSError as e:
+                print(f"  Cannot hardlink {rel} to {keep} ({e}); left in place")
+                continue
+            os.remove(src)
+
+
+def organize(folder, moves, rules, dedup="off", cache=None, filed_index=None, workers=DEFAULT_WORKERS):
+    """File the planned moves, applying the dedup mode; returns ({source: new path}, repeats, stats)."""
+    repeats = {}
+    if dedup != "off":
+        moves, repeats = split_duplicates(folder, moves, rules.roots(), cache, filed_index)
+    done, stats = move_files(folder, moves, workers)
+    for rel, error in stats["failed"]:
+        print(f"  Cannot move {rel}: {error}")
+    if filed_index is not None:
+        for path in done.values():
+            filed_index.add(path)
+    if repeats:
+        # A kept copy filed in this same run now lives at its new path
+        moved = {os.path.join(folder, rel): path for rel, path in done.items()}
+        repeats = {rel: (moved.get(keep, keep), target) for rel, (keep, target) in repeats.items()}
+        handle_repeats(folder, repeats, dedup, workers)
+    return done, repeats, stats
+
+
+def watch(folder, rules, dedup="off", cache=None, settle=DEFAULT_SETTLE, use_inotify=None,
+          workers=DEFAULT_WORKERS, watcher=None):
+    """File new downloads as they finish arriving, until interrupted.
+
+    Pass a `watcher` created before any initial organize pass so files that
+    land during that pass are not mistaken for ones already seen.
+    """
+    filed_index = FiledIndex(folder, rules.roots()) if dedup != "off" else None
+    if watcher is None:
+        watcher = FolderWatcher(folder, settle=settle, use_inotify=use_inotify)
+
+    def on_batch(names):
+        moves = []
+        for name in names:
+            if name.startswith(HASH_CACHE_NAME):
+                continue  # the cache (and its journal) is written to while we run
+            target = rules.destination(os.path.join(folder, name))
+            if target is not None:
+                moves.append((name, target))
+        if not moves:
+            return
+        done, repeats, _ = organize(folder, moves, rules, dedup, cache, filed_index, workers)
+        for name in done:
+            watcher.forget(name)
+        print(f"{time.strftime('%H:%M:%S')} filed {len(done)} file(s)"
+              + (f", {len(repeats)} duplicate(s)" if repeats else ""))
+        if cache is not None:
+            cache.db.commit()
+
+    mode = "inotify" if watcher.use_inotify else f"polling every {watcher.poll_interval:g}s"
+    print(f"Watching {folder} ({mode}); Ctrl+C to stop")
+    try:
+        watcher.run(on_batch)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sort downloads into subfolders by rule")
+    parser.add_argument("folder", nargs="?", default="Downloads")
+    parser.add_argument("--rules", help="JSON rule file (default: .jpg/.png -> Images, .pdf -> PDFs)")
+    parser.add_argument("--recursive", action="store_true", help="also file files found in subfolders")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="threads for cross-device moves (default: %(default)s)")
+    parser.add_argument("--dedup", choices=("off", "skip", "hardlink", "quarantine"), default="off",
+                        help="what to do with files whose contents are already present")
+    parser.add_argument("--hash-cache", help=f"hash cache file (default: FOLDER/{HASH_CACHE_NAME})")
+    parser.add_argument("--watch", action="store_true", help="keep running and file new files as they arrive")
+    parser.add_argument("--settle", type=float, default=DEFAULT_SETTLE,
+                        help="seconds a file being written must stay unchanged before it is moved")
+    parser.add_argument("--poll", action="store_true", help="watch by polling instead of inotify")
+    perf_trace.add_arguments(parser)
+    args = parser.parse_args()
+    perf_trace.from_args(args)
+
+    folder = args.folder
+    try:
+        rules = RuleSet.from_file(args.rules) if args.rules else RuleSet()
+    except (OSError, KeyError, ValueError) as e:
+        raise SystemExit(f"Bad rules file {args.rules}: {e}")
+    cache = HashCache(args.hash_cache or os.path.join(folder, HASH_CACHE_NAME)) if args.dedup != "off" else None
+    # Snapshot the folder before the initial pass: anything arriving during it is then new to the watcher
+    watcher = FolderWatcher(folder, settle=args.settle, use_inotify=False if args.poll else None) if args.watch else None
+    try:
+        moves = [(rel, target) for rel, target in plan_moves(folder, rules, args.recursive, skip={DUPLICATES_DIR})
+                 if not rel.startswith(HASH_CACHE_NAME)]
+        done, repeats, stats = organize(folder, moves, rules, args.dedup, cache, workers=args.workers)
+        if cache is not None:
+            print(f"Found {len(repeats):,} duplicate(s); computed {cache.misses:,} hash(es), "
+                  f"{cache.hits:,} from cache")
+        print(f"Filed {len(done):,} file(s) in {stats['seconds']:.1f}s "
+              f"({stats['copied']:,} copied across devices)"
+              + (f"; {len(stats['failed']):,} failed" if stats["failed"] else ""))
+        if watcher is not None:
+            for rel in done:
+                watcher.forget(rel)
+            watch(folder, rules, args.dedup, cache, workers=args.workers, watcher=watcher)
+    finally:
+        if cache is not None:
+            cache.close()
@@ -0,0 +1,229 @@
+"""
+Folder Watcher
+Reports files that have finished arriving in a folder, without rescanning it.
+
+On Linux the kernel's inotify API is called directly through ctypes (no
+third-party package); elsewhere, or with use_inotify=False, the folder is
+polled with os.scandir. The folder is scanned once at startup into an
+in-memory index, which events then keep current.
+
+A file counts as ready once it has been closed after writing or moved into
+place, and nothing has touched it for a short grace period. A file that is
+only being written to must stay quiet for `settle` seconds first. Ready
+files are handed over in batches. While nothing is pending the inotify loop
+blocks in select() and uses no CPU.
+
+Requirements: none (standard library only)
+Usage:
+    watcher = FolderWatcher("Downloads")
+    watcher.run(lambda names: print("ready:", names))
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+
+DEFAULT_SETTLE = 0.5
+DEFAULT_GRACE = 0.05
+DEFAULT_POLL_INTERVAL = 1.0
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE
+              | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class Inotify:
+    """Minimal ctypes binding for one inotify instance."""
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+    def add_watch(self, path, mask=WATCH_MASK):
+        wd = self._add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), path)
+        return wd
+
+    def read(self, timeout=None):
+        """Wait up to `timeout` seconds (None = forever); return [(mask, name)]."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events, pos = [], 0
+        while pos + EVENT_HEADER.size <= len(data):
+            wd, mask, cookie, length = EVENT_HEADER.unpack_from(data, pos)
+            pos += EVENT_HEADER.size
+            name = os.fsdecode(data[pos:pos + length].rstrip(b"\0"))
+            pos += length
+            events.append((mask, name))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+def inotify_available():
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        Inotify().close()
+    except (OSError, AttributeError):
+        return False
+    return True
+
+
+class FolderWatcher:
+    """Tracks the regular files directly inside `folder` and reports settled arrivals."""
+
+    def __init__(self, folder, settle=DEFAULT_SETTLE, grace=DEFAULT_GRACE, use_inotify=None,
+                 poll_interval=DEFAULT_POLL_INTERVAL):
+        self.folder = folder
+        self.settle = settle
+        self.grace = grace
+        self.poll_interval = poll_interval
+        self.use_inotify = inotify_available() if use_inotify is None else use_inotify
+        self.index = {}
+        self.pending = {}  # name -> time it becomes ready unless touched again
+        self.rescan()
+
+    def _signature(self, name):
+        try:
+            st = os.stat(os.path.join(self.folder, name))
+        except OSError:
+            return None
+        if not os.path.isfile(os.path.join(self.folder, name)):
+            return None
+        return st.st_size, st.st_mtime_ns
+
+    def rescan(self):
+        """Rebuild the index from disk; returns names that are new or changed."""
+        index = {}
+        with os.scandir(self.folder) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    st = entry.stat()
+                    index[entry.name] = (st.st_size, st.st_mtime_ns)
+        changed = [name for name, sig in index.items() if self.index.get(name) != sig]
+        self.index = index
+        return changed
+
+    def touch(self, name, delay):
+        self.pending[name] = time.monotonic() + delay
+
+    def forget(self, name):
+        """Drop a name the caller moved away itself."""
+        self.index.pop(name, None)
+        self.pending.pop(name, None)
+
+    def _handle(self, mask, name):
+        if mask & IN_Q_OVERFLOW:
+            # Events were lost: resynchronise with one scan
+            for changed in self.rescan():
+                self.touch(changed, self.settle)
+            return
+        if not name or mask & IN_ISDIR:
+            return
+        if mask & (IN_DELETE | IN_MOVED_FROM):
+            self.forget(name)
+        elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+            self.touch(name, self.grace)
+        elif mask & (IN_CREATE | IN_MODIFY | IN_ATTRIB):
+            self.touch(name, self.settle)
+
+    def _due(self):
+        """Pop pending names whose quiet period has passed and that still exist."""
+        now = time.monotonic()
+        due = [name for name, deadline in self.pending.items() if deadline <= now]
+        ready = []
+        for name in due:
+            del self.pending[name]
+            sig = self._signature(name)
+            if sig is not None:
+                self.index[name] = sig
+                ready.append(name)
+        return sorted(ready)
+
+    def _timeout(self, cap=None):
+        if not self.pending:
+            return cap
+        wait = max(0.0, min(self.pending.values()) - time.monotonic())
+        return wait if cap is None else min(wait, cap)
+
+    def _poll_changes(self, previous):
+        """Polling fallback: a file is pending until its size and mtime stop changing."""
+        current = {}
+        with os.scandir(self.folder) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    st = entry.stat()
+                    current[entry.name] = (st.st_size, st.st_mtime_ns)
+        for name in previous.keys() - current.keys():
+            self.forget(name)
+        for name, sig in current.items():
+            if previous.get(name) != sig:
+                self.touch(name, self.settle)
+        return current
+
+    def run(self, on_batch, stop=None):
+        """Call on_batch(names) for every batch of ready files until stop() is true.
+
+        Without a stop callback the loop runs until interrupted and sleeps
+        indefinitely while idle; with one, stop() is checked every
+        poll_interval seconds.
+        """
+        idle_timeout = self.poll_interval if stop else None
+        stop = stop or (lambda: False)
+        if not self.use_inotify:
+            seen = dict(self.index)
+            while not stop():
+                time.sleep(self._timeout(self.poll_interval))
+                seen = self._poll_changes(seen)
+                ready = self._due()
+                if ready:
+                    on_batch(ready)
+            return
+
+        inotify = Inotify()
+        try:
+            inotify.add_watch(self.folder)
+            # Anything that arrived between the startup scan and the watch starting
+            for name in self.rescan():
+                self.touch(name, self.settle)
+            while not stop():
+                for mask, name in inotify.read(self._timeout(idle_timeout)):
+                    if mask & (IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED):
+                        raise RuntimeError(f"Watched folder {self.folder} was removed or moved")
+                    self._handle(mask, name)
+                ready = self._due()
+                if ready:
+                    on_batch(ready)
+        finally:
+            inotify.close()
@@ -0,0 +1,134 @@
+"""
+Inbox Cleaner Benchmark
+Measures the cleaner's search/flag/expunge path against the in-process fake
+IMAP server (fake_imap_server.py) instead of a real mailbox.
+
+For each mailbox size a fresh server is loaded with synthetic messages, the
+cleaner removes everything older than the cutoff, and the run reports
+messages/second plus the round trips and bytes the server actually saw.
+Use it before and after changing imap_bulk.py to catch regressions.
+
+Requirements: none (standard library only)
+Usage:
+    python imap_benchmark.py                              # 1k, 100k, 1M messages
+    python imap_benchmark.py --sizes 1000,10000 --latency 0.02
+    python imap_benchmark.py --move-to Archive --no-uidplus
+    python imap_benchmark.py --naive --sizes 1000         # compare with one STORE per message
+    python imap_benchmark.py --headers --sizes 100000     # header-classification path (any List-Id)
+    python imap_benchmark.py --json results.json
+"""
+
+import argparse
+import json
+import time
+
+import imap_bulk
+import imap_classify
+from fake_imap_server import DEFAULT_CAPABILITIES, FakeIMAPServer
+
+DEFAULT_SIZES = (1_000, 100_000, 1_000_000)
+# Synthetic mail spans 2020-2024, so this cutoff matches roughly 60% of it
+DEFAULT_BEFORE = "01-Jan-2023"
+
+
+def naive_clean(conn, folder, criteria):
+    """The original cleaner: one STORE round trip per message, then EXPUNGE."""
+    conn.select(imap_bulk.quote_mailbox(folder))
+    _, data = conn.search(None, criteria)
+    nums = data[0].split()
+    for num in nums:
+        conn.store(num, "+FLAGS", "\\Deleted")
+    conn.expunge()
+    return {"messages": len(nums)}
+
+
+def run_case(size, before=DEFAULT_BEFORE, latency=0.0, move_to=None, capabilities=DEFAULT_CAPABILITIES,
+             naive=False, rules=None, batch_bytes=imap_bulk.DEFAULT_BATCH_BYTES,
+             batch_size=imap_bulk.DEFAULT_BATCH_SIZE):
+    """Clean one freshly loaded fake mailbox and return the measured numbers."""
+    load_started = time.perf_counter()
+    with FakeIMAPServer(size, latency=latency, capabilities=capabilities) as server:
+        load_seconds = time.perf_counter() - load_started
+        conn = imap_bulk.connect("127.0.0.1", "bench", "bench", server.port, ssl=False)
+        server.reset_stats()  # count only the cleaning, not greeting and login
+        criteria = f"(BEFORE {before})"
+        started = time.perf_counter()
+        try:
+            if naive:
+                stats = naive_clean(conn, "inbox", criteria)
+            elif rules:
+                stats = imap_classify.clean_by_headers(conn, "inbox", rules, criteria, move_to,
+                                                       max_bytes=batch_bytes, max_count=batch_size, quiet=True)
+            else:
+                stats = imap_bulk.clean_folder(conn, "inbox", criteria, move_to,
+                                               batch_bytes, batch_size, quiet=True)
+            seconds = time.perf_counter() - started
+            remaining = server.mailbox("INBOX").count
+        finally:
+            conn.logout()
+        wire = dict(server.stats)
+
+    return {
+        "mailbox": size,
+        "mode": "naive" if naive else "headers" if rules else ("move" if move_to else "delete"),
+        "messages": stats["messages"],
+        "remaining": remaining,
+        "seconds": seconds,
+        "rate": stats["messages"] / seconds if seconds > 0 else 0,
+        "round_trips": wire["commands"] - 1,  # minus LOGOUT
+        "bytes_sent": wire["bytes_in"],
+        "bytes_received": wire["bytes_out"],
+        "load_seconds": load_seconds,
+    }
+
+
+def format_bytes(n):
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024 or unit == "GB":
+            return f"{n:,.0f} {unit}" if unit == "B" else f"{n:,.1f} {unit}"
+        n /= 1024
+
+
+def print_results(results):
+    print(f"{'Mailbox':>10} {'Mode':>7} {'Removed':>10} {'Seconds':>8} {'Msgs/s':>10} "
+          f"{'Trips':>6} {'Sent':>10} {'Received':>10}")
+    for r in results:
+        print(f"{r['mailbox']:>10,} {r['mode']:>7} {r['messages']:>10,} {r['seconds']:>8.2f} "
+              f"{r['rate']:>10,.0f} {r['round_trips']:>6,} {format_bytes(r['bytes_sent']):>10} "
+              f"{format_bytes(r['bytes_received']):>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the inbox cleaner against a fake IMAP server")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="comma-separated mailbox sizes")
+    parser.add_argument("--before", default=DEFAULT_BEFORE, help="IMAP cutoff date")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every command")
+    parser.add_argument("--move-to", help="benchmark moving instead of deleting (e.g. Archive)")
+    parser.add_argument("--no-uidplus", action="store_true", help="server without UIDPLUS/MOVE")
+    parser.add_argument("--naive", action="store_true", help="also run the one-STORE-per-message baseline")
+    parser.add_argument("--headers", action="store_true",
+                        help="also run header classification (delete any List-Id mail before the cutoff)")
+    parser.add_argument("--batch-bytes", type=int, default=imap_bulk.DEFAULT_BATCH_BYTES)
+    parser.add_argument("--batch-size", type=int, default=imap_bulk.DEFAULT_BATCH_SIZE)
+    parser.add_argument("--json", help="also write results to this JSON file")
+    args = parser.parse_args()
+
+    capabilities = ("IMAP4rev1",) if args.no_uidplus else DEFAULT_CAPABILITIES
+    results = []
+    for size in (int(s) for s in args.sizes.split(",")):
+        print(f"Running {size:,} messages...")
+        results.append(run_case(size, args.before, args.latency, args.move_to, capabilities,
+                                batch_bytes=args.batch_bytes, batch_size=args.batch_size))
+        if args.headers:
+            results.append(run_case(size, args.before, args.latency, args.move_to, capabilities,
+                                    rules=[imap_classify.list_id_matches()],
+                                    batch_bytes=args.batch_bytes, batch_size=args.batch_size))
+        if args.naive:
+            results.append(run_case(size, args.before, args.latency, capabilities=capabilities, naive=True))
+
+    print_results(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.json}")
@@ -0,0 +1,250 @@
+"""
+IMAP Header Classification
+Streams message headers past a set of rules and deletes the matches,
+without downloading bodies or marking anything read.
+
+Only RFC822.SIZE and BODY.PEEK[HEADER.FIELDS (...)] for the fields the
+rules actually use are fetched, in UID batches. Several batches are sent
+before waiting for the first reply (pipelining), so a window of thousands
+of messages costs one network round trip. Messages flow through generators
+one window at a time and matching UIDs are handed to imap_bulk.bulk_delete
+in chunks, so memory and bandwidth per message stay flat however large the
+mailbox is.
+
+Requirements: none (standard library only)
+Usage:
+    from imap_classify import clean_by_headers, from_matches, list_id_matches, larger_than
+    stats = clean_by_headers(conn, "inbox",
+                             [from_matches("*@shop.example"), list_id_matches("*"), larger_than(10_000_000)],
+                             criteria="(BEFORE 01-Jan-2024)")
+"""
+
+import fnmatch
+import re
+from collections import namedtuple
+from email.parser import BytesHeaderParser
+from email.utils import parseaddr
+
+import perf_trace
+
+from imap_bulk import (DEFAULT_BATCH_BYTES, DEFAULT_BATCH_SIZE, Progress, _check, _message_count, bulk_delete,
+                       bulk_move, quote_mailbox, search_uids, uid_batches)
+
+DEFAULT_FETCH_BATCH = 500
+DEFAULT_PIPELINE = 8
+
+MessageInfo = namedtuple("MessageInfo", "uid size headers")
+
+_UID_RE = re.compile(rb"UID (\d+)")
+_SIZE_RE = re.compile(rb"RFC822\.SIZE (\d+)")
+
+
+class Rule:
+    """A named predicate over a MessageInfo and the header fields it reads."""
+
+    __slots__ = ("name", "fields", "test")
+
+    def __init__(self, name, fields, test):
+        self.name = name
+        self.fields = tuple(f.upper() for f in fields)
+        self.test = test
+
+    def __call__(self, info):
+        return self.test(info)
+
+    def __repr__(self):
+        return f"Rule({self.name!r})"
+
+
+def header_matches(field, pattern):
+    """Match when the header's value fits a case-insensitive glob pattern."""
+    pattern = pattern.lower()
+
+    def test(info):
+        value = info.headers.get(field)
+        return value is not None and fnmatch.fnmatchcase(str(value).strip().lower(), pattern)
+
+    return Rule(f"{field} ~ {pattern}", [field], test)
+
+
+def from_matches(pattern):
+    """Match the sender address (or the full From value) against a glob pattern."""
+    pattern = pattern.lower()
+
+    def test(info):
+        value = info.headers.get("From")
+        if value is None:
+            return False
+        value = str(value).strip().lower()
+        return fnmatch.fnmatchcase(parseaddr(value)[1], pattern) or fnmatch.fnmatchcase(value, pattern)
+
+    return Rule(f"from ~ {pattern}", ["FROM"], test)
+
+
+def list_id_matches(pattern="*"):
+    """Match mailing-list mail; the default pattern matches any List-Id."""
+    rule = header_matches("List-Id", pattern)
+    rule.name = f"list-id ~ {pattern.lower()}"
+    return rule
+
+
+def larger_than(size):
+    return Rule(f"size > {size:,}", [], lambda info: info.size > size)
+
+
+def smaller_than(size):
+    return Rule(f"size < {size:,}", [], lambda info: info.size < size)
+
+
+def fetch_items(rules):
+    """FETCH item list covering every header field the rules read."""
+    fields = list(dict.fromkeys(f for rule in rules for f in rule.fields))
+    if not fields:
+        return "(RFC822.SIZE)"
+    return f"(RFC822.SIZE BODY.PEEK[HEADER.FIELDS ({' '.join(fields)})])"
+
+
+def parse_fetch(data, with_headers=True, parser=BytesHeaderParser()):
+    """Turn imaplib FETCH response data into MessageInfo records.
+
+    imaplib splits a response with a literal into a (text before, literal)
+    tuple plus a bytes item with the text after it, and FETCH data items
+    may come in any order, so UID and RFC822.SIZE are looked for on both
+    sides of the literal. A message missing its UID, its size or (with
+    with_headers) its header literal is left out rather than classified on
+    made-up values.
+    """
+    messages = []
+    for item in data:
+        if isinstance(item, tuple):
+            messages.append([item[0], item[1]])
+        elif isinstance(item, bytes):
+            if item[:1].isdigit():  # "12 (UID ...)": a message without a literal
+                messages.append([item, None])
+            elif messages:
+                messages[-1][0] += b" " + item  # the rest of the message, after its literal
+    for meta, header_bytes in messages:
+        uid, size = _UID_RE.search(meta), _SIZE_RE.search(meta)
+        if uid is None or size is None or (with_headers and header_bytes is None):
+            continue
+        yield MessageInfo(int(uid.group(1)), int(size.group(1)), parser.parsebytes(header_bytes or b""))
+
+
+@perf_trace.traced("imap.fetch")
+def _fetch_window(conn, uid_sets, items):
+    """Send every UID FETCH in the window before reading any reply.
+
+    imaplib has no public pipelining API, so this uses its internal
+    _command/_command_complete pair, the same calls IMAP4.uid() makes.
+    """
+    tags = [conn._command("UID", "FETCH", uid_set, items) for uid_set in uid_sets]
+    for tag in tags:
+        _check(*conn._command_complete("UID", tag), "UID FETCH")
+    typ, data = conn._untagged_response("OK", [None], "FETCH")
+    return [d for d in data if d is not None]
+
+
+def fetch_headers(conn, uids, items, batch=DEFAULT_FETCH_BATCH, pipeline=DEFAULT_PIPELINE, stats=None):
+    """Yield MessageInfo for the UIDs, fetching `pipeline` batches per round trip.
+
+    Nothing is in flight when this generator yields, so the caller may issue
+    other commands (such as deletes) between messages.
+    """
+    sets = (uid_set for uid_set, _ in uid_batches(uids, DEFAULT_BATCH_BYTES, batch))
+    while True:
+        window = [s for _, s in zip(range(pipeline), sets)]
+        if not window:
+            return
+        data = _fetch_window(conn, window, items)
+        perf_trace.count("imap.fetch_windows")
+        if stats is not None:
+            stats["round_trips"] += 1
+            stats["header_bytes"] += sum(len(d[1]) for d in data if isinstance(d, tuple))
+        yield from parse_fetch(data, "HEADER.FIELDS" in items)
+
+
+def classify(messages, rules, match_all=False):
+    """Yield (MessageInfo, rule) for messages the rules select.
+
+    With match_all the message must satisfy every rule and the first rule is
+    reported; otherwise the first matching rule wins.
+    """
+    for info in messages:
+        if match_all:
+            if rules and all(rule(info) for rule in rules):
+                yield info, rules[0]
+        else:
+            for rule in rules:
+                if rule(info):
+                    yield info, rule
+                    break
+
+
+def clean_by_headers(conn, folder, rules, criteria="ALL", move_to=None, match_all=False, dry_run=False,
+                     batch=DEFAULT_FETCH_BATCH, pipeline=DEFAULT_PIPELINE,
+                     max_bytes=DEFAULT_BATCH_BYTES, max_count=DEFAULT_BATCH_SIZE, quiet=False):
+    """Delete (or move) messages in `folder` whose headers match the rules.
+
+    `criteria` is an IMAP SEARCH prefilter run on the server first. Returns
+    throughput stats (rate is messages scanned per second) plus
+    scanned/matched counts and a per-rule tally.
+    """
+    with perf_trace.span("imap.select", folder=folder):
+        typ, data = conn.select(quote_mailbox(folder), readonly=dry_run)
+    if typ != "OK":
+        raise RuntimeError(f"Cannot select {folder}: {data}")
+    search = {"round_trips": 1}  # the select
+    uids = search_uids(conn, criteria, search, _message_count(data))
+    if not quiet:
+        print(f"{folder}: scanning headers of {len(uids):,} messages matching {criteria}")
+
+    fetch_stats = {"round_trips": 0, "header_bytes": 0}
+    progress = Progress(len(uids), "scanned", quiet=quiet)
+    tally = {rule.name: 0 for rule in rules}
+    pending, removed, remove_trips = [], 0, 0
+
+    def flush():
+        nonlocal removed, remove_trips
+        if move_to:
+            result = bulk_move(conn, pending, move_to, max_bytes, max_count, quiet=True)
+        else:
+            result = bulk_delete(conn, pending, max_bytes, max_count, quiet=True)
+        removed += result["messages"]
+        remove_trips += result["round_trips"]
+        pending.clear()
+
+    messages = fetch_headers(conn, uids, fetch_items(rules), batch, pipeline, fetch_stats)
+    for info, rule in classify(_counted(messages, progress, fetch_stats), rules, match_all):
+        tally[rule.name] += 1
+        if not dry_run:
+            pending.append(info.uid)
+            if len(pending) >= max_count:
+                flush()
+    if pending:
+        flush()
+
+    stats = progress.finish()
+    perf_trace.count("imap.scanned", stats["messages"])
+    perf_trace.count("imap.matched", sum(tally.values()))
+    stats.update({
+        "scanned": stats["messages"],
+        "matched": sum(tally.values()),
+        "messages": removed,
+        "rules": tally,
+        "header_bytes": fetch_stats["header_bytes"],
+        "round_trips": fetch_stats["round_trips"] + remove_trips + search["round_trips"],
+    })
+    return stats
+
+
+def _counted(messages, progress, fetch_stats, every=DEFAULT_FETCH_BATCH):
+    """Pass messages through while updating progress every `every` messages."""
+    count = 0
+    for info in messages:
+        yield info
+        count += 1
+        if count == every:
+            progress.update(count, fetch_stats["round_trips"] - progress.round_trips)
+            count = 0
+    if count:
+        progress.update(count, fetch_stats["round_trips"] - progress.round_trips)
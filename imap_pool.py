@@ -0,0 +1,237 @@
+"""
+IMAP Cleanup Runner
+Runs rule-driven cleanups over many accounts and folders concurrently.
+
+A bounded pool of authenticated connections is shared by a thread pool.
+Idle connections are reused for the same account's other folders, each
+server has its own concurrency limit, and connection failures are retried
+with exponential backoff on a fresh connection. Total wall time scales with
+the pool size rather than the number of mailboxes.
+
+Requirements: none (standard library only)
+Config (JSON):
+    {"workers": 8,
+     "defaults": {"before": "01-Jan-2024"},
+     "servers": {"imap.gmail.com": {"max_connections": 4}},
+     "accounts": [
+        {"host": "imap.gmail.com", "user": "me@gmail.com", "password_env": "ME_PASSWORD",
+         "rules": [
+            {"folder": "inbox", "before": "01-Jan-2023"},
+            {"folder": "inbox", "from": "newsletter@example.com", "move_to": "[Gmail]/Trash"},
+            {"folder": "Archive", "larger": 10000000, "before": "01-Jan-2020"}
+         ]}
+     ]}
+Rule criteria: before, since, on (IMAP dates), from, to, subject, larger,
+smaller (bytes), or a raw "search" string. All given criteria must match.
+"""
+
+import imaplib
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import perf_trace
+from imap_bulk import DEFAULT_BATCH_BYTES, DEFAULT_BATCH_SIZE, clean_folder, connect
+
+DEFAULT_SERVER_CONNECTIONS = 4
+RETRYABLE_ERRORS = (imaplib.IMAP4.abort, OSError, EOFError)  # OSError covers socket.timeout
+
+
+def _imap_string(value):
+    return '"' + str(value).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def rule_criteria(rule):
+    """Translate a rule dict into an IMAP SEARCH criteria string."""
+    terms = []
+    for key in ("before", "since", "on"):
+        if key in rule:
+            terms.append(f"{key.upper()} {rule[key]}")
+    for key in ("from", "to", "subject"):
+        if key in rule:
+            terms.append(f"{key.upper()} {_imap_string(rule[key])}")
+    for key in ("larger", "smaller"):
+        if key in rule:
+            terms.append(f"{key.upper()} {int(rule[key])}")
+    if "search" in rule:
+        terms.append(rule["search"])
+    if not terms:
+        raise ValueError(f"Rule for folder '{rule.get('folder')}' has no criteria; refusing to match everything")
+    return f"({' '.join(terms)})"
+
+
+class ConnectionPool:
+    """Authenticated IMAP connections keyed by account, with per-server limits.
+
+    A server slot is held for as long as a connection is open, busy or idle,
+    so a server never sees more than its limit. When every slot is taken by
+    other accounts' idle connections, one of them is closed to make room.
+    """
+
+    def __init__(self, server_limits=None, default_limit=DEFAULT_SERVER_CONNECTIONS):
+        self.server_limits = server_limits or {}
+        self.default_limit = default_limit
+        self._idle = {}
+        self._slots = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def account_key(account):
+        return (account["host"], account.get("port"), account.get("ssl", True), account["user"])
+
+    def _slot(self, host):
+        with self._lock:
+            if host not in self._slots:
+                limit = self.server_limits.get(host, {}).get("max_connections", self.default_limit)
+                self._slots[host] = threading.BoundedSemaphore(limit)
+            return self._slots[host]
+
+    def _take_idle(self, key=None, host=None):
+        """Pop an idle connection for `key`, or for any account on `host`."""
+        with self._lock:
+            for idle_key, conns in self._idle.items():
+                if conns and (idle_key == key or (key is None and idle_key[0] == host)):
+                    return conns.pop()
+        return None
+
+    def acquire(self, account):
+        """Return an idle connection for the account, or open a new one."""
+        key = self.account_key(account)
+        conn = self._take_idle(key)
+        if conn is not None:
+            return conn
+
+        slot = self._slot(account["host"])
+        while not slot.acquire(timeout=0.05):
+            # Take over the slot of another account's idle connection on this server
+            victim = self._take_idle(host=account["host"])
+            if victim is not None:
+                _close(victim)
+                break
+        try:
+            return connect(account["host"], account["user"], account_password(account),
+                           account.get("port"), account.get("ssl", True))
+        except BaseException:
+            slot.release()
+            raise
+
+    def release(self, account, conn, broken=False):
+        """Keep a healthy connection for reuse, or close a failed one and free its slot."""
+        if broken:
+            try:
+                conn.shutdown()
+            except Exception:
+                pass
+            self._slot(account["host"]).release()
+        else:
+            with self._lock:
+                self._idle.setdefault(self.account_key(account), []).append(conn)
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for key, conns in idle.items():
+            for conn in conns:
+                _close(conn)
+                self._slot(key[0]).release()
+
+
+def _close(conn):
+    try:
+        conn.logout()
+    except Exception:
+        pass
+
+
+def account_password(account):
+    if "password" in account:
+        return account["password"]
+    env = account.get("password_env", "IMAP_PASSWORD")
+    if env not in os.environ:
+        raise RuntimeError(f"No password for {account['user']}: set ${env}")
+    return os.environ[env]
+
+
+def run_rule(pool, account, rule, retries=3, backoff=1.0, batch_bytes=DEFAULT_BATCH_BYTES,
+             batch_size=DEFAULT_BATCH_SIZE):
+    """Apply one rule to one folder, retrying connection failures with backoff.
+
+    Failures while connecting are retried the same way as failures mid-rule.
+    """
+    criteria = rule_criteria(rule)
+    for attempt in range(retries + 1):
+        conn = None
+        try:
+            with perf_trace.span("imap.acquire", host=account["host"]):
+                conn = pool.acquire(account)
+            with perf_trace.span("imap.rule", user=account["user"], folder=rule.get("folder", "inbox"),
+                                 attempt=attempt):
+                stats = clean_folder(conn, rule.get("folder", "inbox"), criteria, rule.get("move_to"),
+                                     batch_bytes, batch_size, quiet=True)
+        except RETRYABLE_ERRORS:
+            # acquire() has already freed the server slot if the connect itself failed
+            if conn is not None:
+                pool.release(account, conn, broken=True)
+            perf_trace.count("imap.retries")
+            if attempt == retries:
+                raise
+            time.sleep(backoff * 2 ** attempt * (1 + random.random()))
+        except BaseException:
+            if conn is not None:
+                pool.release(account, conn, broken=True)
+            raise
+        else:
+            pool.release(account, conn)
+            stats["attempts"] = attempt + 1
+            return stats
+
+
+def load_rules(path):
+    """Read a runner config and expand it into (account, rule) tasks."""
+    with open(path) as f:
+        config = json.load(f)
+    defaults = config.get("defaults", {})
+    tasks = []
+    for account in config["accounts"]:
+        for rule in account.get("rules", []):
+            tasks.append((account, {**defaults, **rule}))
+    return config, tasks
+
+
+def run_cleanup(config, tasks, workers=None, retries=3, backoff=1.0):
+    """Run every (account, rule) task on a shared connection pool; returns per-task results."""
+    workers = workers or config.get("workers", 8)
+    pool = ConnectionPool(config.get("servers"),
+                          config.get("max_connections_per_server", DEFAULT_SERVER_CONNECTIONS))
+    results = []
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(run_rule, pool, account, rule, retries, backoff): (account, rule)
+                for account, rule in tasks
+            }
+            for future in as_completed(futures):
+                account, rule = futures[future]
+                label = f"{account['user']}@{account['host']}/{rule.get('folder', 'inbox')}"
+                try:
+                    stats = future.result()
+                except Exception as e:
+                    print(f"  FAILED {label}: {e}")
+                    results.append({"task": label, "error": str(e)})
+                    continue
+                print(f"  {label}: {stats['messages']:,} messages, "
+                      f"{stats['round_trips']} round trips, {stats['seconds']:.1f}s")
+                results.append({"task": label, **stats})
+    finally:
+        pool.close()
+
+    elapsed = time.perf_counter() - started
+    total = sum(r.get("messages", 0) for r in results)
+    failed = sum(1 for r in results if "error" in r)
+    print(f"Cleaned {total:,} messages across {len(tasks)} folder rules in {elapsed:.1f}s"
+          + (f" ({failed} failed)" if failed else ""))
+    return results
@@ -1,10 +1,115 @@
-import imaplib
-
-mail = imaplib.IMAP4_SSL("imap.gmail.com")
-mail.login("your_email", "your_password")
-mail.select("inbox")
-_, data = mail.search(None, '(BEFORE 01-Jan-2024)')
-for num in data[0].split():
-    mail.store(num, '+FLAGS', '\\Deleted')
-mail.expunge()
-mail.logout()
\ No newline at end of file
+"""
+Inbox Cleaner
+Deletes (or moves) every message older than a cutoff date from an IMAP folder.
+
+Messages are matched with UID SEARCH and removed in batched UID range sets
+(see imap_bulk.py), so even very large mailboxes need only a handful of
+round trips. Sender, List-Id, other header and size rules are checked by
+streaming just those headers (see imap_classify.py); bodies are never
+downloaded and nothing is marked read.
+
+Requirements: none (standard library only)
+Usage:
+    python inbox-cleaner.py --user you@gmail.com --before 01-Jan-2024
+    python inbox-cleaner.py --user you@gmail.com --move-to "[Gmail]/Trash"
+    python inbox-cleaner.py --host 127.0.0.1 --port 1143 --no-ssl ...   # fake_imap_server.py
+    python inbox-cleaner.py --user you@gmail.com --from "*@shop.example" --list-id "*" --dry-run
+    python inbox-cleaner.py --user you@gmail.com --larger 10000000 --header "X-Mailer=*bulk*"
+    python inbox-cleaner.py --config rules.json --workers 8             # many accounts/folders
+The password is read from the IMAP_PASSWORD environment variable if
+--password is not given. See imap_pool.py for the --config rule format.
+--trace FILE records the time spent selecting, searching, fetching and
+deleting (see perf_trace.py).
+"""
+
+import argparse
+import os
+
+import imap_bulk
+import imap_classify
+import perf_trace
+from imap_bulk import DEFAULT_BATCH_BYTES, DEFAULT_BATCH_SIZE, connect
+
+
+def clean_folder(mail, folder="inbox", before="01-Jan-2024", move_to=None,
+                 batch_bytes=DEFAULT_BATCH_BYTES, batch_size=DEFAULT_BATCH_SIZE, quiet=False, dry_run=False):
+    """Remove messages older than `before` from `folder`; returns throughput stats."""
+    return imap_bulk.clean_folder(mail, folder, f"(BEFORE {before})", move_to,
+                                  batch_bytes, batch_size, quiet, dry_run)
+
+
+def header_rules(args):
+    """Build imap_classify rules from the command-line options."""
+    rules = [imap_classify.from_matches(p) for p in args.match_from]
+    rules += [imap_classify.list_id_matches(p) for p in args.list_id]
+    for spec in args.header:
+        field, sep, pattern = spec.partition("=")
+        if not sep:
+            raise SystemExit(f"--header expects NAME=PATTERN, got '{spec}'")
+        rules.append(imap_classify.header_matches(field, pattern))
+    if args.larger is not None:
+        rules.append(imap_classify.larger_than(args.larger))
+    if args.smaller is not None:
+        rules.append(imap_classify.smaller_than(args.smaller))
+    return rules
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Delete old messages from an IMAP folder")
+    parser.add_argument("--host", default="imap.gmail.com")
+    parser.add_argument("--port", type=int, default=None)
+    parser.add_argument("--no-ssl", action="store_true", help="plain IMAP (for local test servers)")
+    parser.add_argument("--user", default="your_email")
+    parser.add_argument("--password", default=os.environ.get("IMAP_PASSWORD", "your_password"))
+    parser.add_argument("--folder", default="inbox")
+    parser.add_argument("--before", default="01-Jan-2024", help="IMAP date, e.g. 01-Jan-2024")
+    parser.add_argument("--move-to", help="move matches to this folder instead of deleting them")
+    parser.add_argument("--batch-bytes", type=int, default=DEFAULT_BATCH_BYTES)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--from", dest="match_from", action="append", default=[], metavar="PATTERN",
+                        help="sender glob, e.g. '*@shop.example' (repeatable)")
+    parser.add_argument("--list-id", action="append", default=[], metavar="PATTERN",
+                        help="List-Id glob; '*' matches any mailing list (repeatable)")
+    parser.add_argument("--header", action="append", default=[], metavar="NAME=PATTERN",
+                        help="any other header glob (repeatable)")
+    parser.add_argument("--larger", type=int, help="size in bytes")
+    parser.add_argument("--smaller", type=int, help="size in bytes")
+    parser.add_argument("--match-all", action="store_true", help="require every header rule, not any")
+    parser.add_argument("--dry-run", action="store_true", help="only report what would be removed")
+    parser.add_argument("--pipeline", type=int, default=imap_classify.DEFAULT_PIPELINE,
+                        help="header FETCH batches in flight per round trip")
+    parser.add_argument("--config", help="JSON rules for many accounts/folders, run concurrently")
+    parser.add_argument("--workers", type=int, default=None, help="connection pool size for --config")
+    parser.add_argument("--retries", type=int, default=3)
+    perf_trace.add_arguments(parser)
+    args = parser.parse_args()
+    perf_trace.from_args(args)
+
+    if args.config:
+        from imap_pool import load_rules, run_cleanup
+        config, tasks = load_rules(args.config)
+        results = run_cleanup(config, tasks, args.workers, args.retries)
+        raise SystemExit(1 if any("error" in r for r in results) else 0)
+
+    rules = header_rules(args)
+    mail = connect(args.host, args.user, args.password, args.port, not args.no_ssl)
+    try:
+        if rules:
+            # Header rules narrow the --before match; bodies are never fetched
+            stats = imap_classify.clean_by_headers(
+                mail, args.folder, rules, f"(BEFORE {args.before})", args.move_to, args.match_all,
+                args.dry_run, pipeline=args.pipeline, max_bytes=args.batch_bytes, max_count=args.batch_size)
+            for name, count in stats["rules"].items():
+                print(f"  {name}: {count:,}")
+            print(f"Scanned {stats['scanned']:,} headers ({stats['header_bytes']:,} bytes), "
+                  f"{stats['matched']:,} matched")
+        else:
+            stats = clean_folder(mail, args.folder, args.before, args.move_to,
+                                 args.batch_bytes, args.batch_size, dry_run=args.dry_run)
+        if args.dry_run:
+            print(f"Dry run: {stats['matched']:,} messages would be {'moved' if args.move_to else 'deleted'}")
+            raise SystemExit(0)
+        print(f"Done: {stats['messages']:,} messages in {stats['seconds']:.1f}s "
+              f"({stats['rate']:,.0f}/s, {stats['round_trips']} round trips)")
+    finally:
+        mail.logout()
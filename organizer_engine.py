@@ -0,0 +1,299 @@
+"""
+Organizer Engine
+Declarative filing rules, tree scanning and a parallel mover for folder-organizer.py.
+
+Rules are matched in order and the first match decides where a file goes.
+A rule can test the extension, the sniffed MIME type (from the file's first
+bytes), the size and the age. The destination is a template that can use
+the file's date and extension. On load the table is compiled into one
+dictionary keyed by extension, so most files are dispatched with a single
+lookup. Files are only stat'ed or opened when a candidate rule actually
+tests size, age or content.
+
+Moves are made with os.rename when the source and destination are on the
+same device. Cross-device moves (copy + delete) run in a thread pool, and
+every destination directory is created once before anything moves.
+
+Requirements: none (standard library only)
+Rules (JSON):
+    {"rules": [
+        {"ext": [".jpg", ".png"], "to": "Images"},
+        {"ext": ".pdf", "to": "PDFs"},
+        {"mime": "video/*", "to": "Videos/{year}"},
+        {"ext": [".zip", ".7z"], "larger": 100000000, "to": "Archives/Large"},
+        {"older_than_days": 365, "to": "Old/{year}-{month}"}
+    ]}
+Keys: ext (string or list, case-insensitive), mime (glob such as "image/*"),
+larger / smaller (bytes), older_than_days / newer_than_days, to (required).
+Destination fields: {year} {month} {day} (modification date), {ext}
+(lower case, no dot), {kind} (MIME major type such as "image").
+"""
+
+import datetime
+import fnmatch
+import json
+import mimetypes
+import os
+import shutil
+import string
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import perf_trace
+
+DEFAULT_RULES = [
+    {"ext": [".jpg", ".png"], "to": "Images"},
+    {"ext": [".pdf"], "to": "PDFs"},
+]
+DEFAULT_WORKERS = 8
+RULE_KEYS = {"ext", "mime", "larger", "smaller", "older_than_days", "newer_than_days", "to"}
+TEMPLATE_FIELDS = {"year", "month", "day", "ext", "kind"}
+SNIFF_BYTES = 64
+
+# (offset, magic bytes, MIME type) for common download types
+MAGIC = [
+    (0, b"\xff\xd8\xff", "image/jpeg"),
+    (0, b"\x89PNG\r\n\x1a\n", "image/png"),
+    (0, b"GIF87a", "image/gif"),
+    (0, b"GIF89a", "image/gif"),
+    (8, b"WEBP", "image/webp"),
+    (4, b"ftypheic", "image/heic"),
+    (4, b"ftypqt", "video/quicktime"),
+    (4, b"ftyp", "video/mp4"),
+    (0, b"\x1a\x45\xdf\xa3", "video/x-matroska"),
+    (8, b"AVI ", "video/x-msvideo"),
+    (0, b"ID3", "audio/mpeg"),
+    (0, b"\xff\xfb", "audio/mpeg"),
+    (0, b"fLaC", "audio/flac"),
+    (0, b"OggS", "audio/ogg"),
+    (8, b"WAVE", "audio/wav"),
+    (0, b"%PDF", "application/pdf"),
+    (0, b"PK\x03\x04", "application/zip"),
+    (0, b"7z\xbc\xaf\x27\x1c", "application/x-7z-compressed"),
+    (0, b"Rar!", "application/vnd.rar"),
+    (0, b"\x1f\x8b", "application/gzip"),
+    (0, b"MZ", "application/x-msdownload"),
+]
+
+
+def sniff_mime(path):
+    """MIME type from the file's leading bytes, falling back to its extension."""
+    try:
+        with open(path, "rb") as f:
+            head = f.read(SNIFF_BYTES)
+    except OSError:
+        head = b""
+    for offset, magic, mime in MAGIC:
+        if head[offset:offset + len(magic)] == magic:
+            return mime
+    return mimetypes.guess_type(path)[0] or "application/octet-stream"
+
+
+class FileFacts:
+    """Lazily gathered facts about one file; each is computed at most once."""
+
+    __slots__ = ("path", "ext", "_stat", "_mime")
+
+    def __init__(self, path, stat=None):
+        self.path = path
+        self.ext = os.path.splitext(path)[1].lower()
+        self._stat = stat
+        self._mime = None
+
+    @property
+    def stat(self):
+        if self._stat is None:
+            self._stat = os.stat(self.path)
+        return self._stat
+
+    @property
+    def mime(self):
+        if self._mime is None:
+            self._mime = sniff_mime(self.path)
+        return self._mime
+
+
+class Rule:
+    __slots__ = ("order", "exts", "mime", "larger", "smaller", "older", "newer", "to", "fields")
+
+    def __init__(self, order, spec):
+        unknown = set(spec) - RULE_KEYS
+        if unknown:
+            raise ValueError(f"Rule {order + 1}: unknown key(s) {', '.join(sorted(unknown))}")
+        if "to" not in spec:
+            raise ValueError(f"Rule {order + 1}: missing 'to'")
+        exts = spec.get("ext", [])
+        exts = [exts] if isinstance(exts, str) else exts
+        self.order = order
+        self.exts = {e.lower() if e.startswith(".") else "." + e.lower() for e in exts}
+        self.mime = spec.get("mime", "").lower() or None
+        self.larger = spec.get("larger")
+        self.smaller = spec.get("smaller")
+        self.older = spec.get("older_than_days")
+        self.newer = spec.get("newer_than_days")
+        self.to = os.path.normpath(spec["to"])
+        if os.path.isabs(self.to) or self.to.split(os.sep)[0] == "..":
+            raise ValueError(f"Rule {order + 1}: destination must stay inside the folder")
+        self.fields = {field for _, field, _, _ in string.Formatter().parse(self.to) if field}
+        if self.fields - TEMPLATE_FIELDS:
+            raise ValueError(f"Rule {order + 1}: unknown destination field(s) "
+                             f"{', '.join(sorted(self.fields - TEMPLATE_FIELDS))}")
+
+    def matches(self, facts, now):
+        # Cheapest tests first: size/age need a stat, MIME needs a read
+        if self.larger is not None and facts.stat.st_size <= self.larger:
+            return False
+        if self.smaller is not None and facts.stat.st_size >= self.smaller:
+            return False
+        if self.older is not None and now - facts.stat.st_mtime < self.older * 86400:
+            return False
+        if self.newer is not None and now - facts.stat.st_mtime > self.newer * 86400:
+            return False
+        if self.mime is not None and not fnmatch.fnmatchcase(facts.mime, self.mime):
+            return False
+        return True
+
+    def render(self, facts):
+        if not self.fields:
+            return self.to
+        values = {"ext": facts.ext[1:]}
+        if self.fields & {"year", "month", "day"}:
+            date = datetime.date.fromtimestamp(facts.stat.st_mtime)
+            values.update(year=f"{date.year}", month=f"{date.month:02d}", day=f"{date.day:02d}")
+        if "kind" in self.fields:
+            values["kind"] = facts.mime.split("/")[0]
+        return self.to.format(**values)
+
+
+class RuleSet:
+    """Rules compiled into a per-extension dispatch table."""
+
+    def __init__(self, specs=None):
+        self.rules = [Rule(i, spec) for i, spec in enumerate(specs or DEFAULT_RULES)]
+        wildcard = [rule for rule in self.rules if not rule.exts]
+        self.by_ext = {}
+        for ext in {e for rule in self.rules for e in rule.exts}:
+            self.by_ext[ext] = sorted([r for r in self.rules if ext in r.exts] + wildcard, key=lambda r: r.order)
+        self.wildcard = wildcard
+        # Bare rules need no further tests, so the dispatch is a plain dictionary hit
+        self.direct = {ext: rules[0].to for ext, rules in self.by_ext.items()
+                       if _unconditional(rules[0]) and not rules[0].fields}
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path) as f:
+            return cls(json.load(f)["rules"])
+
+    def roots(self):
+        """Top-level folders the rules file into (skipped when scanning)."""
+        return {rule.to.split(os.sep)[0] for rule in self.rules}
+
+    def destination(self, path, stat=None, now=None):
+        """Relative destination folder for `path`, or None if no rule matches."""
+        ext = os.path.splitext(path)[1].lower()
+        direct = self.direct.get(ext)
+        if direct is not None:
+            return direct
+        candidates = self.by_ext.get(ext, self.wildcard)
+        if not candidates:
+            return None
+        facts = FileFacts(path, stat)
+        now = now or time.time()
+        for rule in candidates:
+            if rule.matches(facts, now):
+                return rule.render(facts)
+        return None
+
+
+def _unconditional(rule):
+    return rule.mime is None and rule.larger is None and rule.smaller is None \
+        and rule.older is None and rule.newer is None
+
+
+def scan_tree(folder, recursive=False, skip=()):
+    """Yield paths (relative to folder) of files, descending into subfolders if recursive.
+
+    Top-level entries named in `skip` (destination folders) are not entered.
+    """
+    stack = [""]
+    while stack:
+        rel_dir = stack.pop()
+        with os.scandir(os.path.join(folder, rel_dir) if rel_dir else folder) as entries:
+            for entry in entries:
+                rel = os.path.join(rel_dir, entry.name) if rel_dir else entry.name
+                if entry.is_file(follow_symlinks=False):
+                    yield rel
+                elif recursive and entry.is_dir(follow_symlinks=False) and not (not rel_dir and entry.name in skip):
+                    stack.append(rel)
+
+
+@perf_trace.traced("organizer.plan")
+def plan_moves(folder, rules, recursive=False, skip=()):
+    """[(relative source path, relative destination folder)] for files a rule claims."""
+    skip = set(skip) | rules.roots()
+    moves = []
+    for rel in scan_tree(folder, recursive, skip):
+        target = rules.destination(os.path.join(folder, rel))
+        if target is not None and os.path.dirname(rel) != target:
+            moves.append((rel, target))
+    return moves
+
+
+def free_name(directory, name, claimed):
+    """name, or "name (1).ext", "name (2).ext", ... if taken on disk or in this run."""
+    candidate, stem, suffix, n = name, *os.path.splitext(name), 1
+    while candidate in claimed or os.path.lexists(os.path.join(directory, candidate)):
+        candidate = f"{stem} ({n}){suffix}"
+        n += 1
+    claimed.add(candidate)
+    return candidate
+
+
+@perf_trace.traced("organizer.move")
+def move_files(folder, moves, workers=DEFAULT_WORKERS):
+    """Move files into their destination folders; returns {source: new path} and stats.
+
+    Same-device moves are plain renames. Cross-device moves are copied in a
+    thread pool. Name clashes get a " (n)" suffix instead of overwriting.
+    """
+    started = time.perf_counter()
+    dest_dev, source_dev, claimed = {}, {}, {}
+    for target in {target for _, target in moves}:
+        path = os.path.join(folder, target)
+        os.makedirs(path, exist_ok=True)
+        dest_dev[target] = os.stat(path).st_dev
+        claimed[target] = set()
+
+    done, failed, copies, renamed = {}, [], [], 0
+    for rel, target in moves:
+        src = os.path.join(folder, rel)
+        parent = os.path.dirname(src)
+        if parent not in source_dev:
+            source_dev[parent] = os.stat(parent).st_dev
+        dst_dir = os.path.join(folder, target)
+        dst = os.path.join(dst_dir, free_name(dst_dir, os.path.basename(rel), claimed[target]))
+        if source_dev[parent] == dest_dev[target]:
+            try:
+                os.rename(src, dst)
+                done[rel] = dst
+                renamed += 1
+            except OSError as e:
+                failed.append((rel, e))
+        else:
+            copies.append((rel, src, dst))
+
+    if copies:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [(rel, dst, executor.submit(shutil.move, src, dst)) for rel, src, dst in copies]
+            for rel, dst, future in futures:
+                try:
+                    future.result()
+                    done[rel] = dst
+                except (OSError, shutil.Error) as e:
+                    failed.append((rel, e))
+
+    stats = {"moved": len(done), "renamed": renamed, "copied": len(done) - renamed,
+             "failed": failed, "seconds": time.perf_counter() - started}
+    perf_trace.count("organizer.renamed", renamed)
+    perf_trace.count("organizer.copied", stats["copied"])
+    return done, stats
@@ -0,0 +1,350 @@
+"""
+Performance Tracing
+Timing spans, counters and an optional memory/CPU profiling mode shared by
+the scripts, so a slow run shows whether the time went into loading data,
+computing, writing cells or saving the workbook.
+
+Tracing is off unless it is switched on with the PERF_TRACE environment
+variable or a script's --trace flag. While it is off, span() and phases()
+return a shared do-nothing object and count() returns at once. Their cost
+is one global lookup, so the calls stay in the hot paths for good.
+
+When tracing is on, every span records its start, duration, thread and
+arguments, and counters add up. At exit the trace is written as JSON (spans,
+counters and a per-name summary), or in Chrome trace format for
+chrome://tracing or https://ui.perfetto.dev. A summary table goes to stderr.
+
+Profile mode (PERF_TRACE_PROFILE=1 or --profile) also starts tracemalloc.
+Each span then records its memory peak: the most memory allocated above the
+span's starting point at any moment inside it, nested spans included. It
+also records the memory still held when the span ends. tracemalloc counts
+allocations from every thread, and it makes the run several times slower.
+Profile mode also runs cProfile on the thread that enabled tracing and
+writes the stats to TRACE.prof (python -m pstats TRACE.prof).
+
+Spans opened in worker processes are not collected. The span around the
+pool in the parent process covers them.
+
+Requirements: none (standard library only)
+Usage:
+    import perf_trace
+
+    with perf_trace.span("report.load", files=len(paths)):
+        frames = [...]
+    perf_trace.count("imap.batches")
+
+    @perf_trace.traced("organizer.move")
+    def move_files(...): ...
+
+    phase = perf_trace.phases("crafting.sheet")   # consecutive phases of one long function
+    phase("compute")
+    ...
+    phase("save")
+    wb.save(path)
+    phase.end()
+
+    PERF_TRACE=trace.json python arc_raiders_crafting_profit.py
+    PERF_TRACE=trace.json PERF_TRACE_FORMAT=chrome PERF_TRACE_PROFILE=1 python ExcelReportGen.py --stream a.csv
+    python folder-organizer.py Downloads --trace trace.json --trace-format chrome --profile
+"""
+
+import atexit
+import cProfile
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from multiprocessing import parent_process
+
+ENV_PATH = "PERF_TRACE"
+ENV_FORMAT = "PERF_TRACE_FORMAT"
+ENV_PROFILE = "PERF_TRACE_PROFILE"
+FORMATS = ("json", "chrome")
+DEFAULT_PATH = "perf-trace.json"
+
+_tracer = None
+
+
+class _NullSpan:
+    """What span() and phases() return while tracing is off."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __call__(self, name, **args):
+        pass
+
+    def end(self):
+        pass
+
+
+_NULL = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "args", "start", "memory_start", "memory_peak")
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        tracer = self.tracer
+        stack = tracer.stack()
+        if tracer.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            # Resetting the peak would lose the enclosing span's, so fold it in first
+            if stack:
+                stack[-1].memory_peak = max(stack[-1].memory_peak, peak)
+            tracemalloc.reset_peak()
+            self.memory_start = self.memory_peak = current
+        stack.append(self)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        tracer = self.tracer
+        stack = tracer.stack()
+        if stack and stack[-1] is self:
+            stack.pop()
+        memory = None
+        if tracer.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            self.memory_peak = max(self.memory_peak, peak)
+            memory = (self.memory_peak - self.memory_start, current - self.memory_start)
+            if stack:
+                stack[-1].memory_peak = max(stack[-1].memory_peak, self.memory_peak)
+        tracer.spans.append((self.name, self.start, end - self.start, threading.get_ident(), self.args, memory))
+        return False
+
+
+class _Phases:
+    """Consecutive spans prefix.a, prefix.b, ... inside one enclosing span named prefix."""
+
+    __slots__ = ("tracer", "prefix", "outer", "current")
+
+    def __init__(self, tracer, prefix):
+        self.tracer = tracer
+        self.prefix = prefix
+        self.outer = None
+        self.current = None
+
+    def __call__(self, name, **args):
+        """End the current phase (if any) and start the next."""
+        if self.outer is None:
+            self.outer = _Span(self.tracer, self.prefix, {}).__enter__()
+        elif self.current is not None:
+            self.current.__exit__(None, None, None)
+        self.current = _Span(self.tracer, f"{self.prefix}.{name}", args).__enter__()
+
+    def end(self):
+        for span in (self.current, self.outer):
+            if span is not None:
+                span.__exit__(None, None, None)
+        self.current = self.outer = None
+
+
+class Tracer:
+    """Collected spans and counters of one process."""
+
+    def __init__(self, path, fmt="json", profile=False):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown trace format '{fmt}' (expected {' or '.join(FORMATS)})")
+        self.path = path
+        self.format = fmt
+        self.pid = os.getpid()
+        self.origin = time.perf_counter_ns()
+        self.spans = []
+        self.counters = {}
+        self.threads = {}
+        self.memory = profile
+        self.profiler = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._written = False
+        if profile:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+    def stack(self):
+        try:
+            return self._local.stack
+        except AttributeError:
+            self._local.stack = []
+            self.threads[threading.get_ident()] = threading.current_thread().name
+            return self._local.stack
+
+    def count(self, name, n):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def summary(self):
+        """{span name: {"count", "seconds", "max", "memory_peak"?}} in order of first appearance."""
+        totals = {}
+        for name, start, duration, tid, args, memory in sorted(self.spans, key=lambda s: s[1]):
+            entry = totals.setdefault(name, {"count": 0, "seconds": 0.0, "max": 0.0})
+            entry["count"] += 1
+            entry["seconds"] += duration / 1e9
+            entry["max"] = max(entry["max"], duration / 1e9)
+            if memory is not None:
+                entry["memory_peak"] = max(entry.get("memory_peak", 0), memory[0])
+        return totals
+
+    def to_json(self):
+        spans = []
+        for name, start, duration, tid, args, memory in sorted(self.spans, key=lambda s: s[1]):
+            record = {"name": name, "start": (start - self.origin) / 1e9, "seconds": duration / 1e9,
+                      "thread": self.threads.get(tid, str(tid))}
+            if args:
+                record["args"] = args
+            if memory is not None:
+                record["memory_peak"], record["memory_delta"] = memory
+            spans.append(record)
+        return {"pid": self.pid, "spans": spans, "counters": dict(self.counters), "summary": self.summary()}
+
+    def to_chrome(self):
+        events = [{"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid, "args": {"name": name}}
+                  for tid, name in self.threads.items()]
+        end = self.origin
+        for name, start, duration, tid, args, memory in self.spans:
+            args = dict(args)
+            if memory is not None:
+                args["memory_peak"], args["memory_delta"] = memory
+            events.append({"name": name, "cat": name.split(".")[0], "ph": "X", "pid": self.pid, "tid": tid,
+                           "ts": (start - self.origin) / 1e3, "dur": duration / 1e3, "args": args})
+            end = max(end, start + duration)
+        if self.counters:
+            events.append({"name": "counters", "ph": "C", "pid": self.pid, "tid": 0,
+                           "ts": (end - self.origin) / 1e3, "args": dict(self.counters)})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self):
+        """Write the trace (and profile) once, from the process that enabled tracing."""
+        if self._written or os.getpid() != self.pid:
+            return
+        self._written = True
+        if self.profiler is not None:
+            self.profiler.disable()
+            self.profiler.dump_stats(self.path + ".prof")
+        document = self.to_chrome() if self.format == "chrome" else self.to_json()
+        with open(self.path, "w") as f:
+            json.dump(document, f, indent=None if self.format == "chrome" else 2, default=str)
+        print_summary(self, sys.stderr)
+
+
+def print_summary(tracer, stream=sys.stderr):
+    totals = tracer.summary()
+    if totals:
+        width = max(len(name) for name in totals)
+        memory = tracer.memory
+        print(f"\n{'Span':<{width}} {'Count':>7} {'Total s':>9} {'Max s':>9}" + (f" {'Peak MB':>9}" if memory else ""),
+              file=stream)
+        for name, entry in totals.items():
+            line = f"{name:<{width}} {entry['count']:>7,} {entry['seconds']:>9.3f} {entry['max']:>9.3f}"
+            if memory:
+                line += f" {entry.get('memory_peak', 0) / 1e6:>9.1f}"
+            print(line, file=stream)
+    for name, value in tracer.counters.items():
+        print(f"{name}: {value:,}", file=stream)
+    print(f"Trace written to {tracer.path}" + (f" (profile: {tracer.path}.prof)" if tracer.profiler else ""),
+          file=stream)
+
+
+def enable(path, fmt="json", profile=False):
+    """Start tracing this process; the trace is written to `path` at exit."""
+    global _tracer
+    if _tracer is not None:
+        # A --trace flag replaces tracing already switched on by the environment
+        atexit.unregister(_tracer.write)
+        if _tracer.profiler is not None:
+            _tracer.profiler.disable()
+    _tracer = Tracer(path, fmt, profile)
+    atexit.register(_tracer.write)
+    return _tracer
+
+
+def enabled():
+    return _tracer is not None
+
+
+def span(name, **args):
+    """Context manager timing a block as one span; keyword arguments are stored with it."""
+    tracer = _tracer
+    if tracer is None:
+        return _NULL
+    return _Span(tracer, name, args)
+
+
+def phases(prefix):
+    """A callable that starts phase `name` as span prefix.name, ending the previous one.
+
+    Call .end() after the last phase. Meant for long functions whose steps
+    are not worth re-indenting under `with` blocks.
+    """
+    tracer = _tracer
+    if tracer is None:
+        return _NULL
+    return _Phases(tracer, prefix)
+
+
+def traced(name):
+    """Decorator timing every call of a function as a span called `name`."""
+    def wrap(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            tracer = _tracer
+            if tracer is None:
+                return func(*args, **kwargs)
+            with _Span(tracer, name, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return wrap
+
+
+def count(name, n=1):
+    """Add n to a counter."""
+    tracer = _tracer
+    if tracer is not None:
+        tracer.count(name, n)
+
+
+def add_arguments(parser):
+    """Add --trace / --trace-format / --profile to a script's argument parser."""
+    group = parser.add_argument_group("tracing")
+    group.add_argument("--trace", metavar="FILE", help=f"write timing spans to FILE (or set {ENV_PATH})")
+    group.add_argument("--trace-format", choices=FORMATS, help="json (default) or chrome (chrome://tracing)")
+    group.add_argument("--profile", action="store_true",
+                       help=f"also record memory peaks per span and a cProfile dump (default --trace: {DEFAULT_PATH})")
+
+
+def from_args(args):
+    """Enable tracing if --trace or --profile was given; otherwise leave the environment settings alone."""
+    if args.trace or args.profile:
+        path = args.trace or (_tracer.path if _tracer else DEFAULT_PATH)
+        enable(path, args.trace_format or os.environ.get(ENV_FORMAT, "json"), args.profile or _env_profile())
+
+
+def _env_profile():
+    return os.environ.get(ENV_PROFILE, "") not in ("", "0")
+
+
+def _from_environment():
+    # Worker processes inherit the environment but must not overwrite the parent's trace
+    path = os.environ.get(ENV_PATH)
+    if path and parent_process() is None:
+        enable(path, os.environ.get(ENV_FORMAT, "json"), _env_profile())
+
+
+_from_environment()
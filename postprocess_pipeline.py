@@ -0,0 +1,216 @@
+"""
+Post-processing Pipeline
+Runs the work after a download (merging, fixups, the configured
+postprocessors, checksums) in a process pool, off the download threads.
+
+yt-dlp normally post-processes inside the call that downloads, so merging
+one video blocks that worker's next download. Here the download queue hands
+each finished download to an asyncio queue instead. A fixed number of
+consumers take tasks from it and run each stage in a bounded process pool,
+so ffmpeg and hashing overlap with the network transfers still in flight.
+
+Each worker process runs yt-dlp's own post_process chain on a YoutubeDL
+built from the same options: the merger and fixups yt-dlp chose for that
+download, then the configured `postprocessors`, then the move to the final
+folder. The same steps run as inline; only where they run changes.
+Callables in the options (hooks, logger) cannot cross into the workers. post_hooks are run by the caller
+when a task finishes (see download_queue.py); the rest are dropped.
+The queue is bounded: when post-processing falls behind (CPU saturated),
+or free disk space drops below a floor while work is still pending,
+submit() blocks and the downloaders wait. Throughput then tends towards the
+slower of network and CPU rather than their sum.
+
+A task is a plain dict (so it can cross into worker processes), built by
+task_from_info():
+    {"filepath": downloaded file, "info": sanitized info dict,
+     "postprocessors": [keys yt-dlp queued], "files_to_move": {...},
+     "key": (extractor, id), "format_id": ...}
+The default stages (YTDLP_STAGES) run yt-dlp's post_process chain and then
+checksum the final file, adding "size" and "checksum". Stages take a task and
+return it; a stage that does not apply returns it unchanged. Stage failures
+end the task with task["error"] set.
+
+Requirements: pip install yt-dlp (plus ffmpeg on PATH for the merger/fixups)
+Usage:
+    with PostProcessPipeline(processes=4, ydl_options=options, on_done=print) as pipeline:
+        pipeline.submit(task_from_info(info, filename, files_to_move))
+
+    # download_queue.py does this for every finished download
+"""
+
+import asyncio
+import multiprocessing
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from download_archive import file_checksum, info_key
+
+DEFAULT_MIN_FREE = 1024 ** 3
+DISK_POLL = 0.5
+# Options holding callables, which cannot be pickled into the worker processes
+CALLABLE_OPTIONS = ("progress_hooks", "postprocessor_hooks", "post_hooks", "logger")
+
+# The worker process's YoutubeDL, built on first use from the pipeline's options
+_worker_options = None
+_worker_ydl = None
+
+
+def checksum(task):
+    task["size"] = os.path.getsize(task["filepath"])
+    task["checksum"] = file_checksum(task["filepath"])
+    return task
+
+
+def _init_worker(ydl_options):
+    global _worker_options
+    _worker_options = ydl_options
+
+
+def ytdlp_postprocess(task):
+    """Run yt-dlp's post_process chain for a task from task_from_info()."""
+    global _worker_ydl
+    if "info" not in task:
+        return task
+    import yt_dlp
+    from yt_dlp.postprocessor import get_postprocessor
+
+    if _worker_ydl is None:
+        _worker_ydl = yt_dlp.YoutubeDL(dict(_worker_options or {}, quiet=True, noprogress=True))
+    info = task.pop("info")
+    info["__postprocessors"] = [get_postprocessor(key)(_worker_ydl) for key in task.pop("postprocessors")]
+    info = _worker_ydl.post_process(task["filepath"], info, task.pop("files_to_move"))
+    task["filepath"] = info["filepath"]
+    return task
+
+
+YTDLP_STAGES = (ytdlp_postprocess, checksum)
+
+
+def task_from_info(info, filename, files_to_move=None):
+    """A pipeline task for a download yt-dlp has just finished, for YTDLP_STAGES."""
+    import yt_dlp
+
+    postprocessors = [pp.pp_key() for pp in info.get("__postprocessors") or []]
+    info = yt_dlp.YoutubeDL.sanitize_info({k: v for k, v in info.items() if k != "__postprocessors"})
+    return {"filepath": filename, "info": info, "postprocessors": postprocessors,
+            "files_to_move": dict(files_to_move or {}), "key": info_key(info), "format_id": info.get("format_id")}
+
+
+def deferring_class(base):
+    """A YoutubeDL subclass that passes each finished download to `hand_off(filename, info, files_to_move)`.
+
+    Its post_process step only hands off; ytdlp_postprocess() runs the real
+    one (merger, fixups and configured postprocessors) in the pipeline.
+    """
+    class DeferringYoutubeDL(base):
+        hand_off = None
+
+        def post_process(self, filename, info, files_to_move=None):
+            info["filepath"] = filename
+            self.hand_off(filename, info, files_to_move)
+            return info
+
+    return DeferringYoutubeDL
+
+
+class PostProcessPipeline:
+    """Bounded asyncio queue feeding post-processing stages to a process pool."""
+
+    def __init__(self, stages=YTDLP_STAGES, processes=None, max_pending=None, min_free=DEFAULT_MIN_FREE,
+                 on_done=None, ydl_options=None):
+        self.stages = tuple(stages)
+        self.ydl_options = {k: v for k, v in (ydl_options or {}).items() if k not in CALLABLE_OPTIONS}
+        self.processes = processes or os.cpu_count() or 2
+        self.max_pending = max_pending or 2 * self.processes
+        self.min_free = min_free
+        self.on_done = on_done
+        self.results = []
+        self.in_flight = 0
+        self.stats = {"submitted": 0, "finished": 0, "failed": 0, "waited_full": 0.0, "waited_disk": 0.0,
+                      "busy": 0.0}
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        self._ready = threading.Event()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="postprocess", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._queue = asyncio.Queue(self.max_pending)
+        # The download threads are already running, and forking a threaded process is unsafe
+        context = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else None
+        self._pool = ProcessPoolExecutor(self.processes, mp_context=multiprocessing.get_context(context),
+                                         initializer=_init_worker, initargs=(self.ydl_options,))
+        self._ready.set()
+        try:
+            self._loop.run_until_complete(asyncio.gather(*(self._consume() for _ in range(self.processes))))
+        finally:
+            self._pool.shutdown()
+            self._loop.close()
+
+    async def _consume(self):
+        while True:
+            task = await self._queue.get()
+            if task is None:
+                return
+            started = time.perf_counter()
+            try:
+                for stage in self.stages:
+                    task = await self._loop.run_in_executor(self._pool, stage, task)
+            except Exception as e:
+                task["error"] = f"{getattr(stage, '__name__', stage)}: {e}"
+            with self._lock:
+                self.in_flight -= 1
+                self.stats["busy"] += time.perf_counter() - started
+                self.stats["failed" if "error" in task else "finished"] += 1
+                self.results.append(task)
+            if self.on_done:
+                self.on_done(task)
+
+    def _disk_full(self, path):
+        try:
+            return shutil.disk_usage(os.path.dirname(os.path.abspath(path))).free < self.min_free
+        except OSError:
+            return False
+
+    def submit(self, task):
+        """Queue a task, blocking while the pipeline is full or the disk is nearly full.
+
+        The disk wait only lasts while earlier tasks are still pending (their
+        finished merges free the part files); otherwise there is nothing to
+        wait for.
+        """
+        started = time.perf_counter()
+        while self.min_free and self.in_flight and self._disk_full(task["filepath"]):
+            time.sleep(DISK_POLL)
+        disk_wait = time.perf_counter() - started
+        with self._lock:
+            self.in_flight += 1
+            self.stats["submitted"] += 1
+        started = time.perf_counter()
+        asyncio.run_coroutine_threadsafe(self._queue.put(task), self._loop).result()
+        with self._lock:
+            self.stats["waited_disk"] += disk_wait
+            self.stats["waited_full"] += time.perf_counter() - started
+
+    def close(self):
+        """Wait for every queued task to finish; returns the finished tasks."""
+        for _ in range(self.processes):
+            asyncio.run_coroutine_threadsafe(self._queue.put(None), self._loop).result()
+        self._thread.join()
+        return self.results
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
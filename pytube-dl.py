@@ -1,11 +1,52 @@
-from pytube import YouTube
+"""
+pytube Downloader
+Downloads the highest-resolution progressive MP4 of YouTube videos or
+playlists with pytube.
 
-# replace the URL with the desired YouTube video URL
-video_url = "https://youtu.be/TnbQNOM7gHg"
+Every download is recorded in a download archive (download_archive.py;
+by default OUTPUT/.download-archive.sqlite, the same format yt-dlp-download.py
+uses). Video ids come straight from the URLs, so videos already in the
+archive are skipped before pytube fetches any metadata. --verify checks the
+archived files on disk instead of downloading.
 
-try:
-    yt = YouTube(video_url)
+Streams are fetched with segmented_download.py: byte ranges over several
+keep-alive connections at once, so YouTube's per-connection throttling no
+longer caps the speed. An interrupted download resumes from its .part file
+on the next run. --connections 1 uses pytube's own single-stream download.
 
+Requirements: pytube (pip install pytube)
+Usage:
+    python pytube-dl.py https://youtu.be/TnbQNOM7gHg
+    python pytube-dl.py https://www.youtube.com/playlist?list=... -o videos --connections 16
+    python pytube-dl.py -o videos --verify --checksums
+"""
+
+import argparse
+import os
+import sys
+
+from pytube import Playlist, YouTube
+from pytube.extract import video_id as extract_video_id
+
+from download_archive import ARCHIVE_NAME, DownloadArchive, file_checksum, verify
+from segmented_download import DEFAULT_CONNECTIONS, segmented_download
+
+EXTRACTOR = "youtube"
+
+
+def video_urls(url):
+    """The video URLs behind a URL: its entries for a playlist, else the URL itself."""
+    if "list=" in url and "watch?" not in url:
+        return list(Playlist(url).video_urls)
+    return [url]
+
+
+def download(url, output_path=".", archive=None, connections=DEFAULT_CONNECTIONS):
+    """Download one video; returns its path, or None if it was skipped."""
+    vid = extract_video_id(url)
+    if archive is not None and archive.has(EXTRACTOR, vid):
+        return None
+    yt = YouTube(url)
     # filter for progressive streams (containing both audio and video)
     # and get the highest resolution available within these streams
     stream = (
@@ -14,13 +55,63 @@ try:
         .desc()
         .first()
     )
-
-    if stream:
-        print(f"Downloading: {yt.title} ({stream.resolution})")
-        stream.download()
-        print("Download complete!")
+    if not stream:
+        raise ValueError("no suitable streams found")
+    print(f"Downloading: {yt.title} ({stream.resolution}, {stream.filesize / 1e6:,.1f} MB)")
+    if connections > 1:
+        path = os.path.join(output_path, stream.default_filename)
+        segmented_download(stream.url, path, connections)
     else:
-        print("No suitable streams found.")
+        path = stream.download(output_path=output_path)
+    if archive is not None:
+        archive.add(EXTRACTOR, vid, path, format_id=str(stream.itag), checksum=file_checksum(path))
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Download YouTube videos with pytube")
+    parser.add_argument("urls", nargs="*", help="video or playlist URLs")
+    parser.add_argument("-o", "--output", default=".", help="output folder")
+    parser.add_argument("--connections", type=int, default=DEFAULT_CONNECTIONS,
+                        help="parallel connections per download (default: %(default)s)")
+    parser.add_argument("--archive", help=f"download archive file (default: OUTPUT/{ARCHIVE_NAME})")
+    parser.add_argument("--no-archive", action="store_true", help="neither skip nor record downloads")
+    parser.add_argument("--verify", action="store_true", help="check the archived files on disk and exit")
+    parser.add_argument("--checksums", action="store_true", help="with --verify, also re-hash every file")
+    parser.add_argument("--prune", action="store_true",
+                        help="with --verify, forget bad entries so they are downloaded again")
+    args = parser.parse_args()
 
-except Exception as e:
-    print(f"An error occurred: {e}")
+    if not args.urls and not args.verify:
+        parser.error("give at least one URL")
+    if args.verify and args.no_archive:
+        parser.error("--verify needs the archive")
+    archive = None
+    if not args.no_archive:
+        os.makedirs(args.output, exist_ok=True)
+        archive = DownloadArchive(args.archive or os.path.join(args.output, ARCHIVE_NAME))
+    failed = skipped = done = 0
+    try:
+        if args.verify:
+            checked = len(archive)
+            problems = verify(archive, args.checksums, prune=args.prune)
+            for entry, problem in problems:
+                print(f"{entry['extractor']} {entry['video_id']}: {entry['path']}: {problem}")
+            print(f"Checked {checked:,} archived file(s), {len(problems):,} bad"
+                  + (" (removed from the archive)" if args.prune and problems else ""))
+            sys.exit(1 if problems else 0)
+        for url in args.urls:
+            for video_url in video_urls(url):
+                try:
+                    if download(video_url, args.output, archive, args.connections) is None:
+                        skipped += 1
+                    else:
+                        done += 1
+                except Exception as e:
+                    print(f"An error occurred with {video_url}: {e}")
+                    failed += 1
+    finally:
+        if archive is not None:
+            archive.close()
+    print(f"Download complete! {done} downloaded, {skipped} already archived, {failed} failed")
+    sys.exit(1 if failed else 0)
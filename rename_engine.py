@@ -0,0 +1,282 @@
+"""
+Rename Engine
+Plans, applies, resumes and undoes bulk renames inside one folder.
+
+The whole plan is built before anything is touched: names come from one
+os.scandir pass, duplicate targets and clashes with files that are not being
+renamed are rejected, and chains or cycles (a -> b while b -> c, or a <-> b)
+are routed through temporary names. That leaves at most two phases in which
+every target is free, so each phase is renamed in parallel chunks by a
+thread pool (os.rename releases the GIL, which pays off on network shares).
+
+Every run writes an append-only JSON-lines journal next to the files: the
+planned chunks first, then a marker as each chunk finishes. After a crash
+the journal resumes the run, and any finished or partial run can be undone.
+
+Requirements: none (standard library only)
+Usage:
+    from rename_engine import scan_folder, sequential_namer, build_plan, apply_plan
+    names, existing = scan_folder("photos")
+    phases = build_plan(names, existing, sequential_namer("img_"))
+    apply_plan("photos", phases)
+"""
+
+import json
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import perf_trace
+
+JOURNAL_PREFIX = ".rename-journal-"
+TEMP_MARK = ".rntmp-"
+DEFAULT_WORKERS = 8
+DEFAULT_CHUNK_SIZE = 2000
+
+
+def is_engine_file(name):
+    """Journals and temporary names belong to the engine, never to a plan."""
+    return name.startswith(JOURNAL_PREFIX) or TEMP_MARK in name
+
+
+@perf_trace.traced("rename.scan")
+def scan_folder(folder):
+    """Return (sorted regular file names to rename, set of every entry name)."""
+    names, existing = [], set()
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            existing.add(entry.name)
+            if entry.is_file() and not is_engine_file(entry.name):
+                names.append(entry.name)
+    names.sort()
+    return names, existing
+
+
+def sequential_namer(prefix="file_", start=0):
+    """file_0.jpg, file_1.pdf, ... keeping each file's own extension."""
+    def namer(index, name):
+        return f"{prefix}{start + index}{os.path.splitext(name)[1]}"
+    return namer
+
+
+def _check_name(new, old):
+    if not new or new in (".", "..") or os.sep in new or (os.altsep and os.altsep in new):
+        raise ValueError(f"Invalid new name '{new}' for '{old}'")
+
+
+@perf_trace.traced("rename.plan")
+def build_plan(names, existing, namer, run_id=None):
+    """Turn a namer into [phase 1 moves, phase 2 moves] of (old, new) names.
+
+    Raises ValueError if two files would get the same name or a target is
+    taken by something that is not itself being renamed away.
+    """
+    run_id = run_id or uuid.uuid4().hex[:8]
+    targets, kept = {}, set()
+    for index, name in enumerate(names):
+        new = namer(index, name)
+        _check_name(new, name)
+        if new == name:
+            kept.add(name)
+            continue
+        if new in targets or new in kept:
+            other = targets.get(new, new)
+            raise ValueError(f"'{other}' and '{name}' would both be named '{new}'")
+        targets[new] = name
+
+    sources = set(targets.values())
+    blocked = sorted(new for new in targets if new in existing and new not in sources)
+    if blocked:
+        shown = ", ".join(blocked[:5]) + (" ..." if len(blocked) > 5 else "")
+        raise ValueError(f"{len(blocked)} target name(s) already exist and are not being renamed: {shown}")
+
+    direct, staged = [], []
+    for new, old in targets.items():
+        if new in sources:
+            # The target is still occupied by a file that moves later: go via a temp name
+            temp = f".{old}{TEMP_MARK}{run_id}"
+            direct.append((old, temp))
+            staged.append((temp, new))
+        else:
+            direct.append((old, new))
+    return [phase for phase in (direct, staged) if phase]
+
+
+def final_names(phases):
+    """Collapse the phases into {old name: final name}, for previews."""
+    mapping = {old: new for old, new in phases[0]} if phases else {}
+    if len(phases) > 1:
+        through = {temp: new for temp, new in phases[1]}
+        mapping = {old: through.get(new, new) for old, new in mapping.items()}
+    return mapping
+
+
+class Journal:
+    """Append-only JSON-lines log of a rename run."""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "a", encoding="utf-8")
+        if self.file.tell():
+            self.file.write("\n")  # seal off a torn last line left by a crash
+
+    def write(self, record, sync=False):
+        self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        if sync:
+            self.sync()
+
+    def sync(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        self.sync()
+        self.file.close()
+
+    @staticmethod
+    def read(path):
+        """Parse a journal into its header, chunks and progress markers.
+
+        Torn lines from a crash mid-write are skipped.
+        """
+        state = {"header": None, "chunks": {}, "done": set(), "undone": set(),
+                 "complete": False, "undo_complete": False}
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if "journal" in record:
+                    state["header"] = record
+                elif "chunk" in record:
+                    state["chunks"][record["chunk"]] = (record["phase"], [tuple(m) for m in record["moves"]])
+                elif "done" in record:
+                    state["done"].add(record["done"])
+                elif "undone" in record:
+                    state["undone"].add(record["undone"])
+                elif record.get("complete"):
+                    state["complete"] = True
+                elif record.get("undo_complete"):
+                    state["undo_complete"] = True
+        if state["header"] is None:
+            raise ValueError(f"{path} is not a rename journal")
+        return state
+
+
+@perf_trace.traced("rename.chunk")
+def _rename_chunk(folder, moves, check):
+    """Rename one chunk; with check, skip moves that already happened."""
+    count = 0
+    for old, new in moves:
+        src, dst = os.path.join(folder, old), os.path.join(folder, new)
+        if check:
+            if os.path.lexists(dst):
+                if os.path.lexists(src):
+                    raise FileExistsError(f"Both '{old}' and '{new}' exist; refusing to overwrite")
+                continue
+            if not os.path.lexists(src):
+                raise FileNotFoundError(f"'{old}' is missing and '{new}' was never created")
+        os.rename(src, dst)
+        count += 1
+    return count
+
+
+@perf_trace.traced("rename.phase")
+def _run_chunks(folder, chunks, journal, marker, workers, check):
+    """Rename {chunk id: moves} in parallel, journaling each finished chunk."""
+    renamed, errors = 0, []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(_rename_chunk, folder, moves, check): cid for cid, moves in chunks.items()}
+        for future in as_completed(futures):
+            try:
+                renamed += future.result()
+            except OSError as e:
+                errors.append(e)
+                continue
+            journal.write({marker: futures[future]})
+    journal.sync()
+    if errors:
+        raise RuntimeError(f"{len(errors)} chunk(s) failed, first error: {errors[0]}. "
+                           f"Fix the cause, then resume or undo with {journal.path}")
+    return renamed
+
+
+def new_journal_path(folder):
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    return os.path.join(folder, f"{JOURNAL_PREFIX}{stamp}-{uuid.uuid4().hex[:6]}.jsonl")
+
+
+@perf_trace.traced("rename.apply")
+def apply_plan(folder, phases, journal_path=None, workers=DEFAULT_WORKERS, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Journal the plan, then apply it phase by phase; returns run stats."""
+    started = time.perf_counter()
+    journal_path = journal_path or new_journal_path(folder)
+    journal = Journal(journal_path)
+    try:
+        journal.write({"journal": 1, "folder": os.path.abspath(folder),
+                       "created": time.strftime("%Y-%m-%dT%H:%M:%S")})
+        layout, cid = [], 0
+        for phase, moves in enumerate(phases, 1):
+            chunks = {}
+            for i in range(0, len(moves), chunk_size):
+                chunks[cid] = moves[i:i + chunk_size]
+                journal.write({"chunk": cid, "phase": phase, "moves": chunks[cid]})
+                cid += 1
+            layout.append(chunks)
+        journal.sync()  # the full plan is on disk before the first rename
+
+        renamed = sum(_run_chunks(folder, chunks, journal, "done", workers, check=False) for chunks in layout)
+        journal.write({"complete": True}, sync=True)
+    finally:
+        journal.close()
+    return {"files": len(phases[0]) if phases else 0, "renames": renamed,
+            "seconds": time.perf_counter() - started, "journal": journal_path}
+
+
+def _phases_from(state, skip):
+    phases = {}
+    for cid, (phase, moves) in state["chunks"].items():
+        if cid not in skip:
+            phases.setdefault(phase, {})[cid] = moves
+    return phases
+
+
+def resume(journal_path, workers=DEFAULT_WORKERS):
+    """Finish an interrupted run recorded in a journal."""
+    started = time.perf_counter()
+    state = Journal.read(journal_path)
+    folder = state["header"]["folder"]
+    if state["complete"]:
+        return {"renames": 0, "seconds": 0.0, "journal": journal_path}
+    journal = Journal(journal_path)
+    try:
+        phases = _phases_from(state, state["done"])
+        renamed = sum(_run_chunks(folder, phases[p], journal, "done", workers, check=True)
+                      for p in sorted(phases))
+        journal.write({"complete": True}, sync=True)
+    finally:
+        journal.close()
+    return {"renames": renamed, "seconds": time.perf_counter() - started, "journal": journal_path}
+
+
+def undo(journal_path, workers=DEFAULT_WORKERS):
+    """Reverse a finished, partial or partly undone run, last phase first."""
+    started = time.perf_counter()
+    state = Journal.read(journal_path)
+    folder = state["header"]["folder"]
+    if state["undo_complete"]:
+        return {"renames": 0, "seconds": 0.0, "journal": journal_path}
+    journal = Journal(journal_path)
+    try:
+        phases = _phases_from(state, state["undone"])
+        renamed = 0
+        for p in sorted(phases, reverse=True):
+            # Chunks that never started are skipped by the existence check
+            reverse = {cid: [(new, old) for old, new in reversed(moves)] for cid, moves in phases[p].items()}
+            renamed += _run_chunks(folder, reverse, journal, "undone", workers, check=True)
+        journal.write({"undo_complete": True}, sync=True)
+    finally:
+        journal.close()
+    return {"renames": renamed, "seconds": time.perf_counter() - started, "journal": journal_path}
@@ -0,0 +1,337 @@
+"""
+Rename Templates
+Turns a name template such as "IMG_{taken:%Y%m%d_%H%M%S}.{ext}" into new
+file names for rename_engine.py.
+
+Templates use str.format syntax and are compiled once. Only the metadata a
+template actually uses is read, in a thread pool: {taken} reads just the
+JPEG/TIFF EXIF block, the ID3 fields read just the tag at the start (or
+end) of an MP3, {hash} is the only field that reads whole files, and a
+template made of names and counters never opens a file at all.
+
+Fields:
+    {name} {stem} {ext} {suffix}   file name, name without extension,
+                                   extension without / with the dot
+    {n}                            counter over the renamed files (--start)
+    {size} {mtime}                 bytes, modification time (datetime)
+    {taken}                        EXIF DateTimeOriginal, else mtime
+    {artist} {title} {album} {track} {year}   ID3 tags ("Unknown" if absent,
+                                   ignoring the format spec)
+    {hash}                         BLAKE2b of the contents; {hash:12} = 12 hex chars
+    {1} {2} {group}                captures of the --match regex; files that
+                                   do not match keep their name
+Dates take strftime specs ({mtime:%Y-%m}); other fields take format specs
+({n:04d}). Add !l or !u to lower- or upper-case a value ({ext!l}).
+
+Requirements: none (standard library only)
+Usage:
+    template = Template("{artist} - {title}.{ext}")
+    for old, new in zip(names, render_names(folder, names, template)):
+        ...
+"""
+
+import datetime
+import hashlib
+import os
+import re
+import string
+import struct
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import perf_trace
+
+DEFAULT_WORKERS = 8
+EXIF_READ_BYTES = 256 * 1024
+HASH_CHUNK = 1024 * 1024
+RENDER_CHUNK = 256
+UNSAFE_CHARS = re.compile(r'[\\/:*?"<>|\x00-\x1f]')
+MISSING_TEXT = "Unknown"
+
+# Stands in for a metadata field the file does not have
+_MISSING = object()
+
+# Field -> metadata source it needs ("name" needs nothing beyond the file name)
+FIELD_SOURCES = {
+    "name": "name", "stem": "name", "ext": "name", "suffix": "name", "n": "name",
+    "size": "stat", "mtime": "stat",
+    "taken": "exif",
+    "artist": "id3", "title": "id3", "album": "id3", "track": "id3", "year": "id3",
+    "hash": "hash",
+}
+
+ID3_FRAMES = {
+    "TIT2": "title", "TPE1": "artist", "TALB": "album", "TRCK": "track", "TYER": "year", "TDRC": "year",
+    "TT2": "title", "TP1": "artist", "TAL": "album", "TRK": "track", "TYE": "year",
+}
+
+
+class Template:
+    """A compiled name template plus the optional --match regex."""
+
+    def __init__(self, text, match=None):
+        self.text = text
+        self.pattern = re.compile(match) if match else None
+        self.parts = []
+        self.needs = set()
+        for literal, field, spec, conversion in string.Formatter().parse(text):
+            if field is None:
+                self.parts.append((literal, None, None, None))
+                continue
+            if field == "":
+                raise ValueError(f"Template '{text}': empty {{}} field; name the field")
+            if field not in FIELD_SOURCES:
+                if self.pattern is None:
+                    raise ValueError(f"Template '{text}': unknown field '{field}'")
+                if not field.isdigit() and field not in self.pattern.groupindex:
+                    raise ValueError(f"Template '{text}': '{field}' is neither a field nor a regex group")
+                if field.isdigit() and int(field) > self.pattern.groups:
+                    raise ValueError(f"Template '{text}': regex has no group {field}")
+            elif FIELD_SOURCES[field] != "name":
+                self.needs.add(FIELD_SOURCES[field])
+            if conversion not in (None, "l", "u", "s"):
+                raise ValueError(f"Template '{text}': unknown conversion !{conversion} (use !l or !u)")
+            self.parts.append((literal, field, spec, conversion))
+        if "exif" in self.needs:
+            self.needs.add("stat")  # {taken} falls back to mtime
+
+    def match(self, name):
+        """Regex match for a file name (always a match when there is no regex)."""
+        if self.pattern is None:
+            return True
+        return self.pattern.search(name)
+
+    def render(self, name, counter, meta, match=None):
+        out = []
+        for literal, field, spec, conversion in self.parts:
+            out.append(literal)
+            if field is None:
+                continue
+            value = _field_value(field, name, counter, meta, match)
+            if value is _MISSING:
+                # A spec such as {track:02d} cannot apply to the placeholder text
+                value, spec = MISSING_TEXT, ""
+            elif field == "hash":
+                value = value[:int(spec or 8)]
+                spec = ""
+            if conversion in ("l", "u"):
+                value = str(value).lower() if conversion == "l" else str(value).upper()
+            out.append(UNSAFE_CHARS.sub("_", format(value, spec or "")))
+        # "{stem}.{ext}" on a file without an extension would leave a trailing dot
+        return "".join(out).rstrip(". ") or name
+
+
+def _field_value(field, name, counter, meta, match):
+    if field == "name":
+        return name
+    if field in ("stem", "ext", "suffix"):
+        stem, suffix = os.path.splitext(name)
+        return {"stem": stem, "ext": suffix[1:], "suffix": suffix}[field]
+    if field == "n":
+        return counter
+    if field in meta:
+        return meta[field]
+    if field in FIELD_SOURCES:
+        return _MISSING
+    return match.group(int(field) if field.isdigit() else field) or ""
+
+
+# -- metadata readers -------------------------------------------------------
+def read_exif_datetime(path):
+    """DateTimeOriginal (or DateTime) from a JPEG or TIFF, reading only the header."""
+    with open(path, "rb") as f:
+        head = f.read(EXIF_READ_BYTES)
+    if head[:2] == b"\xff\xd8":
+        pos = 2
+        while pos + 4 <= len(head) and head[pos] == 0xFF:
+            marker = head[pos + 1]
+            length = struct.unpack(">H", head[pos + 2:pos + 4])[0]
+            if marker == 0xE1 and head[pos + 4:pos + 10] == b"Exif\x00\x00":
+                return _tiff_datetime(head[pos + 10:pos + 2 + length])
+            if marker == 0xDA:  # image data starts; no EXIF block
+                return None
+            pos += 2 + length
+        return None
+    if head[:4] in (b"II*\x00", b"MM\x00*"):
+        return _tiff_datetime(head)
+    return None
+
+
+def _tiff_datetime(tiff):
+    if len(tiff) < 8:
+        return None
+    endian = "<" if tiff[:2] == b"II" else ">"
+
+    def entries(offset):
+        if offset + 2 > len(tiff):
+            return
+        count = struct.unpack(endian + "H", tiff[offset:offset + 2])[0]
+        for i in range(count):
+            entry = offset + 2 + 12 * i
+            if entry + 12 > len(tiff):
+                return
+            tag, kind, num, value = struct.unpack(endian + "HHII", tiff[entry:entry + 12])
+            yield tag, kind, num, value
+
+    def ascii_at(num, value):
+        raw = tiff[value:value + num] if num > 4 else struct.pack(endian + "I", value)[:num]
+        return raw.split(b"\x00")[0].decode("ascii", "replace")
+
+    found = {}
+    ifd0 = struct.unpack(endian + "I", tiff[4:8])[0]
+    for tag, kind, num, value in entries(ifd0):
+        if tag == 0x0132:
+            found["DateTime"] = ascii_at(num, value)
+        elif tag == 0x8769:
+            for sub_tag, sub_kind, sub_num, sub_value in entries(value):
+                if sub_tag == 0x9003:
+                    found["DateTimeOriginal"] = ascii_at(sub_num, sub_value)
+    for key in ("DateTimeOriginal", "DateTime"):
+        try:
+            return datetime.datetime.strptime(found[key].strip(), "%Y:%m:%d %H:%M:%S")
+        except (KeyError, ValueError):
+            continue
+    return None
+
+
+def read_id3(path):
+    """Title/artist/album/track/year from an ID3v2 tag, else the ID3v1 trailer."""
+    tags = {}
+    with open(path, "rb") as f:
+        header = f.read(10)
+        if len(header) == 10 and header[:3] == b"ID3":
+            version = header[3]
+            end = 10 + _syncsafe(header[6:10])
+            id_len, head_len = (3, 6) if version == 2 else (4, 10)
+            pos = 10
+            while pos + head_len <= end and len(tags) < len(set(ID3_FRAMES.values())):
+                f.seek(pos)
+                frame = f.read(head_len)
+                frame_id = frame[:id_len].decode("latin-1")
+                if not frame_id.strip("\x00"):
+                    break
+                if version == 2:
+                    size = int.from_bytes(frame[3:6], "big")
+                elif version == 4:
+                    size = _syncsafe(frame[4:8])
+                else:
+                    size = struct.unpack(">I", frame[4:8])[0]
+                key = ID3_FRAMES.get(frame_id)
+                if key and key not in tags:
+                    tags[key] = _id3_text(f.read(size))
+                pos += head_len + size
+        if len(tags) < 3:
+            f.seek(0, os.SEEK_END)
+            if f.tell() >= 128:
+                f.seek(-128, os.SEEK_END)
+                v1 = f.read(128)
+                if v1[:3] == b"TAG":
+                    for key, raw in (("title", v1[3:33]), ("artist", v1[33:63]),
+                                     ("album", v1[63:93]), ("year", v1[93:97])):
+                        text = raw.split(b"\x00")[0].decode("latin-1").strip()
+                        if text:
+                            tags.setdefault(key, text)
+    if "track" in tags:
+        track = tags["track"].split("/")[0].strip()
+        tags["track"] = int(track) if track.isdigit() else track
+    return {k: v for k, v in tags.items() if v}
+
+
+def _syncsafe(raw):
+    return (raw[0] << 21) | (raw[1] << 14) | (raw[2] << 7) | raw[3]
+
+
+def _id3_text(data):
+    if not data:
+        return ""
+    encoding = {0: "latin-1", 1: "utf-16", 2: "utf-16-be", 3: "utf-8"}.get(data[0], "latin-1")
+    return data[1:].decode(encoding, "replace").split("\x00")[0].strip()
+
+
+def file_hash(path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_metadata(path, needs):
+    """Read only the metadata sources in `needs`; unreadable sources are left out."""
+    meta = {}
+    if "stat" in needs:
+        st = os.stat(path)
+        meta["size"] = st.st_size
+        meta["mtime"] = datetime.datetime.fromtimestamp(st.st_mtime)
+    if "exif" in needs:
+        try:
+            meta["taken"] = read_exif_datetime(path) or meta["mtime"]
+        except (OSError, struct.error):
+            meta["taken"] = meta["mtime"]
+    if "id3" in needs:
+        try:
+            meta.update(read_id3(path))
+        except (OSError, struct.error):
+            pass
+    if "hash" in needs:
+        meta["hash"] = file_hash(path)
+    return meta
+
+
+def render_names(folder, names, template, start=0, workers=DEFAULT_WORKERS, failed=None):
+    """Yield the new name for each of `names`, in order, as soon as it is known.
+
+    Files that the template's regex does not match keep their name; the
+    counter only advances for files that do match. A file whose name cannot
+    be rendered (e.g. {1:03d} on a non-numeric capture, or an unreadable
+    file) also keeps its name, and (name, error) is appended to `failed`.
+    """
+    matches, counters, counter = [], [], start
+    for name in names:
+        m = template.match(name)
+        matches.append(m)
+        counters.append(counter if m else None)
+        if m:
+            counter += 1
+
+    def render(i):
+        if not matches[i]:
+            return names[i]
+        try:
+            meta = file_metadata(os.path.join(folder, names[i]), template.needs) if template.needs else {}
+            return template.render(names[i], counters[i], meta, matches[i] if template.pattern else None)
+        except (ValueError, TypeError, OSError) as e:
+            if failed is not None:
+                failed.append((names[i], e))
+            return names[i]
+
+    def render_chunk(lo):
+        with perf_trace.span("rename.render", first=lo):
+            return [render(i) for i in range(lo, min(lo + RENDER_CHUNK, len(names)))]
+
+    if not template.needs:
+        yield from map(render, range(len(names)))
+        return
+    # A bounded window of chunks keeps memory flat for very large folders
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        window = deque()
+        for lo in range(0, len(names), RENDER_CHUNK):
+            window.append(executor.submit(render_chunk, lo))
+            if len(window) >= workers * 4:
+                yield from window.popleft().result()
+        while window:
+            yield from window.popleft().result()
+
+
+def dedupe(new_names):
+    """Yield the names, appending _1, _2, ... before the extension to repeats."""
+    seen = set()
+    for new in new_names:
+        if new in seen:
+            stem, suffix = os.path.splitext(new)
+            i = 1
+            while f"{stem}_{i}{suffix}" in seen:
+                i += 1
+            new = f"{stem}_{i}{suffix}"
+        seen.add(new)
+        yield new
@@ -0,0 +1,302 @@
+"""
+Segmented Download
+Fetches one large file over several HTTP connections at once, and resumes
+where it stopped after an interruption.
+
+The file's length is split into fixed-size byte ranges. Worker threads take
+ranges from a shared queue, each over its own keep-alive connection that is
+reused for every range it fetches. Data is written with os.pwrite straight
+to its offset in a preallocated NAME.part file, so segments can finish in
+any order without buffering. A sidecar NAME.part.json records how much of
+each segment is on disk (saved atomically about once a second and after
+every segment). A later run with the same URL and output path checks that
+the remote file still has the same size and validator (ETag / Last-Modified),
+then fetches only what is missing. Servers that ignore Range requests, or
+that do not send a length, get a plain single-connection download.
+
+Requirements: none (standard library only)
+Usage:
+    segmented_download(url, "video.mp4", connections=8)
+
+    python segmented_download.py URL video.mp4 --connections 16
+"""
+
+import argparse
+import http.client
+import json
+import os
+import queue
+import threading
+import time
+from urllib.parse import urljoin, urlsplit
+
+DEFAULT_CONNECTIONS = 8
+MIN_SEGMENT = 1024 * 1024
+MAX_SEGMENT = 16 * 1024 * 1024
+READ_CHUNK = 256 * 1024
+STATE_INTERVAL = 1.0
+MAX_REDIRECTS = 5
+MAX_RETRIES = 5
+TIMEOUT = 30
+
+
+class RangeNotSupported(Exception):
+    pass
+
+
+def _connect(url):
+    parts = urlsplit(url)
+    cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+    return cls(parts.hostname, parts.port, timeout=TIMEOUT)
+
+
+def _target(url):
+    parts = urlsplit(url)
+    return (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+
+
+def probe(url, headers=None):
+    """Follow redirects; return (final url, size or None, ranges supported, validator)."""
+    for _ in range(MAX_REDIRECTS + 1):
+        conn = _connect(url)
+        try:
+            conn.request("GET", _target(url), headers={**(headers or {}), "Range": "bytes=0-0"})
+            resp = conn.getresponse()
+            resp.read()
+        finally:
+            conn.close()
+        if resp.status in (301, 302, 303, 307, 308) and resp.getheader("Location"):
+            url = urljoin(url, resp.getheader("Location"))
+            continue
+        validator = resp.getheader("ETag") or resp.getheader("Last-Modified")
+        if resp.status == 206:
+            total = resp.getheader("Content-Range", "").rpartition("/")[2]
+            return url, int(total) if total.isdigit() else None, total.isdigit(), validator
+        if resp.status == 200:
+            length = resp.getheader("Content-Length")
+            return url, int(length) if length and length.isdigit() else None, False, validator
+        raise OSError(f"HTTP {resp.status} {resp.reason} for {url}")
+    raise OSError(f"Too many redirects for {url}")
+
+
+def plan_segments(size, connections, segment_size=None):
+    """[(start, end)] inclusive byte ranges covering `size` bytes.
+
+    By default there are about four segments per connection (within 1-16
+    MB), so fast connections take over the work of slow ones near the end.
+    """
+    if segment_size is None:
+        segment_size = min(MAX_SEGMENT, max(MIN_SEGMENT, size // (connections * 4) + 1))
+    return [(start, min(start + segment_size, size) - 1) for start in range(0, size, segment_size)]
+
+
+class DownloadState:
+    """The .part.json sidecar: what is being fetched and how much of each segment is written."""
+
+    def __init__(self, path, url, size, validator, segments):
+        self.path = path
+        self.data = {"url": url, "size": size, "validator": validator,
+                     "segments": [list(segment) for segment in segments], "written": [0] * len(segments)}
+        self.lock = threading.Lock()
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path, size, validator):
+        """A saved state matching this remote file, or None."""
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("size") != size or data.get("validator") != validator:
+            return None
+        state = cls(path, data["url"], size, validator, data["segments"])
+        state.data["written"] = data["written"]
+        return state
+
+    @property
+    def segments(self):
+        return self.data["segments"]
+
+    @property
+    def written(self):
+        return self.data["written"]
+
+    def add(self, index, count):
+        with self.lock:
+            self.data["written"][index] += count
+            self.dirty = True
+
+    def save(self):
+        with self.lock:
+            if not self.dirty:
+                return
+            text = json.dumps(self.data)
+            self.dirty = False
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(text)
+        os.replace(tmp, self.path)
+
+
+def _fetch_segment(conn, url, headers, fd, state, index, stop):
+    """Fetch what is missing of one segment over `conn`, writing it in place."""
+    start, end = state.segments[index]
+    offset = start + state.written[index]
+    if offset > end:
+        return
+    conn.request("GET", _target(url), headers={**headers, "Range": f"bytes={offset}-{end}"})
+    resp = conn.getresponse()
+    if resp.status != 206:
+        resp.read()
+        if resp.status == 200:
+            raise RangeNotSupported(url)
+        raise OSError(f"HTTP {resp.status} {resp.reason} for bytes {offset}-{end}")
+    remaining = end - offset + 1
+    while remaining:
+        if stop.is_set():
+            return  # interrupted; the sidecar already records what was written
+        chunk = resp.read(min(READ_CHUNK, remaining))
+        if not chunk:
+            raise http.client.IncompleteRead(b"", remaining)
+        os.pwrite(fd, chunk, offset)
+        offset += len(chunk)
+        remaining -= len(chunk)
+        state.add(index, len(chunk))
+
+
+def _worker(url, headers, fd, state, todo, errors, stop):
+    conn = None
+    try:
+        while not stop.is_set():
+            try:
+                index = todo.get_nowait()
+            except queue.Empty:
+                return
+            for attempt in range(MAX_RETRIES + 1):
+                if conn is None:
+                    conn = _connect(url)
+                try:
+                    _fetch_segment(conn, url, headers, fd, state, index, stop)
+                    break
+                except RangeNotSupported:
+                    raise
+                except (OSError, http.client.HTTPException) as e:
+                    # Drop the broken connection; retry the rest of the segment on a new one
+                    conn.close()
+                    conn = None
+                    if attempt == MAX_RETRIES:
+                        raise OSError(f"Segment {index} failed after {MAX_RETRIES} retries: {e}") from e
+                    time.sleep(min(0.5 * 2 ** attempt, 8))
+    except Exception as e:
+        errors.append(e)
+        stop.set()
+    finally:
+        if conn is not None:
+            conn.close()
+
+
+def _single_stream(url, path, headers, progress):
+    part = path + ".part"
+    conn = _connect(url)
+    try:
+        conn.request("GET", _target(url), headers=headers)
+        resp = conn.getresponse()
+        if resp.status != 200:
+            raise OSError(f"HTTP {resp.status} {resp.reason} for {url}")
+        total = int(resp.getheader("Content-Length") or 0) or None
+        done = 0
+        with open(part, "wb") as f:
+            for chunk in iter(lambda: resp.read(READ_CHUNK), b""):
+                f.write(chunk)
+                done += len(chunk)
+                if progress:
+                    progress(done, total)
+    finally:
+        conn.close()
+    os.replace(part, path)
+    return {"size": done, "connections": 1, "resumed": 0, "segments": 1}
+
+
+def segmented_download(url, path, connections=DEFAULT_CONNECTIONS, segment_size=None, headers=None,
+                       progress=None):
+    """Download `url` to `path` over up to `connections` connections; returns stats.
+
+    progress(done, total), if given, is called about once a second and at
+    the end. An interrupted download leaves PATH.part and PATH.part.json
+    behind; calling again with the same url and path resumes it.
+    """
+    headers = dict(headers or {})
+    url, size, ranges, validator = probe(url, headers)
+    if not ranges or not size or connections < 2:
+        return _single_stream(url, path, headers, progress)
+
+    part, state_path = path + ".part", path + ".part.json"
+    state = DownloadState.load(state_path, size, validator) if os.path.exists(part) else None
+    resumed = sum(state.written) if state else 0
+    if state is None:
+        state = DownloadState(state_path, url, size, validator, plan_segments(size, connections, segment_size))
+        state.dirty = True
+    state.data["url"] = url  # signed media URLs change between runs; the file does not
+
+    fd = os.open(part, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if os.fstat(fd).st_size != size:
+            if hasattr(os, "posix_fallocate"):
+                os.posix_fallocate(fd, 0, size)
+            else:
+                os.ftruncate(fd, size)
+        state.save()
+        todo = queue.Queue()
+        for index, (start, end) in enumerate(state.segments):
+            if start + state.written[index] <= end:
+                todo.put(index)
+        errors, stop = [], threading.Event()
+        workers = [threading.Thread(target=_worker, args=(url, headers, fd, state, todo, errors, stop), daemon=True)
+                   for _ in range(min(connections, todo.qsize()))]
+        for worker in workers:
+            worker.start()
+        try:
+            while any(worker.is_alive() for worker in workers):
+                for worker in workers:
+                    worker.join(STATE_INTERVAL / len(workers))
+                state.save()
+                if progress:
+                    progress(sum(state.written), size)
+        finally:
+            stop.set()
+            for worker in workers:
+                worker.join()
+            state.save()
+    finally:
+        os.close(fd)
+
+    if errors:
+        if isinstance(errors[0], RangeNotSupported):
+            os.remove(part)
+            os.remove(state_path)
+            return _single_stream(url, path, headers, progress)
+        raise errors[0]
+    os.replace(part, path)
+    os.remove(state_path)
+    return {"size": size, "connections": len(workers), "resumed": resumed, "segments": len(state.segments)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Download a file over several connections, with resume")
+    parser.add_argument("url")
+    parser.add_argument("output")
+    parser.add_argument("--connections", type=int, default=DEFAULT_CONNECTIONS)
+    parser.add_argument("--segment-size", type=int, help="bytes per range request (default: automatic)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+
+    def show(done, total):
+        rate = done / max(time.perf_counter() - started, 1e-9)
+        print(f"\r{done / 1e6:,.1f}/{total / 1e6 if total else 0:,.1f} MB at {rate / 1e6:.1f} MB/s",
+              end="", flush=True)
+
+    stats = segmented_download(args.url, args.output, args.connections, args.segment_size, progress=show)
+    print(f"\nDone: {stats['size']:,} bytes over {stats['connections']} connection(s)"
+          + (f", {stats['resumed']:,} resumed" if stats["resumed"] else ""))
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Streaming XLSX Writer
+Shared by the Arc Raiders spreadsheet generators for large item databases.
+
+Uses openpyxl write-only worksheets: rows are emitted one at a time straight
+to disk, and every cell style is a named style registered once per workbook
+instead of fresh Font/Fill/Border objects per cell. Memory use stays flat
+no matter how many rows are written.
+
+Requirements: pip install openpyxl
+Usage:
+    book = StreamingWorkbook()
+    book.add_style_family("profit", fill_color="C8E6C9")
+    sheet = book.add_sheet("Items", widths={"A": 26, "B": 12})
+    sheet.append(["Item", "Value"], "header_blue")
+    sheet.write_rows(((name, value) for name, value in items),
+                     ["profit_text", "profit_currency"])
+    book.save("items.xlsx")
+"""
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import NamedStyle, Font, PatternFill, Alignment, Border, Side
+
+CURRENCY_FORMAT = '"$"#,##0'
+
+
+def thin_border():
+    return Border(
+        left=Side(style='thin'), right=Side(style='thin'),
+        top=Side(style='thin'), bottom=Side(style='thin')
+    )
+
+
+class StreamingSheet:
+    """A write-only worksheet that accepts rows of values plus named styles."""
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.rows = 0
+
+    def cell(self, value, style=None):
+        cell = WriteOnlyCell(self.ws, value=value)
+        if style:
+            cell.style = style
+        return cell
+
+    def append(self, values, styles=None):
+        """Write one row. `styles` is one style name for every cell or a list per column."""
+        if styles is None or isinstance(styles, str):
+            row = [self.cell(value, styles) for value in values]
+        else:
+            row = [self.cell(value, style) for value, style in zip(values, styles)]
+        self.ws.append(row)
+        self.rows += 1
+
+    def write_rows(self, rows, styles=None):
+        """Write every row from an iterable (typically a generator); returns the row count."""
+        count = 0
+        for values in rows:
+            self.append(values, styles)
+            count += 1
+        return count
+
+    def pad_to(self, row):
+        """Append blank rows so the next row written lands on 1-based `row`."""
+        while self.rows < row - 1:
+            self.ws.append([])
+            self.rows += 1
+
+
+class StreamingWorkbook:
+    """Write-only workbook with named styles registered once up front."""
+
+    def __init__(self):
+        self.wb = Workbook(write_only=True)
+        self.styles = set()
+        self.add_style("header_blue", font=Font(bold=True, color="FFFFFF", size=11),
+                       fill_color="1565C0", alignment=Alignment(horizontal="center", vertical="center"),
+                       border=True)
+        self.add_style("header_green", font=Font(bold=True, color="FFFFFF", size=11),
+                       fill_color="2E7D32", alignment=Alignment(horizontal="center", vertical="center"),
+                       border=True)
+        self.add_style("title", font=Font(bold=True, size=14))
+        self.add_style("bold", font=Font(bold=True))
+        self.add_style("bold_large", font=Font(bold=True, size=12))
+
+    def add_style(self, name, font=None, fill_color=None, alignment=None, border=False,
+                  number_format=None):
+        """Register a named style; registering the same name twice is a no-op."""
+        if name in self.styles:
+            return name
+        style = NamedStyle(name=name)
+        if font is not None:
+            style.font = font
+        if fill_color is not None:
+            style.fill = PatternFill("solid", fgColor=fill_color)
+        if alignment is not None:
+            style.alignment = alignment
+        if border:
+            style.border = thin_border()
+        if number_format is not None:
+            style.number_format = number_format
+        self.wb.add_named_style(style)
+        self.styles.add(name)
+        return name
+
+    def add_style_family(self, prefix, fill_color=None, border=True):
+        """Register `<prefix>_text`, `_wrap`, `_currency`, `_center` and `_plain` styles."""
+        self.add_style(f"{prefix}_text", fill_color=fill_color, border=border,
+                       alignment=Alignment(horizontal="left", vertical="center"))
+        self.add_style(f"{prefix}_wrap", fill_color=fill_color, border=border,
+                       alignment=Alignment(horizontal="left", vertical="center", wrap_text=True))
+        self.add_style(f"{prefix}_currency", fill_color=fill_color, border=border,
+                       number_format=CURRENCY_FORMAT)
+        self.add_style(f"{prefix}_center", fill_color=fill_color, border=border,
+                       alignment=Alignment(horizontal="center", vertical="center"))
+        self.add_style(f"{prefix}_plain", fill_color=fill_color, border=border)
+
+    def add_sheet(self, title, widths=None):
+        """Create a sheet. Column widths must be set before any rows are written."""
+        ws = self.wb.create_sheet(title)
+        for letter, width in (widths or {}).items():
+            ws.column_dimensions[letter].width = width
+        return StreamingSheet(ws)
+
+    def save(self, path):
+        self.wb.save(path)
@@ -0,0 +1,63 @@
+"""
+Tests for imap_classify.py's FETCH parsing against the in-process fake IMAP
+server, with the data items before and after the header literal.
+
+Run: python -m pytest tests
+"""
+
+import pytest
+
+import imap_bulk
+import imap_classify
+from fake_imap_server import FakeIMAPServer
+from imap_classify import parse_fetch
+
+HEADERS = b"From: a@shop.example\r\nList-Id: <deals.shop.example>\r\n\r\n"
+
+
+def literal_response(before, after):
+    return [(before + b" {%d}" % len(HEADERS), HEADERS), after]
+
+
+@pytest.mark.parametrize("data", [
+    literal_response(b"1 (UID 55 RFC822.SIZE 1234 BODY[HEADER.FIELDS (FROM LIST-ID)]", b")"),
+    literal_response(b"1 (BODY[HEADER.FIELDS (FROM LIST-ID)]", b" UID 55 RFC822.SIZE 1234)"),
+    literal_response(b"1 (RFC822.SIZE 1234 BODY[HEADER.FIELDS (FROM LIST-ID)]", b" UID 55)"),
+])
+def test_data_items_on_either_side_of_the_literal(data):
+    [info] = parse_fetch(data)
+    assert (info.uid, info.size) == (55, 1234)
+    assert info.headers["List-Id"] == "<deals.shop.example>"
+
+
+def test_incomplete_messages_are_left_out():
+    no_size = literal_response(b"1 (UID 55 BODY[HEADER.FIELDS (FROM)]", b")")
+    no_literal = [b"2 (UID 56 RFC822.SIZE 99)"]
+    assert list(parse_fetch(no_size)) == []
+    assert list(parse_fetch(no_literal)) == []
+    assert [(i.uid, i.size) for i in parse_fetch(no_literal, with_headers=False)] == [(56, 99)]
+
+
+def classify_all(data_items_last, rules):
+    with FakeIMAPServer(2000, data_items_last=data_items_last) as server:
+        conn = imap_bulk.connect("127.0.0.1", "user", "pass", server.port, ssl=False)
+        try:
+            conn.select("inbox", readonly=True)
+            uids = imap_bulk.search_uids(conn, "ALL")
+            items = imap_classify.fetch_items(rules)
+            return [(info.uid, info.size, dict(info.headers))
+                    for info in imap_classify.fetch_headers(conn, uids, items, batch=100, pipeline=4)]
+        finally:
+            conn.logout()
+
+
+@pytest.mark.parametrize("rules", [
+    [imap_classify.smaller_than(3000), imap_classify.list_id_matches()],
+    [imap_classify.larger_than(20_000)],
+])
+def test_server_item_order_does_not_change_the_result(rules):
+    first = classify_all(False, rules)
+    last = classify_all(True, rules)
+    assert len(first) == 2000
+    assert last == first
+    assert all(size > 0 for _, size, _ in last)
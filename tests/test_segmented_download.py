@@ -0,0 +1,129 @@
+"""
+Tests for segmented_download.py against the in-process fake media server:
+range splitting, resume after an interruption, and the single-connection
+fallback for servers without range support.
+
+Run: python -m pytest tests
+"""
+
+import hashlib
+import json
+import os
+
+import pytest
+
+import segmented_download
+from fake_media_server import FakeMediaServer
+from segmented_download import DownloadState, plan_segments
+
+NAME = "clip-000.mp4"
+SIZE = 3_000_000
+SEGMENT = 256 * 1024
+
+
+class Interrupted(Exception):
+    pass
+
+
+def sha256(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def leftovers(path):
+    return [p for p in (path + ".part", path + ".part.json") if os.path.exists(p)]
+
+
+@pytest.fixture(autouse=True)
+def fast_state(monkeypatch):
+    # Save the sidecar and report progress often, so interruptions land quickly
+    monkeypatch.setattr(segmented_download, "STATE_INTERVAL", 0.05)
+
+
+@pytest.mark.parametrize("size, segment", [(1, 10), (10, 10), (11, 10), (SIZE, SEGMENT), (SIZE, SIZE + 1)])
+def test_plan_segments_cover_the_file_in_order(size, segment):
+    segments = plan_segments(size, 4, segment)
+    assert segments[0][0] == 0
+    assert segments[-1][1] == size - 1
+    for (_, end), (start, _) in zip(segments, segments[1:]):
+        assert start == end + 1
+    assert all(end - start + 1 <= segment for start, end in segments)
+
+
+def test_plan_segments_default_size_stays_within_bounds():
+    small = plan_segments(100 * 1024 * 1024, 8)
+    assert all(end - start + 1 <= segmented_download.MAX_SEGMENT for start, end in small)
+    assert len(small) >= 8
+    tiny = plan_segments(segmented_download.MIN_SEGMENT // 2, 8)
+    assert tiny == [(0, segmented_download.MIN_SEGMENT // 2 - 1)]
+
+
+def test_download_over_several_connections(tmp_path):
+    path = str(tmp_path / NAME)
+    with FakeMediaServer(files=[NAME], size=SIZE) as server:
+        stats = segmented_download.segmented_download(server.url(NAME), path, connections=4,
+                                                      segment_size=SEGMENT)
+        expected = server.files[NAME].sha256()
+        requests = server.stats["range_requests"]
+    assert stats["size"] == SIZE
+    assert stats["connections"] == 4
+    assert stats["segments"] == len(plan_segments(SIZE, 4, SEGMENT))
+    assert requests >= stats["segments"]  # the probe plus one request per segment
+    assert sha256(path) == expected
+    assert leftovers(path) == []
+
+
+def test_resume_after_interruption(tmp_path):
+    path = str(tmp_path / NAME)
+    with FakeMediaServer(files=[NAME], size=SIZE, bandwidth=1_000_000) as server:
+        def interrupt(done, total):
+            if done >= SIZE // 4:
+                raise Interrupted
+
+        with pytest.raises(Interrupted):
+            segmented_download.segmented_download(server.url(NAME), path, connections=4,
+                                                  segment_size=SEGMENT, progress=interrupt)
+        assert sorted(leftovers(path)) == [path + ".part", path + ".part.json"]
+        with open(path + ".part.json") as f:
+            written = sum(json.load(f)["written"])
+        assert 0 < written < SIZE
+
+        server.reset_stats()
+        server.bandwidth = None
+        stats = segmented_download.segmented_download(server.url(NAME), path, connections=4,
+                                                      segment_size=SEGMENT)
+        sent = server.stats["bytes_out"]
+        expected = server.files[NAME].sha256()
+    assert stats["resumed"] == written
+    assert sent <= SIZE - written + 1  # only the missing bytes (plus the one-byte probe)
+    assert sha256(path) == expected
+    assert leftovers(path) == []
+
+
+def test_resume_state_for_another_file_is_ignored(tmp_path):
+    path = str(tmp_path / NAME)
+    with open(path + ".part", "wb") as f:
+        f.write(b"\xff" * SIZE)
+    stale = DownloadState(path + ".part.json", "http://old/", SIZE + 1, None, plan_segments(SIZE + 1, 4, SEGMENT))
+    stale.data["written"] = [end - start + 1 for start, end in stale.segments]
+    stale.dirty = True
+    stale.save()
+    with FakeMediaServer(files=[NAME], size=SIZE) as server:
+        stats = segmented_download.segmented_download(server.url(NAME), path, connections=4,
+                                                      segment_size=SEGMENT)
+        expected = server.files[NAME].sha256()
+    assert stats["resumed"] == 0
+    assert sha256(path) == expected
+
+
+def test_falls_back_to_one_connection_without_range_support(tmp_path):
+    path = str(tmp_path / NAME)
+    with FakeMediaServer(files=[NAME], size=SIZE, ranges=False) as server:
+        stats = segmented_download.segmented_download(server.url(NAME), path, connections=4,
+                                                      segment_size=SEGMENT)
+        expected = server.files[NAME].sha256()
+        ranged = server.stats["range_requests"]
+    assert stats["connections"] == 1
+    assert ranged == 0
+    assert sha256(path) == expected
+    assert leftovers(path) == []
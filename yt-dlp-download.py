@@ -1,18 +1,137 @@
+"""
+yt-dlp Downloader
+Downloads videos, or whole lists of URLs and playlists, with yt-dlp.
+
+URLs given on the command line or in a URL list (a file or stdin) go
+through download_queue.py. It runs a pool of concurrent downloads with
+per-host limits and priorities, expands playlists into their entries, and
+shows a progress line.
+
+Every download is recorded in a download archive (download_archive.py;
+by default OUTPUT/.download-archive.sqlite). Videos already in it are
+skipped before any metadata is fetched, so re-syncing a big channel only
+costs the playlist listing. --verify checks the archived files on disk
+instead of downloading.
+
+Merging, remuxing, thumbnail embedding and checksums run in a separate
+process pool (postprocess_pipeline.py), overlapped with the downloads still
+in progress. The pool runs the same yt-dlp postprocessors as inline;
+--pp-workers 0 post-processes inline as yt-dlp does.
+
+Requirements: yt-dlp (pip install yt-dlp)
+Usage:
+    python yt-dlp-download.py https://www.youtube.com/watch?v=slPKx67TCG8
+    python yt-dlp-download.py -i urls.txt -o videos --workers 6
+    cat urls.txt | python yt-dlp-download.py -i - --per-host 2 --rate 0.5
+    python yt-dlp-download.py -i urls.txt --embed-thumbnail --remux-video mp4 --pp-workers 4
+    python yt-dlp-download.py -o videos --verify --checksums --prune
+URL list format: one URL per line, optionally preceded by a priority
+("10 https://...", higher first); # starts a comment line.
+"""
+
+import argparse
+import os
+import sys
+import threading
+
 import yt_dlp
 
+from download_archive import ARCHIVE_NAME, DownloadArchive, verify
+from download_queue import DEFAULT_PER_HOST, DEFAULT_RATE, DEFAULT_WORKERS, DownloadQueue, ydl_options
+from postprocess_pipeline import YTDLP_STAGES, PostProcessPipeline
+
 
 def download_video(url, output_path="."):
-    options = {
-        "outtmpl": f"{output_path}/%(title)s.%(ext)s",
-        "format": "bestvideo+bestaudio/best",
-        "merge_output_format": "mp4",
-        "subtitleslangs": ["en"],
-        "writesubtitles": False,
-    }
-
-    with yt_dlp.YoutubeDL(options) as ydl:
+    with yt_dlp.YoutubeDL(ydl_options(output_path)) as ydl:
         ydl.download([url])
 
 
-# usage
-download_video("https://www.youtube.com/watch?v=slPKx67TCG8")
+def download_all(urls, url_file=None, output_path=".", workers=DEFAULT_WORKERS, per_host=DEFAULT_PER_HOST,
+                 rate=DEFAULT_RATE, priority=0, fmt=None, archive=None, pp_workers=None, embed_thumbnail=False,
+                 remux_video=None):
+    """Download URLs and/or a URL list concurrently; returns the failed jobs.
+
+    pp_workers=0 keeps yt-dlp's inline post-processing; otherwise that many
+    processes post-process (None = one per CPU).
+    """
+    options = ydl_options(output_path, fmt) if fmt else ydl_options(output_path)
+    if embed_thumbnail:
+        options["writethumbnail"] = True
+        options["postprocessors"] = [{"key": "EmbedThumbnail"}]
+    if remux_video:
+        options.setdefault("postprocessors", []).insert(0, {"key": "FFmpegVideoRemuxer",
+                                                            "preferedformat": remux_video})
+    postprocess = None
+    if pp_workers != 0:
+        postprocess = PostProcessPipeline(YTDLP_STAGES, processes=pp_workers, ydl_options=options)
+    queue = DownloadQueue(options, workers=workers, per_host=per_host, rate=rate, archive=archive,
+                          postprocess=postprocess)
+    for url in urls:
+        queue.add(url, priority)
+    if url_file == "-":
+        # Downloads start while stdin is still being read
+        def feed():
+            try:
+                queue.add_lines(sys.stdin, priority)
+            finally:
+                queue.close()
+        threading.Thread(target=feed, daemon=True).start()
+    else:
+        if url_file:
+            with open(url_file) as f:
+                queue.add_lines(f, priority)
+        queue.close()
+    jobs = queue.run()
+    return [job for job in jobs if job.status == "failed"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Download videos and playlists with yt-dlp")
+    parser.add_argument("urls", nargs="*", help="video or playlist URLs")
+    parser.add_argument("-i", "--input", help="file with one URL per line ('-' for stdin)")
+    parser.add_argument("-o", "--output", default=".", help="output folder")
+    parser.add_argument("-f", "--format", help="yt-dlp format (default: bestvideo+bestaudio/best)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="concurrent downloads")
+    parser.add_argument("--per-host", type=int, default=DEFAULT_PER_HOST,
+                        help="concurrent downloads per host (default: %(default)s)")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE,
+                        help="downloads started per second per host, 0 for no limit (default: %(default)s)")
+    parser.add_argument("--priority", type=int, default=0, help="priority for URLs without one")
+    parser.add_argument("--pp-workers", type=int,
+                        help="post-processing processes (default: one per CPU; 0 = inline in the download)")
+    parser.add_argument("--embed-thumbnail", action="store_true", help="embed the thumbnail as cover art")
+    parser.add_argument("--remux-video", metavar="EXT", help="remux into this container (e.g. mp4, mkv)")
+    parser.add_argument("--archive", help=f"download archive file (default: OUTPUT/{ARCHIVE_NAME})")
+    parser.add_argument("--no-archive", action="store_true", help="neither skip nor record downloads")
+    parser.add_argument("--verify", action="store_true", help="check the archived files on disk and exit")
+    parser.add_argument("--checksums", action="store_true", help="with --verify, also re-hash every file")
+    parser.add_argument("--prune", action="store_true",
+                        help="with --verify, forget bad entries so they are downloaded again")
+    args = parser.parse_args()
+
+    if not args.urls and not args.input and not args.verify:
+        parser.error("give at least one URL or --input")
+    archive = None
+    if not args.no_archive:
+        os.makedirs(args.output, exist_ok=True)
+        archive = DownloadArchive(args.archive or os.path.join(args.output, ARCHIVE_NAME))
+    try:
+        if args.verify:
+            if archive is None:
+                parser.error("--verify needs the archive")
+            checked = len(archive)
+            problems = verify(archive, args.checksums, prune=args.prune)
+            for entry, problem in problems:
+                print(f"{entry['extractor']} {entry['video_id']}: {entry['path']}: {problem}")
+            print(f"Checked {checked:,} archived file(s), "
+                  f"{len(problems):,} bad" + (" (removed from the archive)" if args.prune and problems else ""))
+            sys.exit(1 if problems else 0)
+        failed = download_all(args.urls, args.input, args.output, args.workers, args.per_host,
+                              args.rate, args.priority, args.format, archive, args.pp_workers,
+                              args.embed_thumbnail, args.remux_video)
+    finally:
+        if archive is not None:
+            archive.close()
+    for job in failed:
+        print(f"Failed: {job.url}: {job.error}", file=sys.stderr)
+    sys.exit(1 if failed else 0)